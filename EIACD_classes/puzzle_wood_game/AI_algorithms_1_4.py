@@ -9,19 +9,45 @@ This module contains implementations of various search algorithms:
 - Greedy Search
 - A* (A-Star) Search
 - Weighted A* Search
+- Beam Search
+- Anytime Weighted A* Search (Anytime Repairing A*)
 
 Modified to support multiple board sizes based on difficulty levels
+Every algorithm runs on both GameState and the compact BitboardState (see bitboard_1_4.py)
+
+The algorithms return a SearchResult and do not print anything: their progress is reported
+through the logging module (logger "AI_algorithms_1_4"), at INFO level.
 """
 
 import copy
 import heapq
-from collections import deque
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict, deque, namedtuple
 import time
+from batch_heuristics_1_4 import board_potential, board_potentials
+from bitboard_1_4 import (BLOCK, DIAMOND, SINGLE_PIECE, BitboardState, cells_key, clear_full_lines,
+                          encode_board, erase_cells, line_masks, piece_id, piece_key, piece_layout, popcount,
+                          rebuild_path, score_key, zobrist_hash)
+from move_cache_1_4 import cache_key
+from opening_book_1_4 import load_book
+from symmetry_1_4 import BoardSymmetry
+
+logger = logging.getLogger(__name__)
 
 class GameState:
     """
     Class that represents a state of the WoodBlockPuzzle game.
     Stores the current board, current piece, score, and the path of moves made.
+    The path is not copied from state to state: each state points to its parent and to
+    the move that produced it, and the path is rebuilt when it is read.
+    The Zobrist hash of the board and piece is kept in the zobrist attribute and
+    updated incrementally by apply_move. States must not be edited in place: board and
+    current_piece return copies of the matrices, and assigning them stores a copy and drops
+    the cached hash, which is recomputed the next time it is needed.
     """
     def __init__(self, board, current_piece, score, path=None):
         """
@@ -33,17 +59,66 @@ class GameState:
             score (int): The current player's score.
             path (list, optional): A list of moves that led to this state.
         """
-        self.board = copy.deepcopy(board)  # Makes a deep copy to avoid accidental modifications
-        self.current_piece = copy.deepcopy(current_piece)
+        self.board = board  # The setters make deep copies to avoid accidental modifications
+        self.current_piece = current_piece
         self.score = score
         self.path = path if path is not None else []
         # Calculate board size dynamically rather than hardcoding
         self.board_size = len(board)
     
+    @property
+    def board(self):
+        """A copy of the board matrix (editing it does not change the state)."""
+        return [row[:] for row in self._board]
+    
+    @board.setter
+    def board(self, board):
+        """Replaces the board matrix with a copy of board."""
+        self._board = copy.deepcopy(board)
+        self._zobrist = None
+    
+    @property
+    def current_piece(self):
+        """A copy of the current piece matrix (editing it does not change the state)."""
+        return [row[:] for row in self._current_piece]
+    
+    @current_piece.setter
+    def current_piece(self, piece):
+        """Replaces the current piece with a copy of piece."""
+        self._current_piece = copy.deepcopy(piece)
+        self._piece_id = self._zobrist = None
+    
+    @property
+    def piece_id(self):
+        """The id of the current piece's shape."""
+        if self._piece_id is None:
+            self._piece_id = piece_id(self._current_piece)
+        return self._piece_id
+    
+    @property
+    def zobrist(self):
+        """The Zobrist hash of the board and piece (the score is mixed in by __hash__)."""
+        if self._zobrist is None:
+            self._zobrist = zobrist_hash(*encode_board(self._board), self.piece_id)
+        return self._zobrist
+    
+    @property
+    def path(self):
+        """The list of moves that led to this state."""
+        return rebuild_path(self)
+    
+    @path.setter
+    def path(self, path):
+        """Sets the path of this state, detaching it from its parent."""
+        self.parent = None
+        self.move = None
+        self.root_path = path
+    
     def __eq__(self, other):
         """
         Compares two states to check if they are equal.
-        Two states are considered equal if they have the same board and the same current piece.
+        Two states are considered equal if they have the same board, the same current piece
+        and the same score (the score is part of the hash as well).
         
         Args:
             other (GameState): The other state to compare with.
@@ -51,20 +126,23 @@ class GameState:
         Returns:
             bool: True if the states are equal, False otherwise.
         """
-        return (self.board == other.board and 
-                self.current_piece == other.current_piece)
+        if isinstance(other, GameState):
+            board, piece = other._board, other._current_piece
+        else:
+            board, piece = other.board, other.current_piece
+        return (self.zobrist == other.zobrist and
+                self.score == other.score and
+                self._board == board and 
+                self._current_piece == piece)
     
     def __hash__(self):
         """
         Calculates a hash value for the state, allowing its use in sets and dictionaries.
         
         Returns:
-            int: A unique hash value for this state.
+            int: The Zobrist hash of the board and piece combined with the score.
         """
-        # Converts the board and current piece into tuples to make them hashable
-        board_tuple = tuple(tuple(row) for row in self.board)
-        piece_tuple = tuple(tuple(row) for row in self.current_piece)
-        return hash((board_tuple, piece_tuple, self.score))
+        return self.zobrist ^ score_key(self.score)
     
     def __lt__(self, other):
         """
@@ -79,6 +157,196 @@ class GameState:
         """
         # In uniform cost search, we want to maximize the score
         return self.score > other.score
+    
+    def position_key(self):
+        """
+        Returns a key that identifies the board and the current piece, ignoring the score.
+        
+        Returns:
+            tuple: (filled, diamonds, piece_id)
+        """
+        return encode_board(self._board) + (self.piece_id,)
+    
+    def _child(self, move):
+        """
+        Creates a copy of this state reached by a move, without recomputing the hash.
+        Only the board rows are copied: pieces are never modified in place.
+        
+        Args:
+            move: The move that leads from this state to the copy.
+            
+        Returns:
+            GameState: The copy, pointing to this state as its parent.
+        """
+        new_state = GameState.__new__(GameState)
+        new_state._board = [row[:] for row in self._board]
+        new_state._current_piece = self._current_piece
+        new_state.score = self.score
+        new_state.parent = self
+        new_state.move = move
+        new_state.root_path = ()
+        new_state.board_size = self.board_size
+        new_state._piece_id = self.piece_id
+        new_state._zobrist = self.zobrist
+        return new_state
+    
+    def to_bitboard(self):
+        """
+        Converts this state into the compact bitboard representation.
+        
+        Returns:
+            BitboardState: An equivalent compact state.
+        """
+        return BitboardState.from_game_state(self)
+
+class SearchNode(BitboardState):
+    """
+    Lean node used internally by the search algorithms.
+    It is a compact bitboard state (board masks, piece id, score, depth and parent pointer)
+    plus the priority it was queued with. It has no per-instance __dict__ and no board
+    matrix, so a child node takes about a quarter of the memory of a GameState child
+    (around 230 bytes instead of 900 on a 7x7 board).
+    """
+    __slots__ = ("priority",)
+    
+    def __init__(self, board_size, filled, diamonds, piece, score, path=None, zobrist=None,
+                 priority=0):
+        """
+        Initializes a new search node.
+        
+        Args:
+            board_size (int): The size of the board.
+            filled (int): Mask of the occupied cells.
+            diamonds (int): Mask of the cells holding a diamond.
+            piece (int): The id of the current piece.
+            score (int): The current player's score.
+            path (list, optional): A list of moves that led to this node.
+            zobrist (int, optional): The Zobrist hash of the board and piece, if already known.
+            priority (float, optional): The priority of the node in the frontier.
+        """
+        BitboardState.__init__(self, board_size, filled, diamonds, piece, score, path, zobrist)
+        self.priority = priority
+    
+    @classmethod
+    def from_state(cls, state):
+        """
+        Creates the root node of a search from a GameState or a BitboardState.
+        
+        Args:
+            state (GameState or BitboardState): The state to convert.
+            
+        Returns:
+            SearchNode: An equivalent node, whose path starts with the state's path.
+        """
+        if isinstance(state, BitboardState):
+            return cls(state.board_size, state.filled, state.diamonds, state.piece,
+                       state.score, state.path, state.zobrist)
+        return cls.from_game_state(state)
+    
+    def to_game_state(self):
+        """
+        Converts this node into a GameState.
+        
+        Returns:
+            GameState: An equivalent list-based state with the same path.
+        """
+        return GameState(self.board, self.current_piece, self.score, self.path)
+    
+    def __lt__(self, other):
+        """Nodes with a lower priority come first in priority queues."""
+        return self.priority < other.priority
+
+# Bits of a visited state key that hold the piece id (far more than the shapes ever drawn)
+PIECE_KEY_BITS = 16
+
+class TranspositionTable:
+    """
+    Table of the states already visited by a search.
+    States are stored as one integer packing their board masks, piece and score (not their
+    hash), so a hash collision can never prune a state that was not really visited, and the
+    table does not keep the visited nodes (and their parents) alive once the frontier drops
+    them.
+    
+    With dominance=True, states are keyed on their board and piece only, and a state
+    is only considered new if its score is higher than the best one seen for that position
+    (a higher score on the same position can never be worse).
+    With max_entries, the least recently seen entries are evicted once the table is full,
+    which bounds the memory used by long searches at the cost of some re-expansions.
+    With a symmetry, positions are keyed on their canonical key, so a rotated or mirrored
+    image of a visited position counts as visited (see symmetry_1_4.py).
+    """
+    def __init__(self, max_entries=None, dominance=False, symmetry=None):
+        """
+        Initializes an empty table.
+        
+        Args:
+            max_entries (int, optional): Maximum number of states kept (None for no limit).
+            dominance (bool, optional): Whether to keep only the best score per board and piece.
+            symmetry (BoardSymmetry, optional): Symmetries under which equivalent positions
+                are stored once (only for bitboard states).
+        """
+        self.max_entries = max_entries
+        self.dominance = dominance
+        self.symmetry = symmetry
+        self.evictions = 0
+        # OrderedDict keeps the recency order needed for eviction
+        self._entries = OrderedDict() if max_entries is not None else {}
+    
+    def _key(self, state):
+        """Returns the key under which a state is stored."""
+        cells = state.board_size * state.board_size
+        if self.symmetry is not None:
+            board, piece = self.symmetry.key(state)
+        else:
+            filled, diamonds, piece = state.position_key()
+            board = filled | diamonds << cells
+        if self.dominance:
+            return piece << 2 * cells | board
+        return (state.score << PIECE_KEY_BITS | piece) << 2 * cells | board
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def __contains__(self, state):
+        """Checks if a state (or, with dominance, a state at least as good) was visited."""
+        best_score = self._entries.get(self._key(state))
+        return best_score is not None and best_score >= state.score
+    
+    def add(self, state):
+        """
+        Records a state as visited.
+        
+        Args:
+            state (GameState): The state to record.
+            
+        Returns:
+            bool: True if the state is new and should be explored, False otherwise.
+        """
+        entries = self._entries
+        if not self.dominance and self.max_entries is None and self.symmetry is None:
+            # Fast path: the key includes the score, so the state is new iff it is absent
+            size = len(entries)
+            entries.setdefault(self._key(state), state.score)
+            return len(entries) > size
+        
+        key = self._key(state)
+        best_score = entries.get(key)
+        if best_score is not None and best_score >= state.score:
+            if self.max_entries is not None:
+                entries.move_to_end(key)
+            return False
+        
+        entries[key] = state.score
+        if self.max_entries is not None:
+            entries.move_to_end(key)
+            if len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.evictions += 1
+        return True
+    
+    def clear(self):
+        """Removes every state from the table."""
+        self._entries.clear()
 
 def get_valid_moves(state):
     """
@@ -91,8 +359,12 @@ def get_valid_moves(state):
     Returns:
         list: A list of tuples (x, y) representing valid positions or 'R' to request a new piece.
     """
+    if isinstance(state, BitboardState):
+        return state.get_valid_moves()
+    
     valid_moves = []
-    piece = state.current_piece
+    piece = state._current_piece
+    board = state._board
     piece_height, piece_width = len(piece), len(piece[0])
     board_size = state.board_size
     
@@ -104,7 +376,7 @@ def get_valid_moves(state):
             # Checks if the piece fits in this position
             for i in range(piece_height):
                 for j in range(piece_width):
-                    if piece[i][j] == 1 and state.board[x + i][y + j] != " ":
+                    if piece[i][j] == 1 and board[x + i][y + j] != " ":
                         valid = False
                         break
                 if not valid:
@@ -129,8 +401,11 @@ def apply_move(state, move):
     Returns:
         GameState: The new state after applying the move.
     """
+    if isinstance(state, BitboardState):
+        return state.apply_move(move)
+    
     # Creates a copy of the current state
-    new_state = GameState(state.board, state.current_piece, state.score, state.path + [move])
+    new_state = state._child(move)
     board_size = new_state.board_size
     
     # Determine the difficulty level based on the board size
@@ -143,18 +418,21 @@ def apply_move(state, move):
             new_state.score = 0
         # Simulates generating a new piece (in practice, this would be random)
         # Here, we use a simple 1x1 piece to simplify
-        new_state.current_piece = [[1]]
+        _set_single_piece(new_state)
     else:
         # Place the piece at position (x, y)
         x, y = move
-        piece = new_state.current_piece
+        piece = new_state._current_piece
         piece_height, piece_width = len(piece), len(piece[0])
         
-        # Places the piece on the board
+        # Places the piece on the board, keeping track of the filled cells for the hash
+        placed = 0
         for i in range(piece_height):
             for j in range(piece_width):
                 if piece[i][j] == 1:
-                    new_state.board[x + i][y + j] = "#"
+                    new_state._board[x + i][y + j] = "#"
+                    placed |= 1 << ((x + i) * board_size + y + j)
+        new_state._zobrist ^= cells_key(placed, BLOCK)
         
         new_state.score -= 10 * difficulty // 2  # Scaled penalty based on difficulty
         
@@ -162,54 +440,50 @@ def apply_move(state, move):
         check_full_lines_and_columns(new_state)
         
         # Simulates generating a new piece
-        new_state.current_piece = [[1]]
+        _set_single_piece(new_state)
     
     return new_state
 
+def _set_single_piece(state):
+    """Replaces the current piece of a state with a 1x1 piece, updating its hash."""
+    if state._zobrist is not None:
+        state._zobrist ^= piece_key(state.piece_id) ^ piece_key(SINGLE_PIECE)
+    state._current_piece = [[1]]
+    state._piece_id = SINGLE_PIECE
+
 def check_full_lines_and_columns(state):
     """
     Checks if there are complete lines or columns on the board and clears them.
+    All complete lines and columns are cleared at the same time.
     Also captures diamonds and adds points.
     
     Args:
         state (GameState): The current game state.
+        
+    Returns:
+        tuple: (lines_cleared, columns_cleared, diamonds_captured)
     """
-    board_size = state.board_size
-    difficulty = board_size - 3  # Determine difficulty from board size
-    
-    lines_cleared = 0
-    columns_cleared = 0
-    diamonds_captured = 0
-    
-    # Checks complete rows
-    for i in range(board_size):
-        if all(cell == "#" or cell == "D" for cell in state.board[i]):
-            lines_cleared += 1
-            # Count and process diamonds
-            for j in range(board_size):
-                if state.board[i][j] == "D":
-                    diamonds_captured += 1
-                    state.board[i][j] = " "
-            state.board[i] = [" " for _ in range(board_size)]
-    
-    # Checks complete columns
-    for j in range(board_size):
-        if all(state.board[i][j] == "#" or state.board[i][j] == "D" for i in range(board_size)):
-            columns_cleared += 1
-            # Count and process diamonds
-            for i in range(board_size):
-                if state.board[i][j] == "D":
-                    diamonds_captured += 1
-                    state.board[i][j] = " "
-            # Clears the column
-            for i in range(board_size):
-                state.board[i][j] = " "
+    if isinstance(state, BitboardState):
+        return state.check_full_lines_and_columns()
+    
+    difficulty = state.board_size - 3  # Determine difficulty from board size
+    
+    # Clears the complete rows and columns using the precomputed line masks
+    filled, diamonds = encode_board(state._board)
+    new_filled, new_diamonds, lines_cleared, columns_cleared, diamonds_captured = clear_full_lines(
+        state.board_size, filled, diamonds)
     
     # Add points based on difficulty
     if lines_cleared > 0 or columns_cleared > 0:
+        erase_cells(state._board, filled & ~new_filled)
+        if state._zobrist is not None:
+            state._zobrist ^= (cells_key(filled & ~diamonds & ~new_filled, BLOCK) ^
+                               cells_key(diamonds & ~new_diamonds, DIAMOND))
         base_points = 50 * difficulty
         state.score += base_points * (lines_cleared + columns_cleared)
         state.score += 100 * difficulty * diamonds_captured
+    
+    return lines_cleared, columns_cleared, diamonds_captured
 
 def is_goal_state(state, target_score=500):
     """
@@ -225,72 +499,405 @@ def is_goal_state(state, target_score=500):
     """
     return state.score >= target_score
 
-def bfs(initial_state, target_score=500, time_limit=30):
+class Deadline:
     """
-    Implements the Breadth-First Search (BFS) algorithm.
-    BFS explores all nodes at a level before moving to the next level.
-    Guarantees finding the shortest path to the goal, if it exists.
+    Cooperative budget shared by the search algorithms.
+    A search reports its expansions to the deadline every `interval` nodes and stops as soon
+    as check() returns True. The interval adapts to the observed expansion rate, so the clock
+    is read about every CHECK_PERIOD seconds whatever the board size.
+    
+    Besides the wall-clock limit, a deadline can limit the number of expanded nodes and the
+    memory used by the process, and can be cancelled from another thread.
+    After expiring, reason tells why: 'time', 'nodes', 'memory' or 'cancelled'.
+    The resident memory is sampled while checking, and its maximum is kept in peak_memory.
+    """
+    # Target time between two checks of the budget, in seconds
+    CHECK_PERIOD = 0.005
+    # Bounds of the number of expansions between two checks
+    MIN_INTERVAL = 1
+    MAX_INTERVAL = 4096
+    # The memory is read at most this often, in seconds (reading it is not free)
+    MEMORY_PERIOD = 0.05
+    
+    def __init__(self, time_limit=None, max_nodes=None, max_memory=None, interval=16):
+        """
+        Initializes a new budget, starting the clock now.
+        
+        Args:
+            time_limit (float, optional): Time limit in seconds (None for no limit).
+            max_nodes (int, optional): Maximum number of expanded nodes (None for no limit).
+            max_memory (int, optional): Maximum resident memory of the process in bytes
+                (None for no limit; ignored where the memory cannot be measured).
+            interval (int, optional): Initial number of expansions between two checks.
+        """
+        self.start_time = time.time()
+        self.end_time = self.start_time + time_limit if time_limit is not None else None
+        self.max_nodes = max_nodes
+        self.max_memory = max_memory
+        self.nodes = 0
+        self.reason = None
+        self.peak_memory = None
+        self._interval = interval
+        self._last_check = self.start_time
+        self._last_memory_check = self.start_time
+        self._cancelled = threading.Event()
+    
+    @property
+    def expired(self):
+        """Whether the budget is exhausted."""
+        return self.reason is not None
+    
+    @property
+    def interval(self):
+        """Number of expansions a search may do before calling check() again."""
+        if self.max_nodes is not None:
+            return max(1, min(self._interval, self.max_nodes - self.nodes))
+        return self._interval
+    
+    def elapsed(self):
+        """Returns the seconds elapsed since the deadline was created."""
+        return time.time() - self.start_time
+    
+    def remaining(self):
+        """Returns the seconds left before the time limit (None if there is no time limit)."""
+        if self.end_time is None:
+            return None
+        return max(0.0, self.end_time - time.time())
+    
+    def cancel(self):
+        """Cancels the searches using this deadline. Safe to call from another thread."""
+        self._cancelled.set()
+    
+    def check(self, expansions=0):
+        """
+        Records expansions and checks every budget.
+        
+        Args:
+            expansions (int, optional): Nodes expanded since the previous call.
+            
+        Returns:
+            bool: True if the budget is exhausted and the search must stop.
+        """
+        if self.reason is not None:
+            return True
+        
+        now = time.time()
+        self.nodes += expansions
+        
+        if self._cancelled.is_set():
+            self.reason = 'cancelled'
+        elif self.end_time is not None and now >= self.end_time:
+            self.reason = 'time'
+        elif self.max_nodes is not None and self.nodes >= self.max_nodes:
+            self.reason = 'nodes'
+        elif now - self._last_memory_check >= self.MEMORY_PERIOD or self.peak_memory is None:
+            self._last_memory_check = now
+            memory = current_memory()
+            if memory is not None:
+                self.peak_memory = max(memory, self.peak_memory or 0)
+                if self.max_memory is not None and memory >= self.max_memory:
+                    self.reason = 'memory'
+        
+        # Adapts the interval so that the next check happens about CHECK_PERIOD from now
+        elapsed = now - self._last_check
+        if expansions > 0 and elapsed > 0:
+            self._interval = int(max(self.MIN_INTERVAL,
+                                     min(self.MAX_INTERVAL, expansions * self.CHECK_PERIOD / elapsed)))
+        self._last_check = now
+        
+        return self.reason is not None
+
+# Messages logged for each reason a search can stop for
+_TERMINATION_MESSAGES = {
+    'solved': "Solution found!",
+    'exhausted': "Solution not found!",
+    'depth_limit': "Solution not found within the depth limit!",
+    'time': "Time limit exceeded!",
+    'nodes': "Node limit reached!",
+    'memory': "Memory limit reached!",
+    'cancelled': "Search cancelled!",
+    'error': "Search failed!",
+}
+
+class SearchResult(namedtuple("SearchResult", ["path", "explored_states", "elapsed_time"])):
+    """
+    Result of a search.
+    It unpacks like the (path_found, explored_states, elapsed_time) tuple the algorithms
+    used to return, and carries the other statistics of the search as attributes:
+    
+    - generated_states: number of child states created
+    - max_frontier: largest size reached by the frontier (by the recursion for DLS/IDS)
+    - peak_memory: peak resident memory of the process sampled during the search, in bytes
+      (None where it cannot be measured)
+    - reason: why the search stopped, one of 'solved', 'exhausted', 'depth_limit', 'time',
+      'nodes', 'memory', 'cancelled' and 'error' (the search raised or its worker died)
+    - algorithm: name of the algorithm
+    - best_score, best_path: highest score among the explored states and the path to it
+      (useful to pick a move when no goal was reached)
+    - pruned_states: number of generated states dropped because they could no longer
+      reach the target
+    """
+    def __new__(cls, path, explored_states, elapsed_time, generated_states=0, max_frontier=0,
+                peak_memory=None, reason='exhausted', algorithm=None, best_score=None,
+                best_path=None, pruned_states=0):
+        result = super().__new__(cls, path, explored_states, elapsed_time)
+        result.generated_states = generated_states
+        result.max_frontier = max_frontier
+        result.peak_memory = peak_memory
+        result.reason = reason
+        result.algorithm = algorithm
+        result.best_score = best_score
+        result.best_path = best_path
+        result.pruned_states = pruned_states
+        return result
+    
+    @property
+    def solved(self):
+        """Whether a path to the goal was found."""
+        return self.path is not None
+    
+    @property
+    def path_length(self):
+        """Number of moves of the path found, or None if no solution was found."""
+        return len(self.path) if self.path is not None else None
+    
+    @property
+    def nodes_per_second(self):
+        """Number of states explored per second."""
+        return self.explored_states / self.elapsed_time if self.elapsed_time > 0 else 0.0
+    
+    def to_dict(self):
+        """Returns the result as a plain dictionary (e.g. for JSON or CSV output)."""
+        return {
+            'algorithm': self.algorithm,
+            'path': self.path,
+            'path_length': self.path_length,
+            'explored_states': self.explored_states,
+            'generated_states': self.generated_states,
+            'max_frontier': self.max_frontier,
+            'peak_memory': self.peak_memory,
+            'time': self.elapsed_time,
+            'reason': self.reason,
+            'best_score': self.best_score,
+            'pruned_states': self.pruned_states,
+        }
+
+def _log_result(result):
+    """Logs the outcome of a search at INFO level."""
+    logger.info("%s Explored states: %d", _TERMINATION_MESSAGES[result.reason],
+                result.explored_states)
+    logger.info("Elapsed time: %.2f seconds", result.elapsed_time)
+
+def current_memory():
+    """
+    Returns the resident memory of the current process in bytes.
+    
+    Returns:
+        int: The memory in bytes, or None if it cannot be measured on this platform.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak memory, in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+# Frontier types of the search engine
+FIFO = 'fifo'          # Queue: breadth-first order
+LIFO = 'lifo'          # Stack: depth-first order
+PRIORITY = 'priority'  # Heap: lowest priority first
+
+def search(initial_state, frontier=FIFO, priority=None, goal_test=None, target_score=500,
+           time_limit=30, transposition_table=None, name="Search", deadline=None, prune=True,
+           batch_priority=None, symmetry=False):
+    """
+    Generic search engine shared by BFS, DFS, Uniform Cost, Greedy, A* and Weighted A*.
+    The algorithms only differ in the type of frontier and, for PRIORITY frontiers,
+    in the priority given to each node.
     
     Args:
         initial_state (GameState): The initial game state.
+        frontier (str, optional): FIFO, LIFO or PRIORITY.
+        priority (callable, optional): Function node -> value, lower values are expanded first.
+            Required for PRIORITY frontiers, unless batch_priority is given.
+        goal_test (callable, optional): Function node -> bool. Defaults to is_goal_state
+            with target_score.
         target_score (int, optional): The target score to consider a state as a goal.
         time_limit (int, optional): Time limit in seconds for the search.
+        transposition_table (TranspositionTable, optional): Table of visited states to use.
+        name (str, optional): Name of the algorithm, used in the messages.
+        deadline (Deadline, optional): Budget of the search; replaces time_limit if given.
+        prune (bool, optional): Whether to drop the states that can no longer reach the
+            target score before the game is over (see can_reach_target).
+        batch_priority (callable, optional): Function list of nodes -> list of values, used
+            instead of priority to evaluate all the new children of a node at once
+            (PRIORITY frontiers only).
+        symmetry (bool, optional): Whether the default table of visited states stores the
+            rotated and mirrored images of a position once (see symmetry_1_4.py). Only used
+            with the target score goal, which is the same for all the images. It makes
+            each expansion slower, so it only pays off when memory is the limit.
         
     Returns:
-        tuple: (path_found, explored_states, elapsed_time)
-            - path_found is a list of moves or None if no solution is found
-            - explored_states is the number of states explored
-            - elapsed_time is the elapsed time in seconds
+        SearchResult: (path_found, explored_states, elapsed_time) and the search statistics.
     """
-    print("Starting Breadth-First Search (BFS)...")
+    logger.info("Starting %s...", name)
     start_time = time.time()
+    if deadline is None:
+        deadline = Deadline(time_limit)
+    
+    # Searches on compact nodes; the path found is the same as on the original state
+    root = SearchNode.from_state(initial_state)
+    
+    # Table of already visited states to avoid cycles
+    visited = transposition_table
+    if visited is None:
+        use_symmetry = symmetry and goal_test is None
+        visited = TranspositionTable(
+            symmetry=BoardSymmetry.for_search(root.board_size) if use_symmetry else None)
+    visited.add(root)
+    
+    # Binds everything used in the loop to local variables
+    use_heap = frontier == PRIORITY
+    if use_heap:
+        # Format: (priority, counter, node); the counter breaks ties in insertion order
+        root.priority = batch_priority([root])[0] if batch_priority is not None else priority(root)
+        nodes = [(root.priority, 0, root)]
+        pop = heapq.heappop
+        push = heapq.heappush
+    elif frontier == FIFO:
+        nodes = deque([root])
+        pop = nodes.popleft
+        push = nodes.append
+    elif frontier == LIFO:
+        nodes = [root]
+        pop = nodes.pop
+        push = nodes.append
+    else:
+        raise ValueError(f"Unknown frontier type: {frontier}")
+    # A stack explores the first move first if the children are pushed in reverse order
+    reverse_children = frontier == LIFO
+    add_visited = visited.add
+    counter = 1
+    # Only states with a score at most this low can be pruned
+    threshold = survival_threshold(root.board_size) if prune else float('-inf')
     
-    # Queue of states to be explored (FIFO - First In, First Out)
-    queue = deque([initial_state])
-    
-    # Set of already visited states to avoid cycles
-    visited = set()
-    visited.add(hash(initial_state))
-    
-    # Counter of explored states
+    # Counters of explored and generated states, largest frontier seen and best state explored
     explored_states = 0
-    
-    while queue and time.time() - start_time < time_limit:
-        # Removes the first state from the queue
-        current_state = queue.popleft()
+    generated_states = 0
+    max_frontier = 1
+    pruned_states = 0
+    best_state = root
+    
+    # The budget is only checked once every `steps` expansions
+    expired = deadline.check()
+    steps = countdown = deadline.interval
+    
+    while nodes and not expired:
+        countdown -= 1
+        if countdown < 0:
+            expired = deadline.check(steps)
+            if expired:
+                break
+            steps = deadline.interval
+            countdown = steps - 1
+        
+        current_state = pop(nodes)[2] if use_heap else pop()
         explored_states += 1
+        if current_state.score > best_state.score:
+            best_state = current_state
         
         # Checks if it's a goal state
-        if is_goal_state(current_state, target_score):
-            elapsed_time = time.time() - start_time
-            print(f"Solution found! Explored states: {explored_states}")
-            print(f"Elapsed time: {elapsed_time:.2f} seconds")
-            return current_state.path, explored_states, elapsed_time
-        
-        # Generates all valid moves
-        valid_moves = get_valid_moves(current_state)
-        
-        # For each valid move, generates a new state and adds it to the queue
-        for move in valid_moves:
-            new_state = apply_move(current_state, move)
-            new_state_hash = hash(new_state)
-            
-            # Checks if the state has already been visited
-            if new_state_hash not in visited:
-                queue.append(new_state)
-                visited.add(new_state_hash)
-    
-    # If it exited the loop, it did not find a solution or exceeded the time limit
-    elapsed_time = time.time() - start_time
-    if time.time() - start_time >= time_limit:
-        print(f"Time limit exceeded! Explored states: {explored_states}")
-    else:
-        print(f"Solution not found! Explored states: {explored_states}")
-    print(f"Elapsed time: {elapsed_time:.2f} seconds")
+        if (goal_test(current_state) if goal_test is not None
+                else current_state.score >= target_score):
+            deadline.check(steps - countdown)
+            path = current_state.path
+            result = SearchResult(path, explored_states, time.time() - start_time,
+                                  generated_states, max_frontier, deadline.peak_memory,
+                                  'solved', name, current_state.score, path, pruned_states)
+            _log_result(result)
+            return result
+        
+        # Generates all the children at once
+        children = current_state.children()
+        generated_states += len(children)
+        if reverse_children:
+            children.reverse()
+        
+        new_states = []
+        for new_state in children:
+            # Drops the states that can no longer reach the target
+            if new_state.score <= threshold and not can_reach_target(new_state, target_score):
+                pruned_states += 1
+                continue
+            # Records the state as visited, skipping it if it was already visited
+            if add_visited(new_state):
+                if batch_priority is not None:
+                    new_states.append(new_state)
+                elif use_heap:
+                    new_state.priority = value = priority(new_state)
+                    push(nodes, (value, counter, new_state))
+                    counter += 1
+                else:
+                    push(new_state)
+        
+        # Evaluates the new children together
+        if new_states:
+            for new_state, value in zip(new_states, batch_priority(new_states)):
+                new_state.priority = value
+                push(nodes, (value, counter, new_state))
+                counter += 1
+        
+        if len(nodes) > max_frontier:
+            max_frontier = len(nodes)
+    
+    # If it exited the loop, it did not find a solution or exhausted its budget
+    if not expired:
+        deadline.check(steps - countdown)
+    result = SearchResult(None, explored_states, time.time() - start_time, generated_states,
+                          max_frontier, deadline.peak_memory,
+                          deadline.reason if expired else 'exhausted', name,
+                          best_state.score, best_state.path, pruned_states)
+    _log_result(result)
+    return result
+
+def bfs(initial_state, target_score=500, time_limit=30, transposition_table=None, deadline=None,
+        goal_test=None, symmetry=False):
+    """
+    Implements the Breadth-First Search (BFS) algorithm.
+    BFS explores all nodes at a level before moving to the next level.
+    Guarantees finding the shortest path to the goal, if it exists.
     
-    return None, explored_states, elapsed_time
+    Args:
+        initial_state (GameState): The initial game state.
+        target_score (int, optional): The target score to consider a state as a goal.
+        time_limit (int, optional): Time limit in seconds for the search.
+        transposition_table (TranspositionTable, optional): Table of visited states to use,
+            e.g. one with max_entries to bound memory or with dominance pruning.
+        deadline (Deadline, optional): Budget of the search; replaces time_limit if given.
+        goal_test (callable, optional): Function node -> bool replacing the target score test.
+        symmetry (bool, optional): Whether to visit only one of the rotated and mirrored
+            images of each position. It shrinks the frontier of some deep searches on small
+            boards, but makes each expansion slower (see search).
+        
+    Returns:
+        SearchResult: (path_found, explored_states, elapsed_time)
+            - path_found is a list of moves or None if no solution is found
+            - explored_states is the number of states explored
+            - elapsed_time is the elapsed time in seconds
+            and the other statistics of the search as attributes.
+    """
+    return search(initial_state, FIFO, target_score=target_score, time_limit=time_limit,
+                  transposition_table=transposition_table, name="Breadth-First Search (BFS)",
+                  deadline=deadline, goal_test=goal_test, symmetry=symmetry)
 
-def dfs(initial_state, target_score=500, time_limit=30):
+def dfs(initial_state, target_score=500, time_limit=30, transposition_table=None, deadline=None,
+        goal_test=None):
     """
     Implements the Depth-First Search (DFS) algorithm.
     DFS explores a branch to the end before backtracking.
@@ -300,63 +907,24 @@ def dfs(initial_state, target_score=500, time_limit=30):
         initial_state (GameState): The initial game state.
         target_score (int, optional): The target score to consider a state as a goal.
         time_limit (int, optional): Time limit in seconds for the search.
+        transposition_table (TranspositionTable, optional): Table of visited states to use,
+            e.g. one with max_entries to bound memory or with dominance pruning.
+        deadline (Deadline, optional): Budget of the search; replaces time_limit if given.
+        goal_test (callable, optional): Function node -> bool replacing the target score test.
         
     Returns:
-        tuple: (path_found, explored_states, elapsed_time)
+        SearchResult: (path_found, explored_states, elapsed_time)
             - path_found is a list of moves or None if no solution is found
             - explored_states is the number of states explored
             - elapsed_time is the elapsed time in seconds
+            and the other statistics of the search as attributes.
     """
-    print("Starting Depth-First Search (DFS)...")
-    start_time = time.time()
-    
-    # Stack of states to be explored (LIFO - Last In, First Out)
-    stack = [initial_state]
-    
-    # Set of already visited states to avoid cycles
-    visited = set()
-    visited.add(hash(initial_state))
-    
-    # Counter of explored states
-    explored_states = 0
-    
-    while stack and time.time() - start_time < time_limit:
-        # Removes the last state from the stack
-        current_state = stack.pop()
-        explored_states += 1
-        
-        # Checks if it's a goal state
-        if is_goal_state(current_state, target_score):
-            elapsed_time = time.time() - start_time
-            print(f"Solution found! Explored states: {explored_states}")
-            print(f"Elapsed time: {elapsed_time:.2f} seconds")
-            return current_state.path, explored_states, elapsed_time
-        
-        # Generates all valid moves
-        valid_moves = get_valid_moves(current_state)
-        
-        # For each valid move, generates a new state and adds it to the stack
-        # Traverses the moves in reverse order so that the first move is explored last
-        for move in reversed(valid_moves):
-            new_state = apply_move(current_state, move)
-            new_state_hash = hash(new_state)
-            
-            # Checks if the state has already been visited
-            if new_state_hash not in visited:
-                stack.append(new_state)
-                visited.add(new_state_hash)
-    
-    # If it exited the loop, it did not find a solution or exceeded the time limit
-    elapsed_time = time.time() - start_time
-    if time.time() - start_time >= time_limit:
-        print(f"Time limit exceeded! Explored states: {explored_states}")
-    else:
-        print(f"Solution not found! Explored states: {explored_states}")
-    print(f"Elapsed time: {elapsed_time:.2f} seconds")
-    
-    return None, explored_states, elapsed_time
+    return search(initial_state, LIFO, target_score=target_score, time_limit=time_limit,
+                  transposition_table=transposition_table, name="Depth-First Search (DFS)",
+                  deadline=deadline, goal_test=goal_test)
 
-def uniform_cost_search(initial_state, target_score=500, time_limit=30):
+def uniform_cost_search(initial_state, target_score=500, time_limit=30, transposition_table=None, deadline=None,
+                        goal_test=None):
     """
     Implements the Uniform Cost Search algorithm.
     This algorithm expands nodes in ascending order of cost (or descending order of score, in this case).
@@ -366,210 +934,276 @@ def uniform_cost_search(initial_state, target_score=500, time_limit=30):
         initial_state (GameState): The initial game state.
         target_score (int, optional): The target score to consider a state as a goal.
         time_limit (int, optional): Time limit in seconds for the search.
+        transposition_table (TranspositionTable, optional): Table of visited states to use,
+            e.g. one with max_entries to bound memory or with dominance pruning.
+        deadline (Deadline, optional): Budget of the search; replaces time_limit if given.
+        goal_test (callable, optional): Function node -> bool replacing the target score test.
         
     Returns:
-        tuple: (path_found, explored_states, elapsed_time)
+        SearchResult: (path_found, explored_states, elapsed_time)
             - path_found is a list of moves or None if no solution is found
             - explored_states is the number of states explored
             - elapsed_time is the elapsed time in seconds
+            and the other statistics of the search as attributes.
     """
-    print("Starting Uniform Cost Search...")
-    start_time = time.time()
-    
-    # Priority queue ordered by score (highest score first)
-    # Format: (negative score, counter, state)
-    # We use negative score because heapq orders by the lowest value
-    # Counter to break ties between states with the same score
-    priority_queue = [(initial_state.score * -1, 0, initial_state)]
-    heapq.heapify(priority_queue)
-    
-    # Counter to break ties between states with the same score
-    counter = 1
+    # The highest score is expanded first (heapq pops the lowest value)
+    return search(initial_state, PRIORITY, lambda state: -state.score,
+                  target_score=target_score, time_limit=time_limit,
+                  transposition_table=transposition_table, name="Uniform Cost Search",
+                  deadline=deadline, goal_test=goal_test)
+
+# Largest number of positions whose bounds are kept by the iterative deepening searches
+BOUND_TABLE_SIZE = 1000000
+
+def iterative_deepening_search(initial_state, max_bound=20, heuristic=None, target_score=500,
+                               time_limit=30, deadline=None, goal_test=None, first_bound=None,
+                               iterate=True, name="Iterative Deepening",
+                               max_entries=BOUND_TABLE_SIZE):
+    """
+    Iterative deepening engine shared by Depth-Limited Search, Iterative Deepening and IDA*.
+    
+    Each iteration is a depth-first search, on an explicit stack, of the states whose cost
+    f = depth + h is within a bound; the next iteration raises the bound to the lowest f that
+    exceeded it. With h = 0 the bound is the depth limit, and with an admissible h it is IDA*;
+    either way the first path found is a shortest one. Three things are kept between the
+    iterations, so that they do not redo the work of the previous ones:
+    - a table of bounds: once the subtree of a state is searched without reaching a goal,
+      the lowest f that exceeded the bound, minus the depth of the state, is a lower bound of
+      the moves the state still needs. Later iterations, and transpositions in the same one,
+      cut the state as soon as its depth plus that bound exceeds their bound;
+    - the best move of each searched state (the child whose subtree came the closest to the
+      bound), tried first the next time, so the principal variation is searched first;
+    - a history score per move, raised each time the move is the best one of a state,
+      which orders the other moves.
     
-    # Set of already visited states to avoid cycles
-    visited = set()
-    visited.add(hash(initial_state))
+    Args:
+        initial_state (GameState): The initial game state.
+        max_bound (int, optional): The largest bound (depth) to search to.
+        heuristic (callable, optional): Admissible function state -> moves to the goal
+            (by default 0).
+        target_score (int, optional): The target score to consider a state as a goal.
+        time_limit (int, optional): Time limit in seconds for the search.
+        deadline (Deadline, optional): Budget shared by all the iterations; replaces
+            time_limit if given.
+        goal_test (callable, optional): Function node -> bool replacing the target score test.
+        first_bound (int, optional): The bound of the first iteration (by default, the
+            heuristic of the initial state, and at least 1).
+        iterate (bool, optional): Whether to search with higher bounds after the first one.
+        name (str, optional): Name of the algorithm, used in the messages.
+        max_entries (int, optional): Maximum number of positions in the table of bounds.
     
-    # Counter of explored states
+    Returns:
+        SearchResult: (path_found, explored_states, elapsed_time) and the search statistics,
+            summed (or maximised) over all the iterations.
+    """
+    logger.info("Starting %s...", name)
+    start_time = time.time()
+    if deadline is None:
+        deadline = Deadline(time_limit)
+    
+    # Searches on compact nodes; the path found is the same as on the original state
+    root = SearchNode.from_state(initial_state)
+    if heuristic is None:
+        heuristic = lambda state: 0
+    if goal_test is None:
+        goal_test = lambda state: state.score >= target_score
+    # Only states with a score at most this low can be pruned
+    threshold = survival_threshold(root.board_size)
+    
+    # (position, score) -> (lower bound of the moves to a goal, best move)
+    bounds = {}
+    # Move -> history score
+    history = {}
+    
+    # Counters of explored and generated states, deepest stack and best state explored
     explored_states = 0
-    
-    while priority_queue and time.time() - start_time < time_limit:
-        # Removes the state with the highest score (lowest negative) from the queue
-        _, _, current_state = heapq.heappop(priority_queue)
+    generated_states = 0
+    max_frontier = 1
+    pruned_states = 0
+    best_state = root
+    
+    def expand(node):
+        """Returns the (f, child) pairs of a node, in the order they are searched."""
+        nonlocal generated_states, pruned_states
+        children = node.children()
+        generated_states += len(children)
+        entry = bounds.get(node.position_key() + (node.score,))
+        best_move = entry[1] if entry is not None else None
+        depth = node.depth + 1
+        ordered = []
+        for index, child in enumerate(children):
+            # Drops the states that can no longer reach the target
+            if child.score <= threshold and not can_reach_target(child, target_score):
+                pruned_states += 1
+                continue
+            estimate = heuristic(child)
+            entry = bounds.get(child.position_key() + (child.score,))
+            if entry is not None and entry[0] > estimate:
+                estimate = entry[0]
+            move = child.move
+            # Principal variation first, then the moves with the highest history score
+            ordered.append((move != best_move, -history.get(move, 0), index, depth + estimate, child))
+        ordered.sort()
+        return [(f, child) for _, _, _, f, child in ordered]
+    
+    path_found = None
+    reason = 'depth_limit'
+    bound = first_bound if first_bound is not None else max(heuristic(root), 1)
+    expired = deadline.check()
+    steps = countdown = deadline.interval
+    if goal_test(root):
+        path_found = root.path
+        reason = 'solved'
+    
+    while path_found is None and not expired:
+        logger.info("Trying bound %d...", bound)
+        # Frames: [node, ordered children, index of the next child, lowest f above the
+        # bound in the subtree, move leading to it]
         explored_states += 1
+        stack = [[root, expand(root), 0, float('inf'), None]]
+        on_path = {root}
+        next_bound = None
         
-        # Checks if it's a goal state
-        if is_goal_state(current_state, target_score):
-            elapsed_time = time.time() - start_time
-            print(f"Solution found! Explored states: {explored_states}")
-            print(f"Elapsed time: {elapsed_time:.2f} seconds")
-            return current_state.path, explored_states, elapsed_time
-        
-        # Generates all valid moves
-        valid_moves = get_valid_moves(current_state)
-        
-        # For each valid move, generates a new state and adds it to the queue
-        for move in valid_moves:
-            new_state = apply_move(current_state, move)
-            new_state_hash = hash(new_state)
+        while stack:
+            frame = stack[-1]
+            node, children, index = frame[0], frame[1], frame[2]
             
-            # Checks if the state has already been visited
-            if new_state_hash not in visited:
-                heapq.heappush(priority_queue, (new_state.score * -1, counter, new_state))
-                counter += 1
-                visited.add(new_state_hash)
-    
-    # If it exited the loop, it did not find a solution or exceeded the time limit
-    elapsed_time = time.time() - start_time
-    if time.time() - start_time >= time_limit:
-        print(f"Time limit exceeded! Explored states: {explored_states}")
-    else:
-        print(f"Solution not found! Explored states: {explored_states}")
-    print(f"Elapsed time: {elapsed_time:.2f} seconds")
-    
-    return None, explored_states, elapsed_time
+            if index == len(children):
+                # The subtree is searched: its bound and best move are kept
+                stack.pop()
+                on_path.discard(node)
+                minimum, best_move = frame[3], frame[4]
+                key = node.position_key() + (node.score,)
+                if len(bounds) < max_entries or key in bounds:
+                    bounds[key] = (minimum - node.depth, best_move)
+                if best_move is not None:
+                    remaining = bound - node.depth
+                    history[best_move] = history.get(best_move, 0) + remaining * remaining
+                if not stack:
+                    # The lowest f that exceeded the bound is the next bound
+                    next_bound = minimum
+                elif minimum < stack[-1][3]:
+                    stack[-1][3] = minimum
+                    stack[-1][4] = node.move
+                continue
+            
+            frame[2] = index + 1
+            f, child = children[index]
+            if f > bound:
+                if f < frame[3]:
+                    frame[3] = f
+                    frame[4] = child.move
+                continue
+            # Skips the states already on the current path
+            if child in on_path:
+                continue
+            
+            # Checks the budget every `steps` states
+            countdown -= 1
+            if countdown < 0:
+                expired = deadline.check(steps)
+                if expired:
+                    break
+                steps = deadline.interval
+                countdown = steps - 1
+            
+            explored_states += 1
+            if child.score > best_state.score:
+                best_state = child
+            if goal_test(child):
+                path_found = child.path
+                break
+            if child.depth >= bound:
+                # Every child of a state at the bound has f > bound: it is not expanded, and
+                # needs at least one more move
+                if bound + 1 < frame[3]:
+                    frame[3] = bound + 1
+                    frame[4] = child.move
+                continue
+            
+            stack.append([child, expand(child), 0, float('inf'), None])
+            on_path.add(child)
+            if len(stack) > max_frontier:
+                max_frontier = len(stack)
+        
+        if path_found is not None:
+            logger.info("Solution found with bound %d!", bound)
+            reason = 'solved'
+            break
+        if expired:
+            reason = deadline.reason
+            break
+        if next_bound == float('inf'):
+            reason = 'exhausted'
+            break
+        if not iterate or next_bound > max_bound:
+            reason = 'depth_limit'
+            break
+        bound = next_bound
+    
+    if not expired:
+        deadline.check(steps - countdown)
+    result = SearchResult(path_found, explored_states, time.time() - start_time, generated_states,
+                          max_frontier, deadline.peak_memory, reason, name, best_state.score,
+                          best_state.path, pruned_states)
+    _log_result(result)
+    return result
 
-def depth_limited_search(initial_state, depth_limit=10, target_score=500, time_limit=30):
+def depth_limited_search(initial_state, depth_limit=10, target_score=500, time_limit=30, deadline=None,
+                         goal_test=None):
     """
     Implements the Depth-Limited Search algorithm.
     It's a variation of DFS that limits the depth of the search.
+    It is one iteration of iterative_deepening_search, with the depth limit as its bound.
     
     Args:
         initial_state (GameState): The initial game state.
         depth_limit (int, optional): The maximum depth of the search.
         target_score (int, optional): The target score to consider a state as a goal.
         time_limit (int, optional): Time limit in seconds for the search.
-        
+        deadline (Deadline, optional): Budget of the search; replaces time_limit if given.
+        goal_test (callable, optional): Function node -> bool replacing the target score test.
+    
     Returns:
-        tuple: (path_found, explored_states, elapsed_time)
+        SearchResult: (path_found, explored_states, elapsed_time)
             - path_found is a list of moves or None if no solution is found
             - explored_states is the number of states explored
             - elapsed_time is the elapsed time in seconds
+            and the other statistics of the search as attributes.
     """
-    print(f"Starting Depth-Limited Search (limit={depth_limit})...")
-    start_time = time.time()
-    
-    # Implements the depth-limited search recursively
-    def recursive_dls(state, depth, visited):
-        nonlocal explored_states
-        
-        # Checks if it exceeded the time limit
-        if time.time() - start_time >= time_limit:
-            return None
-        
-        # Increments the explored states counter
-        explored_states += 1
-        
-        # Checks if it's a goal state
-        if is_goal_state(state, target_score):
-            return state.path
-        
-        # Reached the depth limit
-        if depth <= 0:
-            return None
-        
-        # Generates all valid moves
-        valid_moves = get_valid_moves(state)
-        
-        # For each valid move, generates a new state and does the recursive search
-        for move in valid_moves:
-            new_state = apply_move(state, move)
-            new_state_hash = hash(new_state)
-            
-            # Checks if the state has already been visited
-            if new_state_hash not in visited:
-                visited.add(new_state_hash)
-                result = recursive_dls(new_state, depth - 1, visited)
-                
-                # If a solution was found, returns it
-                if result is not None:
-                    return result
-                
-                # Removes the state from the visited set to allow exploring it in another path
-                visited.remove(new_state_hash)
-        
-        # No solution found in this branch
-        return None
-    
-    # Counter of explored states
-    explored_states = 0
-    
-    # Starts the recursive search
-    visited = set([hash(initial_state)])
-    result = recursive_dls(initial_state, depth_limit, visited)
-    
-    # Calculates the elapsed time
-    elapsed_time = time.time() - start_time
-    
-    if result is not None:
-        print(f"Solution found! Explored states: {explored_states}")
-    elif time.time() - start_time >= time_limit:
-        print(f"Time limit exceeded! Explored states: {explored_states}")
-    else:
-        print(f"Solution not found within the depth limit! Explored states: {explored_states}")
-    
-    print(f"Elapsed time: {elapsed_time:.2f} seconds")
-    
-    return result, explored_states, elapsed_time
+    return iterative_deepening_search(initial_state, depth_limit, target_score=target_score,
+                                      time_limit=time_limit, deadline=deadline, goal_test=goal_test,
+                                      first_bound=depth_limit, iterate=False,
+                                      name="Depth-Limited Search")
 
-def iterative_deepening(initial_state, max_depth=20, target_score=500, time_limit=30):
+def iterative_deepening(initial_state, max_depth=20, target_score=500, time_limit=30, deadline=None,
+                        goal_test=None):
     """
     Implements the Iterative Deepening algorithm.
     Combines the advantages of BFS and DFS, guaranteeing to find the shortest path
     to the goal, if it exists, using memory space similar to DFS.
+    Each depth reuses the bounds and move ordering learned by the previous ones (see
+    iterative_deepening_search), and skips the depths no state can reach a goal within.
     
     Args:
         initial_state (GameState): The initial game state.
         max_depth (int, optional): The maximum depth to increment to.
         target_score (int, optional): The target score to consider a state as a goal.
         time_limit (int, optional): Time limit in seconds for the search.
-        
+        deadline (Deadline, optional): Budget shared by all the iterations; replaces
+            time_limit if given.
+        goal_test (callable, optional): Function node -> bool replacing the target score test.
+    
     Returns:
-        tuple: (path_found, explored_states, elapsed_time)
+        SearchResult: (path_found, explored_states, elapsed_time)
             - path_found is a list of moves or None if no solution is found
             - explored_states is the total number of states explored
             - elapsed_time is the elapsed time in seconds
+            and the other statistics, summed (or maximised) over all the iterations.
     """
-    print("Starting Iterative Deepening...")
-    start_time = time.time()
-    
-    # Total counter of explored states
-    total_explored_states = 0
-    
-    # For each depth from 1 to max_depth
-    for depth in range(1, max_depth + 1):
-        print(f"Trying depth {depth}...")
-        
-        # Checks if it exceeded the time limit
-        if time.time() - start_time >= time_limit:
-            elapsed_time = time.time() - start_time
-            print(f"Time limit exceeded! Total explored states: {total_explored_states}")
-            print(f"Elapsed time: {elapsed_time:.2f} seconds")
-            return None, total_explored_states, elapsed_time
-        
-        # Executes the depth-limited search for this depth
-        result, explored_states, _ = depth_limited_search(
-            initial_state, depth, target_score, time_limit - (time.time() - start_time)
-        )
-        
-        # Adds the explored states to the total
-        total_explored_states += explored_states
-        
-        # If a solution was found, returns it
-        if result is not None:
-            elapsed_time = time.time() - start_time
-            print(f"Solution found at depth {depth}!")
-            print(f"Total explored states: {total_explored_states}")
-            print(f"Elapsed time: {elapsed_time:.2f} seconds")
-            return result, total_explored_states, elapsed_time
-    
-    # If it got here, no solution was found up to the maximum depth
-    elapsed_time = time.time() - start_time
-    print(f"Solution not found up to depth {max_depth}!")
-    print(f"Total explored states: {total_explored_states}")
-    print(f"Elapsed time: {elapsed_time:.2f} seconds")
-    
-    return None, total_explored_states, elapsed_time
+    return iterative_deepening_search(initial_state, max_depth, target_score=target_score,
+                                      time_limit=time_limit, deadline=deadline, goal_test=goal_test,
+                                      name="Iterative Deepening")
 
 # Heuristics for informed algorithms
 
@@ -600,6 +1234,9 @@ def heuristic_board_potential(state):
     Returns:
         float: A lower value for more promising states (heuristic for minimization).
     """
+    if isinstance(state, BitboardState):
+        return board_potential(state)
+    
     board = state.board
     board_size = state.board_size
     
@@ -623,7 +1260,152 @@ def heuristic_board_potential(state):
     # We use a negative value so that it's a minimization heuristic
     return -(row_potential + col_potential + 3 * diamond_potential)
 
-def greedy_search(initial_state, target_score=500, time_limit=30):
+def with_board_potential(key):
+    """
+    Builds the batch priority of an informed search: the key of each state (a tuple), then
+    the opposite of its board potential to break the ties, so that the boards whose started
+    lines are closest to complete, with the fewest diamonds left, come first. The potentials
+    of all the children of a node are computed at once (with NumPy when it is installed,
+    see batch_heuristics_1_4).
+    
+    Args:
+        key (callable): Function state -> tuple, the main priority of a state.
+        
+    Returns:
+        callable: Function list of states -> list of priorities, for search's batch_priority.
+    """
+    def batch_priority(states):
+        return [key(state) + (-potential,)
+                for state, potential in zip(states, board_potentials(states))]
+    return batch_priority
+
+# Bounds on the score that can still be obtained.
+# They never underestimate what a sequence of moves can gain, so they can prune states and
+# give A* an admissible estimate of the number of moves left.
+
+def _max_gains(state):
+    """
+    Yields, for m = 0, 1, 2, ..., an upper bound of the score a state can gain within m moves.
+    
+    With k placements, C = (cells of the current piece) + k - 1 cells are placed at most
+    (the following pieces are 1x1 in the search model). A line can only be cleared for the
+    first time if it has at most C empty cells, and clearing it again takes n new cells in
+    it; every placed cell belongs to one row and one column. So at most
+    min((2 * filled + 2C) // n, clearable + 2C // n) lines are cleared, only the diamonds on
+    the clearable lines can be captured, and each placement costs its penalty. Requesting
+    a new piece gains nothing.
+    """
+    board_size = state.board_size
+    difficulty = board_size - 3
+    penalty = 10 * difficulty // 2
+    filled = state.filled
+    diamonds = state.diamonds
+    row_masks, column_masks = line_masks(board_size)
+    
+    # Lines by number of empty cells
+    lines = sorted((board_size - popcount(filled & line), line) for line in row_masks + column_masks)
+    filled_cells = popcount(filled)
+    first_cells = popcount(piece_layout(board_size, state.piece)[2])
+    
+    best = 0
+    yield best
+    placements = 0
+    clearable = 0
+    clearable_cells = 0
+    next_line = 0
+    while True:
+        placements += 1
+        cells = first_cells + placements - 1
+        while next_line < len(lines) and lines[next_line][0] <= cells:
+            clearable += 1
+            clearable_cells |= lines[next_line][1]
+            next_line += 1
+        cleared = min((2 * filled_cells + 2 * cells) // board_size,
+                      clearable + 2 * cells // board_size)
+        value = 50 * difficulty * cleared - penalty * placements
+        if cleared:
+            value += 100 * difficulty * popcount(diamonds & clearable_cells)
+        if value > best:
+            best = value
+        yield best
+
+def _as_bitboard(state):
+    """Returns a BitboardState for a GameState, or the state itself."""
+    return state if isinstance(state, BitboardState) else BitboardState.from_game_state(state)
+
+def score_upper_bound(state, moves):
+    """
+    Upper bound of the score that can be reached from a state within a number of moves.
+    
+    Args:
+        state (GameState or BitboardState): The state to evaluate.
+        moves (int): The number of moves.
+        
+    Returns:
+        int: No sequence of at most `moves` moves reaches a higher score.
+    """
+    for m, gain in enumerate(_max_gains(_as_bitboard(state))):
+        if m == moves:
+            return state.score + gain
+
+def heuristic_moves_to_target(state, target_score=500):
+    """
+    Admissible heuristic: a lower bound of the number of moves needed to reach the target
+    score, from the upper bounds of the score reachable within m moves.
+    
+    Args:
+        state (GameState or BitboardState): The state to evaluate.
+        target_score (int, optional): The target score to consider a state as a goal.
+        
+    Returns:
+        int: The minimum number of moves to the target (0 for a goal state).
+    """
+    needed = target_score - state.score
+    if needed <= 0:
+        return 0
+    for m, gain in enumerate(_max_gains(_as_bitboard(state))):
+        if gain >= needed:
+            return m
+
+def survival_threshold(board_size):
+    """
+    Score above which can_reach_target never prunes a state on a board: the first line
+    clear is at most board_size moves away.
+    """
+    return 10 * (board_size - 3) // 2 * (board_size - 1)
+
+def can_reach_target(state, target_score=500):
+    """
+    Checks whether a state can still reach the target score before the game is over.
+    The game ends when the score reaches zero, and every move costs points until a line is
+    cleared: a state is lost if its score runs out before it can complete its emptiest line.
+    
+    Args:
+        state (GameState or BitboardState): The state to evaluate.
+        target_score (int, optional): The target score to consider a state as a goal.
+        
+    Returns:
+        bool: False if the target can no longer be reached.
+    """
+    if state.score >= target_score:
+        return True
+    if state.score <= 0:
+        return False
+    state = _as_bitboard(state)
+    board_size = state.board_size
+    if state.score > survival_threshold(board_size):
+        return True
+    
+    # Moves before a line can be completed: the first piece fills at most all its cells,
+    # the next ones (1x1) one cell each
+    row_masks, column_masks = line_masks(board_size)
+    fewest_empty = min(board_size - popcount(state.filled & line) for line in row_masks + column_masks)
+    first_cells = popcount(piece_layout(board_size, state.piece)[2])
+    moves_before_clear = max(0, fewest_empty - first_cells)
+    return state.score > 10 * (board_size - 3) // 2 * moves_before_clear
+
+def greedy_search(initial_state, target_score=500, time_limit=30, transposition_table=None, deadline=None,
+                  goal_test=None):
     """
     Implements the Greedy Search algorithm.
     This algorithm uses a heuristic to estimate how close each state is to the goal,
@@ -633,154 +1415,73 @@ def greedy_search(initial_state, target_score=500, time_limit=30):
         initial_state (GameState): The initial game state.
         target_score (int, optional): The target score to consider a state as a goal.
         time_limit (int, optional): Time limit in seconds for the search.
+        transposition_table (TranspositionTable, optional): Table of visited states to use,
+            e.g. one with max_entries to bound memory or with dominance pruning.
+        deadline (Deadline, optional): Budget of the search; replaces time_limit if given.
+        goal_test (callable, optional): Function node -> bool replacing the target score test.
         
     Returns:
-        tuple: (path_found, explored_states, elapsed_time)
+        SearchResult: (path_found, explored_states, elapsed_time)
             - path_found is a list of moves or None if no solution is found
             - explored_states is the number of states explored
             - elapsed_time is the elapsed time in seconds
+            and the other statistics of the search as attributes.
     """
-    print("Starting Greedy Search...")
-    start_time = time.time()
-    
-    # Priority queue ordered by heuristic (lowest value first)
-    # Format: (heuristic, counter, state)
-    priority_queue = [(heuristic_score_potential(initial_state, target_score), 0, initial_state)]
-    heapq.heapify(priority_queue)
-    
-    # Counter to break ties between states with the same heuristic
-    counter = 1
-    
-    # Set of already visited states to avoid cycles
-    visited = set()
-    visited.add(hash(initial_state))
-    
-    # Counter of explored states
-    explored_states = 0
-    
-    while priority_queue and time.time() - start_time < time_limit:
-        # Removes the state with the lowest heuristic value from the queue
-        _, _, current_state = heapq.heappop(priority_queue)
-        explored_states += 1
-        
-        # Checks if it's a goal state
-        if is_goal_state(current_state, target_score):
-            elapsed_time = time.time() - start_time
-            print(f"Solution found! Explored states: {explored_states}")
-            print(f"Elapsed time: {elapsed_time:.2f} seconds")
-            return current_state.path, explored_states, elapsed_time
-        
-        # Generates all valid moves
-        valid_moves = get_valid_moves(current_state)
-        
-        # For each valid move, generates a new state and adds it to the queue
-        for move in valid_moves:
-            new_state = apply_move(current_state, move)
-            new_state_hash = hash(new_state)
-            
-            # Checks if the state has already been visited
-            if new_state_hash not in visited:
-                h_value = heuristic_score_potential(new_state, target_score)
-                heapq.heappush(priority_queue, (h_value, counter, new_state))
-                counter += 1
-                visited.add(new_state_hash)
-    
-    # If it exited the loop, it did not find a solution or exceeded the time limit
-    elapsed_time = time.time() - start_time
-    if time.time() - start_time >= time_limit:
-        print(f"Time limit exceeded! Explored states: {explored_states}")
-    else:
-        print(f"Solution not found! Explored states: {explored_states}")
-    print(f"Elapsed time: {elapsed_time:.2f} seconds")
-    
-    return None, explored_states, elapsed_time
+    # The lowest heuristic value is expanded first, and the board breaks the ties
+    return search(initial_state, PRIORITY,
+                  batch_priority=with_board_potential(
+                      lambda state: (heuristic_score_potential(state, target_score),)),
+                  target_score=target_score, time_limit=time_limit,
+                  transposition_table=transposition_table, name="Greedy Search",
+                  deadline=deadline, goal_test=goal_test)
 
-def a_star_search(initial_state, target_score=500, time_limit=30):
+def a_star_search(initial_state, target_score=500, time_limit=30, transposition_table=None, deadline=None,
+                  goal_test=None):
     """
     Implements the A* (A-Star) algorithm.
     This algorithm combines the cost of the path so far with a heuristic
     to estimate the remaining cost to the goal.
+    The cost is the number of moves, and the heuristic never overestimates the moves left,
+    so the path found is a shortest one (like BFS), reached exploring fewer states.
     
     Args:
         initial_state (GameState): The initial game state.
         target_score (int, optional): The target score to consider a state as a goal.
         time_limit (int, optional): Time limit in seconds for the search.
+        transposition_table (TranspositionTable, optional): Table of visited states to use,
+            e.g. one with max_entries to bound memory or with dominance pruning.
+        deadline (Deadline, optional): Budget of the search; replaces time_limit if given.
+        goal_test (callable, optional): Function node -> bool replacing the target score test.
         
     Returns:
-        tuple: (path_found, explored_states, elapsed_time)
+        SearchResult: (path_found, explored_states, elapsed_time)
             - path_found is a list of moves or None if no solution is found
             - explored_states is the number of states explored
             - elapsed_time is the elapsed time in seconds
+            and the other statistics of the search as attributes.
     """
-    print("Starting A* (A-Star) Search...")
-    start_time = time.time()
-    
-    # Priority queue ordered by the function f(n) = g(n) + h(n)
-    # g(n) is the cost so far (represented by the score)
-    # h(n) is the heuristic (estimate of the remaining cost)
-    # Format: (f_value, counter, state)
-    
-    # We calculate the f(n) function as a combination of cost and heuristic
-    # We want to maximize the score, so g(n) = score
-    # And we want to minimize the distance to the goal, so h(n) = heuristic
-    initial_h = heuristic_score_potential(initial_state, target_score)
-    initial_g = initial_state.score
-    initial_f = initial_h - initial_g  # We minimize f = h - g
-    
-    priority_queue = [(initial_f, 0, initial_state)]
-    heapq.heapify(priority_queue)
-    
-    # Counter to break ties between states with the same f value
-    counter = 1
-    
-    # Set of already visited states to avoid cycles
-    visited = set()
-    visited.add(hash(initial_state))
-    
-    # Counter of explored states
-    explored_states = 0
-    
-    while priority_queue and time.time() - start_time < time_limit:
-        # Removes the state with the lowest f value from the queue
-        _, _, current_state = heapq.heappop(priority_queue)
-        explored_states += 1
-        
-        # Checks if it's a goal state
-        if is_goal_state(current_state, target_score):
-            elapsed_time = time.time() - start_time
-            print(f"Solution found! Explored states: {explored_states}")
-            print(f"Elapsed time: {elapsed_time:.2f} seconds")
-            return current_state.path, explored_states, elapsed_time
-        
-        # Generates all valid moves
-        valid_moves = get_valid_moves(current_state)
-        
-        # For each valid move, generates a new state and adds it to the queue
-        for move in valid_moves:
-            new_state = apply_move(current_state, move)
-            new_state_hash = hash(new_state)
-            
-            # Checks if the state has already been visited
-            if new_state_hash not in visited:
-                h_value = heuristic_score_potential(new_state, target_score)
-                g_value = new_state.score
-                f_value = h_value - g_value  # We minimize f = h - g
-                
-                heapq.heappush(priority_queue, (f_value, counter, new_state))
-                counter += 1
-                visited.add(new_state_hash)
-    
-    # If it exited the loop, it did not find a solution or exceeded the time limit
-    elapsed_time = time.time() - start_time
-    if time.time() - start_time >= time_limit:
-        print(f"Time limit exceeded! Explored states: {explored_states}")
-    else:
-        print(f"Solution not found! Explored states: {explored_states}")
-    print(f"Elapsed time: {elapsed_time:.2f} seconds")
-    
-    return None, explored_states, elapsed_time
+    # g(n) is the number of moves made so far
+    # h(n) is an admissible lower bound of the number of moves left (heuristic_moves_to_target)
+    # We minimize f = g + h, and prefer the highest score, then the board closest to
+    # completing its lines, among equal f values
+    return search(initial_state, PRIORITY,
+                  batch_priority=with_board_potential(
+                      lambda state: (state.depth + heuristic_moves_to_target(state, target_score),
+                                     -state.score)),
+                  target_score=target_score, time_limit=time_limit,
+                  transposition_table=transposition_table, name="A* (A-Star) Search",
+                  deadline=deadline, goal_test=goal_test)
 
-def weighted_a_star(initial_state, weight=1.2, target_score=500, time_limit=30):
+# Weight of the heuristic of Weighted A* when run by the game and the comparisons
+DEFAULT_WEIGHT = 1.5
+# Number of states kept at each level by Beam Search
+DEFAULT_BEAM_WIDTH = 64
+# First weight of Anytime Weighted A*, and how much it is lowered after each solution
+ANYTIME_INITIAL_WEIGHT = 3.0
+ANYTIME_WEIGHT_STEP = 0.5
+
+def weighted_a_star(initial_state, weight=1.2, target_score=500, time_limit=30, transposition_table=None, deadline=None,
+                    goal_test=None):
     """
     Implements the Weighted A* algorithm.
     This algorithm gives more weight to the heuristic, speeding up the search,
@@ -791,240 +1492,787 @@ def weighted_a_star(initial_state, weight=1.2, target_score=500, time_limit=30):
         weight (float, optional): The weight given to the heuristic (w > 1).
         target_score (int, optional): The target score to consider a state as a goal.
         time_limit (int, optional): Time limit in seconds for the search.
+        transposition_table (TranspositionTable, optional): Table of visited states to use,
+            e.g. one with max_entries to bound memory or with dominance pruning.
+        deadline (Deadline, optional): Budget of the search; replaces time_limit if given.
+        goal_test (callable, optional): Function node -> bool replacing the target score test.
         
     Returns:
-        tuple: (path_found, explored_states, elapsed_time)
+        SearchResult: (path_found, explored_states, elapsed_time)
             - path_found is a list of moves or None if no solution is found
             - explored_states is the number of states explored
             - elapsed_time is the elapsed time in seconds
+            and the other statistics of the search as attributes.
     """
-    print(f"Starting Weighted A* Search with weight {weight}...")
-    start_time = time.time()
-    
-    # Priority queue ordered by the function f(n) = g(n) + w*h(n)
-    # g(n) is the cost so far (represented by the score)
-    # h(n) is the heuristic (estimate of the remaining cost)
+    # g(n) is the number of moves made so far
+    # h(n) is an admissible lower bound of the number of moves left (heuristic_moves_to_target)
     # w is the weight given to the heuristic
-    # Format: (f_value, counter, state)
-    
-    initial_h = heuristic_score_potential(initial_state, target_score)
-    initial_g = initial_state.score
-    initial_f = weight * initial_h - initial_g  # We minimize f = w*h - g
+    # We minimize f = g + w*h, and prefer the highest score, then the board closest to
+    # completing its lines, among equal f values
+    return search(initial_state, PRIORITY,
+                  batch_priority=with_board_potential(
+                      lambda state: (state.depth + weight * heuristic_moves_to_target(state, target_score),
+                                     -state.score)),
+                  target_score=target_score, time_limit=time_limit,
+                  transposition_table=transposition_table,
+                  name=f"Weighted A* Search with weight {weight}", deadline=deadline,
+                  goal_test=goal_test)
+
+def beam_search(initial_state, beam_width=DEFAULT_BEAM_WIDTH, target_score=500, time_limit=30,
+                transposition_table=None, deadline=None, goal_test=None, prune=True):
+    """
+    Implements the Beam Search algorithm.
+    It explores the states level by level, like BFS, but only keeps the beam_width most
+    promising states of each level, ranked like in A* (fewest moves left according to
+    heuristic_moves_to_target, then highest score, then the board closest to completing its
+    lines). The work per level is bounded, so it answers quickly even on large boards, but
+    it is not complete: a solution whose states were dropped from the beam is never found.
     
-    priority_queue = [(initial_f, 0, initial_state)]
-    heapq.heapify(priority_queue)
+    Args:
+        initial_state (GameState): The initial game state.
+        beam_width (int, optional): Number of states kept at each level.
+        target_score (int, optional): The target score to consider a state as a goal.
+        time_limit (int, optional): Time limit in seconds for the search.
+        transposition_table (TranspositionTable, optional): Table of visited states to use,
+            e.g. one with max_entries to bound memory or with dominance pruning.
+        deadline (Deadline, optional): Budget of the search; replaces time_limit if given.
+        goal_test (callable, optional): Function node -> bool replacing the target score test.
+        prune (bool, optional): Whether to drop the states that can no longer reach the
+            target score before the game is over (see can_reach_target).
     
-    # Counter to break ties between states with the same f value
-    counter = 1
+    Returns:
+        SearchResult: (path_found, explored_states, elapsed_time)
+            - path_found is a list of moves or None if no solution is found
+            - explored_states is the number of states explored
+            - elapsed_time is the elapsed time in seconds
+            and the other statistics of the search as attributes.
+    """
+    name = f"Beam Search with width {beam_width}"
+    logger.info("Starting %s...", name)
+    start_time = time.time()
+    if deadline is None:
+        deadline = Deadline(time_limit)
+    
+    root = SearchNode.from_state(initial_state)
+    visited = transposition_table if transposition_table is not None else TranspositionTable()
+    visited.add(root)
+    add_visited = visited.add
+    rank = with_board_potential(
+        lambda state: (heuristic_moves_to_target(state, target_score), -state.score))
+    threshold = survival_threshold(root.board_size) if prune else float('-inf')
+    
+    # Counters of explored and generated states, largest level seen and best state explored
+    explored_states = 0
+    generated_states = 0
+    max_frontier = 1
+    pruned_states = 0
+    best_state = root
+    path = None
+    
+    # The budget is only checked once every `steps` expansions
+    expired = deadline.check()
+    steps = countdown = deadline.interval
+    
+    beam = [root]
+    while beam and not expired and path is None:
+        candidates = []
+        for current_state in beam:
+            countdown -= 1
+            if countdown < 0:
+                expired = deadline.check(steps)
+                if expired:
+                    break
+                steps = deadline.interval
+                countdown = steps - 1
+            
+            explored_states += 1
+            if current_state.score > best_state.score:
+                best_state = current_state
+            
+            # Checks if it's a goal state (the beam is sorted, so the most promising goal wins)
+            if (goal_test(current_state) if goal_test is not None
+                    else current_state.score >= target_score):
+                path = current_state.path
+                break
+            
+            children = current_state.children()
+            generated_states += len(children)
+            for new_state in children:
+                # Drops the states that can no longer reach the target
+                if new_state.score <= threshold and not can_reach_target(new_state, target_score):
+                    pruned_states += 1
+                    continue
+                if add_visited(new_state):
+                    candidates.append(new_state)
+        
+        if len(candidates) > max_frontier:
+            max_frontier = len(candidates)
+        # Keeps the best beam_width states of the next level, in order (ties in generation order)
+        ranked = heapq.nsmallest(beam_width, zip(rank(candidates), range(len(candidates)), candidates))
+        beam = [state for _, _, state in ranked]
+    
+    if not expired:
+        deadline.check(steps - countdown)
+    if path is not None:
+        reason = 'solved'
+    elif expired:
+        reason = deadline.reason
+    else:
+        reason = 'exhausted'
+    result = SearchResult(path, explored_states, time.time() - start_time, generated_states,
+                          max_frontier, deadline.peak_memory, reason, name,
+                          best_state.score, best_state.path, pruned_states)
+    _log_result(result)
+    return result
+
+def anytime_weighted_a_star(initial_state, initial_weight=ANYTIME_INITIAL_WEIGHT,
+                            weight_step=ANYTIME_WEIGHT_STEP, target_score=500, time_limit=30,
+                            deadline=None, goal_test=None, prune=True):
+    """
+    Implements an Anytime Repairing A* (ARA*) search.
+    It runs Weighted A* with a high weight to find a first solution quickly, then lowers the
+    weight step by step and keeps improving the solution until the budget runs out or the
+    weight reaches 1, when the solution is a shortest one. Each improvement reuses the work
+    of the previous ones: only the states whose number of moves was improved after they
+    were expanded are expanded again, and states that cannot beat the current solution
+    (moves + heuristic_moves_to_target at least its length) are dropped.
+    Running out of budget is not a failure once a solution was found: the best one is returned.
     
-    # Set of already visited states to avoid cycles
-    visited = set()
-    visited.add(hash(initial_state))
+    Args:
+        initial_state (GameState): The initial game state.
+        initial_weight (float, optional): Weight of the heuristic of the first search (w > 1).
+        weight_step (float, optional): Amount the weight is lowered by after each solution.
+        target_score (int, optional): The target score to consider a state as a goal.
+        time_limit (int, optional): Time limit in seconds for the search.
+        deadline (Deadline, optional): Budget of the search; replaces time_limit if given.
+        goal_test (callable, optional): Function node -> bool replacing the target score test.
+        prune (bool, optional): Whether to drop the states that can no longer reach the
+            target score before the game is over (see can_reach_target).
     
-    # Counter of explored states
+    Returns:
+        SearchResult: (path_found, explored_states, elapsed_time)
+            - path_found is the best list of moves found, or None if no solution is found
+            - explored_states is the number of states explored
+            - elapsed_time is the elapsed time in seconds
+            and the other statistics of the search as attributes.
+    """
+    name = "Anytime Weighted A* Search"
+    logger.info("Starting %s...", name)
+    start_time = time.time()
+    if deadline is None:
+        deadline = Deadline(time_limit)
+    
+    root = SearchNode.from_state(initial_state)
+    threshold = survival_threshold(root.board_size) if prune else float('-inf')
+    weight = initial_weight
+    
+    # Shortest known node of each state (its depth is the g value of the state)
+    best_nodes = {root: root}
+    # Format: (f, -score, -board potential, counter, h, node), ordered like in Weighted A*;
+    # entries of replaced nodes are skipped when popped
+    root_h = heuristic_moves_to_target(root, target_score)
+    nodes = [(weight * root_h, -root.score, -board_potential(root), 0, root_h, root)]
+    counter = 1
+    closed = set()
+    # Closed states reached again with fewer moves, expanded again after the next solution
+    inconsistent = []
+    # Best goal found so far and its number of moves
+    incumbent = None
+    bound = float('inf')
+    
+    # Counters of explored and generated states, largest frontier seen and best state explored
     explored_states = 0
-    
-    while priority_queue and time.time() - start_time < time_limit:
-        # Removes the state with the lowest f value from the queue
-        _, _, current_state = heapq.heappop(priority_queue)
-        explored_states += 1
-        
-        # Checks if it's a goal state
-        if is_goal_state(current_state, target_score):
-            elapsed_time = time.time() - start_time
-            print(f"Solution found! Explored states: {explored_states}")
-            print(f"Elapsed time: {elapsed_time:.2f} seconds")
-            return current_state.path, explored_states, elapsed_time
-        
-        # Generates all valid moves
-        valid_moves = get_valid_moves(current_state)
-        
-        # For each valid move, generates a new state and adds it to the queue
-        for move in valid_moves:
-            new_state = apply_move(current_state, move)
-            new_state_hash = hash(new_state)
+    generated_states = 0
+    max_frontier = 1
+    pruned_states = 0
+    best_state = root
+    
+    # The budget is only checked once every `steps` expansions
+    expired = deadline.check()
+    steps = countdown = deadline.interval
+    
+    while not expired:
+        # Improves the solution with the current weight, while a better one may exist
+        while nodes and nodes[0][0] < bound:
+            countdown -= 1
+            if countdown < 0:
+                expired = deadline.check(steps)
+                if expired:
+                    break
+                steps = deadline.interval
+                countdown = steps - 1
+            
+            current_state = heapq.heappop(nodes)[-1]
+            if best_nodes[current_state] is not current_state or current_state in closed:
+                continue
+            closed.add(current_state)
+            explored_states += 1
+            if current_state.score > best_state.score:
+                best_state = current_state
             
-            # Checks if the state has already been visited
-            if new_state_hash not in visited:
-                h_value = heuristic_score_potential(new_state, target_score)
-                g_value = new_state.score
-                f_value = weight * h_value - g_value  # We minimize f = w*h - g
+            # Goals are not expanded: their successors cannot give a shorter solution
+            if (goal_test(current_state) if goal_test is not None
+                    else current_state.score >= target_score):
+                if current_state.depth < bound:
+                    incumbent = current_state
+                    bound = current_state.depth
+                    logger.info("Solution with %d moves found with weight %.2f", bound, weight)
+                continue
+            
+            children = current_state.children()
+            generated_states += len(children)
+            new_states = []
+            estimates = []
+            for new_state in children:
+                # Drops the states that can no longer reach the target, or not in fewer moves
+                if new_state.score <= threshold and not can_reach_target(new_state, target_score):
+                    pruned_states += 1
+                    continue
+                h = heuristic_moves_to_target(new_state, target_score)
+                if new_state.depth + h >= bound:
+                    pruned_states += 1
+                    continue
                 
-                heapq.heappush(priority_queue, (f_value, counter, new_state))
+                known = best_nodes.get(new_state)
+                if known is not None and known.depth <= new_state.depth:
+                    continue
+                best_nodes[new_state] = new_state
+                new_states.append(new_state)
+                estimates.append(h)
+            
+            # Evaluates the new children together
+            for new_state, h, potential in zip(new_states, estimates, board_potentials(new_states)):
+                if new_state in closed:
+                    inconsistent.append((h, -potential, new_state))
+                else:
+                    heapq.heappush(nodes, (new_state.depth + weight * h, -new_state.score,
+                                           -potential, counter, h, new_state))
+                    counter += 1
+            
+            if len(nodes) > max_frontier:
+                max_frontier = len(nodes)
+        
+        if expired or weight <= 1 or not (nodes or inconsistent):
+            break
+        
+        # Lowers the weight and reorders the open states, with the inconsistent ones
+        weight = max(1.0, weight - weight_step)
+        entries = [(h, potential, state) for _, _, potential, _, h, state in nodes
+                   if best_nodes[state] is state and state not in closed] + inconsistent
+        nodes = []
+        for h, potential, state in entries:
+            if state.depth + h < bound:
+                nodes.append((state.depth + weight * h, -state.score, potential, counter, h, state))
                 counter += 1
-                visited.add(new_state_hash)
-    
-    # If it exited the loop, it did not find a solution or exceeded the time limit
-    elapsed_time = time.time() - start_time
-    if time.time() - start_time >= time_limit:
-        print(f"Time limit exceeded! Explored states: {explored_states}")
+        heapq.heapify(nodes)
+        closed = set()
+        inconsistent = []
+    
+    if not expired:
+        deadline.check(steps - countdown)
+    if incumbent is not None:
+        reason = 'solved'
+    elif expired:
+        reason = deadline.reason
     else:
-        print(f"Solution not found! Explored states: {explored_states}")
-    print(f"Elapsed time: {elapsed_time:.2f} seconds")
+        reason = 'exhausted'
+    path = incumbent.path if incumbent is not None else None
+    result = SearchResult(path, explored_states, time.time() - start_time, generated_states,
+                          max_frontier, deadline.peak_memory, reason, name,
+                          best_state.score, best_state.path, pruned_states)
+    _log_result(result)
+    return result
+
+def ida_star(initial_state, max_depth=20, target_score=500, time_limit=30, deadline=None,
+             goal_test=None):
+    """
+    Implements the IDA* (Iterative Deepening A*) algorithm.
+    It searches depth-first with a bound on f = g + h, the same cost as A*, and raises the
+    bound until a goal is within it: the path found is a shortest one, as with A*, but the
+    memory used is that of a depth-first search plus the table of bounds, which is shared
+    by the iterations (see iterative_deepening_search).
+    
+    Args:
+        initial_state (GameState): The initial game state.
+        max_depth (int, optional): The largest bound (number of moves) to search to.
+        target_score (int, optional): The target score to consider a state as a goal.
+        time_limit (int, optional): Time limit in seconds for the search.
+        deadline (Deadline, optional): Budget shared by all the iterations; replaces
+            time_limit if given.
+        goal_test (callable, optional): Function node -> bool replacing the target score test.
     
-    return None, explored_states, elapsed_time
+    Returns:
+        SearchResult: (path_found, explored_states, elapsed_time)
+            - path_found is a list of moves or None if no solution is found
+            - explored_states is the total number of states explored
+            - elapsed_time is the elapsed time in seconds
+            and the other statistics, summed (or maximised) over all the iterations.
+    """
+    return iterative_deepening_search(initial_state, max_depth,
+                                      lambda state: heuristic_moves_to_target(state, target_score),
+                                      target_score, time_limit, deadline, goal_test,
+                                      name="IDA* Search")
+
+# Algorithms compared by compare_algorithms: (name, function, arguments before target_score)
+COMPARED_ALGORITHMS = [
+    ('BFS', bfs, ()),
+    ('DFS', dfs, ()),
+    ('Uniform Cost', uniform_cost_search, ()),
+    ('Depth Limited', depth_limited_search, (10,)),
+    ('Iterative Deepening', iterative_deepening, (20,)),
+    ('Greedy Search', greedy_search, ()),
+    ('A* Search', a_star_search, ()),
+    ('Weighted A* Search', weighted_a_star, (DEFAULT_WEIGHT,)),
+    ('Beam Search', beam_search, (DEFAULT_BEAM_WIDTH,)),
+    ('Anytime Weighted A*', anytime_weighted_a_star, (ANYTIME_INITIAL_WEIGHT, ANYTIME_WEIGHT_STEP)),
+    ('IDA* Search', ida_star, (20,)),
+]
+
+def _run_compared_algorithm(name, initial_state, target_score, end_time, max_memory):
+    """
+    Runs one of COMPARED_ALGORITHMS in a worker process of a parallel comparison.
+    The search gets the time left until end_time and stops if the worker uses more than
+    max_memory bytes.
+    """
+    _, algorithm, arguments = next(entry for entry in COMPARED_ALGORITHMS if entry[0] == name)
+    deadline = Deadline(max(end_time - time.time(), 0), max_memory=max_memory)
+    return algorithm(initial_state, *arguments, target_score, deadline=deadline)
 
 # Function to compare all algorithms on the same problem
-def compare_algorithms(initial_state, target_score=500, time_limit=30):
+def compare_algorithms(initial_state, target_score=500, time_limit=30, parallel=False,
+                       max_workers=None, max_memory=None):
     """
     Compares the performance of all implemented algorithms on the same problem.
+    Nothing is printed; use render_comparison to show the results as a table.
+    
+    In parallel mode each algorithm runs in its own process of a ProcessPoolExecutor, and
+    all of them share one wall-clock deadline: the comparison takes about time_limit seconds
+    instead of one time_limit per algorithm. With fewer workers than algorithms, the ones
+    that start later only get the time left.
     
     Args:
         initial_state (GameState): The initial game state.
         target_score (int, optional): The target score to consider a state as a goal.
         time_limit (int, optional): Time limit in seconds for each algorithm.
+        parallel (bool, optional): Whether to run the algorithms in parallel processes.
+        max_workers (int, optional): Number of worker processes (by default, one per algorithm).
+        max_memory (int, optional): Memory limit of each worker process in bytes, in parallel
+            mode (None for no limit).
     
     Returns:
-        dict: A dictionary with the results of each algorithm.
+        dict: The SearchResult of each algorithm, by algorithm name.
     """
     results = {}
+    if not parallel:
+        for name, algorithm, arguments in COMPARED_ALGORITHMS:
+            results[name] = algorithm(initial_state, *arguments, target_score, time_limit)
+        return results
+    
+    start_time = time.time()
+    end_time = start_time + time_limit
+    with ProcessPoolExecutor(max_workers or len(COMPARED_ALGORITHMS)) as executor:
+        futures = {name: executor.submit(_run_compared_algorithm, name, initial_state,
+                                         target_score, end_time, max_memory)
+                   for name, _, _ in COMPARED_ALGORITHMS}
+        # Gathers the results in the usual order; a failed worker does not stop the others
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as error:
+                logger.warning("%s failed: %r", name, error)
+                results[name] = SearchResult(None, 0, time.time() - start_time,
+                                             reason='error', algorithm=name)
+    return results
+
+def _format_memory(memory):
+    """Formats a number of bytes in MiB, or '-' if unknown."""
+    return f"{memory / (1024 * 1024):.1f}" if memory is not None else "-"
+
+def render_comparison(results):
+    """
+    Renders the results of compare_algorithms as a text table.
     
-    print("\n" + "="*50)
-    print("ALGORITHM COMPARISON")
-    print("="*50 + "\n")
-    
-    # BFS
-    print("\n" + "-"*50)
-    path_bfs, explored_bfs, time_bfs = bfs(initial_state, target_score, time_limit)
-    results['BFS'] = {
-        'path': path_bfs,
-        'path_length': len(path_bfs) if path_bfs else None,
-        'explored_states': explored_bfs,
-        'time': time_bfs
-    }
-    
-    # DFS
-    print("\n" + "-"*50)
-    path_dfs, explored_dfs, time_dfs = dfs(initial_state, target_score, time_limit)
-    results['DFS'] = {
-        'path': path_dfs,
-        'path_length': len(path_dfs) if path_dfs else None,
-        'explored_states': explored_dfs,
-        'time': time_dfs
-    }
-    
-    # Uniform Cost
-    print("\n" + "-"*50)
-    path_ucs, explored_ucs, time_ucs = uniform_cost_search(initial_state, target_score, time_limit)
-    results['Uniform Cost'] = {
-        'path': path_ucs,
-        'path_length': len(path_ucs) if path_ucs else None,
-        'explored_states': explored_ucs,
-        'time': time_ucs
-    }
-    
-    # Depth Limited
-    print("\n" + "-"*50)
-    depth_limit = 10
-    path_dls, explored_dls, time_dls = depth_limited_search(initial_state, depth_limit, target_score, time_limit)
-    results['Depth Limited'] = {
-        'path': path_dls,
-        'path_length': len(path_dls) if path_dls else None,
-        'explored_states': explored_dls,
-        'time': time_dls
-    }
-    
-    # Iterative Deepening
-    print("\n" + "-"*50)
-    path_ids, explored_ids, time_ids = iterative_deepening(initial_state, 20, target_score, time_limit)
-    results['Iterative Deepening'] = {
-        'path': path_ids,
-        'path_length': len(path_ids) if path_ids else None,
-        'explored_states': explored_ids,
-        'time': time_ids
-    }
-    
-    # Greedy Search
-    print("\n" + "-"*50)
-    path_greedy, explored_greedy, time_greedy = greedy_search(initial_state, target_score, time_limit)
-    results['Greedy Search'] = {
-        'path': path_greedy,
-        'path_length': len(path_greedy) if path_greedy else None,
-        'explored_states': explored_greedy,
-        'time': time_greedy
-    }
-    
-    # A* Search
-    print("\n" + "-"*50)
-    path_astar, explored_astar, time_astar = a_star_search(initial_state, target_score, time_limit)
-    results['A* Search'] = {
-        'path': path_astar,
-        'path_length': len(path_astar) if path_astar else None,
-        'explored_states': explored_astar,
-        'time': time_astar
-    }
-    
-    # Weighted A* Search
-    print("\n" + "-"*50)
-    path_wastar, explored_wastar, time_wastar = weighted_a_star(initial_state, 1.5, target_score, time_limit)
-    results['Weighted A* Search'] = {
-        'path': path_wastar,
-        'path_length': len(path_wastar) if path_wastar else None,
-        'explored_states': explored_wastar,
-        'time': time_wastar
-    }
-    
-    # Prints a summary of the results
-    print("\n" + "="*50)
-    print("RESULTS SUMMARY")
-    print("="*50)
-    
-    print(f"{'Algorithm':<20} {'Found solution':<20} {'Path length':<20} {'Explored states':<20} {'Time (s)':<15}")
-    print("-"*95)
+    Args:
+        results (dict): The SearchResult of each algorithm, by algorithm name.
     
+    Returns:
+        str: The table with the results summary.
+    """
+    header = (f"{'Algorithm':<20} {'Found solution':<15} {'Path length':<12} {'Explored states':<16} "
+              f"{'Generated':<12} {'Max frontier':<13} {'Peak mem (MiB)':<15} {'Time (s)':<9} {'Stop reason'}")
+    lines = ["=" * len(header), "RESULTS SUMMARY", "=" * len(header), header, "-" * len(header)]
     for algo, result in results.items():
-        found = "Yes" if result['path'] else "No"
-        path_length = result['path_length'] if result['path_length'] else "-"
-        print(f"{algo:<20} {found:<20} {path_length:<20} {result['explored_states']:<20} {result['time']:.2f}")
+        found = "Yes" if result.path is not None else "No"
+        path_length = result.path_length if result.path_length is not None else "-"
+        lines.append(f"{algo:<20} {found:<15} {path_length:<12} {result.explored_states:<16} "
+                     f"{result.generated_states:<12} {result.max_frontier:<13} "
+                     f"{_format_memory(result.peak_memory):<15} {result.elapsed_time:<9.2f} "
+                     f"{result.reason}")
+    return "\n".join(lines)
+
+# Helper functions for integration with the main game
+
+# Algorithms available to get_ai_move: name -> (function, arguments before target_score)
+AI_ALGORITHMS = {
+    'bfs': (bfs, ()),
+    'dfs': (dfs, ()),
+    'ucs': (uniform_cost_search, ()),
+    'dls': (depth_limited_search, (10,)),
+    'ids': (iterative_deepening, (20,)),
+    'greedy': (greedy_search, ()),
+    'astar': (a_star_search, ()),
+    'wastar': (weighted_a_star, (DEFAULT_WEIGHT,)),
+    'beam': (beam_search, (DEFAULT_BEAM_WIDTH,)),
+    'anytime': (anytime_weighted_a_star, (ANYTIME_INITIAL_WEIGHT, ANYTIME_WEIGHT_STEP)),
+    'idastar': (ida_star, (20,)),
+}
+
+def _search_root_moves(algorithm, initial_state, moves, target_score, end_time, max_memory):
+    """
+    Searches the subtrees of some root moves, one after the other, in a worker process of
+    root_split_search. Each subtree gets an equal share of the time left until end_time.
     
+    Returns:
+        list: (move, SearchResult) for each move.
+    """
+    function, arguments = AI_ALGORITHMS[algorithm]
+    results = []
+    for index, move in enumerate(moves):
+        share = (end_time - time.time()) / (len(moves) - index)
+        deadline = Deadline(max(share, 0), max_memory=max_memory)
+        child = apply_move(initial_state, move)
+        results.append((move, function(child, *arguments, target_score, deadline=deadline)))
     return results
 
-# Helper functions for integration with the main game
+def _best_root_move(move_results):
+    """
+    Picks the best first move of a root-split search: the one reaching the goal in the fewest
+    moves if any subtree reached it, otherwise the one leading to the highest score seen.
+    Ties keep the order of the moves.
+    """
+    solved = [(move, result) for move, result in move_results if result.path is not None]
+    if solved:
+        return min(solved, key=lambda item: len(item[1].path))[0]
+    scored = [(move, result) for move, result in move_results if result.best_score is not None]
+    if scored:
+        return max(scored, key=lambda item: item[1].best_score)[0]
+    return None
+
+def root_split_search(initial_state, algorithm='bfs', target_score=500, time_limit=10,
+                      max_workers=None, max_memory=None):
+    """
+    Searches the subtree of each root move in parallel and picks the best first move.
+    The valid moves of the root are dealt out to worker processes, which search their
+    subtrees with the chosen algorithm under one shared wall-clock deadline.
+    
+    Args:
+        initial_state (GameState or BitboardState): The current state.
+        algorithm (str, optional): Name of the algorithm (a key of AI_ALGORITHMS).
+        target_score (int, optional): The target score for the search.
+        time_limit (float, optional): Time limit in seconds for the whole search.
+        max_workers (int, optional): Number of worker processes (by default, one per CPU).
+        max_memory (int, optional): Memory limit of each worker process in bytes.
+    
+    Returns:
+        move: The best first move, or None if the state is already a goal or has no moves.
+    """
+    end_time = time.time() + time_limit
+    moves = get_valid_moves(initial_state)
+    if not moves or is_goal_state(initial_state, target_score):
+        return None
+    
+    workers = min(max_workers or os.cpu_count() or 1, len(moves))
+    move_results = []
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(_search_root_moves, algorithm, initial_state, moves[i::workers],
+                                   target_score, end_time, max_memory)
+                   for i in range(workers)]
+        for future in futures:
+            try:
+                move_results.extend(future.result())
+            except Exception as error:
+                logger.warning("Root-split worker failed: %r", error)
+    
+    # Restores the order of the moves, so that ties are broken as in a serial search
+    order = {move: index for index, move in enumerate(moves)}
+    move_results.sort(key=lambda item: order[item[0]])
+    return _best_root_move(move_results)
+
+def best_effort_move(initial_state, result):
+    """
+    Gets a move for a state from a search that found no path to the target score.
+    
+    Args:
+        initial_state (BitboardState): The state the search started from.
+        result (SearchResult): The result of the search.
+    
+    Returns:
+        move: The first move towards the best state the search reached or, if no state beat
+            the current score, the move that loses the fewest points.
+    """
+    if result.best_path:
+        return result.best_path[0]
+    return max(initial_state.children(), key=lambda child: child.score).move
 
-def get_ai_move(game, algorithm='bfs', target_score=500, time_limit=10):
+def get_ai_move(game, algorithm='bfs', target_score=500, time_limit=10, deadline=None,
+                parallel=False, max_workers=None, cache=None, use_book=True, best_effort=False):
     """
     Gets the next recommended move from the chosen AI algorithm.
     
     Args:
         game (WoodBlockPuzzle): The current game instance.
-        algorithm (str, optional): The algorithm to use (bfs, dfs, ucs, dls, ids, greedy, astar, wastar).
+        algorithm (str, optional): The algorithm to use (bfs, dfs, ucs, dls, ids, greedy, astar, wastar,
+            beam, anytime, idastar, or mcts for the planner of mcts_1_4.py, which models the real
+            random pieces).
         target_score (int, optional): The target score for the search.
         time_limit (int, optional): Time limit in seconds for the search.
+        deadline (Deadline, optional): Budget of the search (time, nodes, memory, cancellation);
+            replaces time_limit if given.
+        parallel (bool, optional): Split the root moves across worker processes (see
+            root_split_search). The move is then chosen by the earliest goal or, failing that,
+            by the best score reached, so a move is suggested even if no goal was reached.
+            Ignored by mcts.
+        max_workers (int, optional): Number of worker processes in parallel mode.
+        cache (MoveCache, optional): Cache of recommended moves to look the position up in
+            first, and to store the move found in.
+        use_book (bool, optional): Consult the book of solved positions of the board size, if
+            one was generated (see opening_book_1_4.py), before searching. The book gives
+            the first move of a shortest plan, as BFS would, whatever the algorithm (except
+            mcts, as the book assumes 1x1 pieces like the searches).
+        best_effort (bool, optional): If the search finds no path to the target score, return
+            a move anyway (see best_effort_move) instead of None (parallel mode always does).
         
     Returns:
         move: The recommended move or None if no solution is found.
     """
-    # Creates the initial state from the current game
-    initial_state = GameState(game.board, game.current_piece, game.score)
-    
-    # Executes the chosen algorithm
-    if algorithm.lower() == 'bfs':
-        path, _, _ = bfs(initial_state, target_score, time_limit)
-    elif algorithm.lower() == 'dfs':
-        path, _, _ = dfs(initial_state, target_score, time_limit)
-    elif algorithm.lower() == 'ucs':
-        path, _, _ = uniform_cost_search(initial_state, target_score, time_limit)
-    elif algorithm.lower() == 'dls':
-        path, _, _ = depth_limited_search(initial_state, 10, target_score, time_limit)
-    elif algorithm.lower() == 'ids':
-        path, _, _ = iterative_deepening(initial_state, 20, target_score, time_limit)
-    elif algorithm.lower() == 'greedy':
-        path, _, _ = greedy_search(initial_state, target_score, time_limit)
-    elif algorithm.lower() == 'astar':
-        path, _, _ = a_star_search(initial_state, target_score, time_limit)
-    elif algorithm.lower() == 'wastar':
-        path, _, _ = weighted_a_star(initial_state, 1.5, target_score, time_limit)
-    else:
+    if algorithm.lower() not in AI_ALGORITHMS and algorithm.lower() != 'mcts':
         # Algorithm not recognized, uses BFS as default
-        print(f"Algorithm '{algorithm}' not recognized. Using BFS as default.")
-        path, _, _ = bfs(initial_state, target_score, time_limit)
+        logger.warning("Algorithm '%s' not recognized. Using BFS as default.", algorithm)
+        algorithm = 'bfs'
+    algorithm = algorithm.lower()
+    
+    # The same position may already have been analysed
+    if cache is not None:
+        mode = ""
+        if algorithm != 'mcts':
+            mode = "/parallel" if parallel else "/best" if best_effort else ""
+        key = cache_key(game.board, game.current_piece, game.score, algorithm + mode, target_score)
+        move = cache.get(key)
+        if move is not None:
+            return move
+    
+    # Creates the initial state from the current game, using the compact representation
+    initial_state = BitboardState.from_board(game.board, game.current_piece, game.score)
+    
+    # Small boards can be solved in advance
+    book = load_book(initial_state.board_size) if use_book and algorithm != 'mcts' else None
+    move = book.best_move(initial_state, target_score)[0] if book is not None else None
+    
+    if move is not None:
+        logger.info("Move found in the book of solved positions.")
+    elif algorithm == 'mcts':
+        # Imported here, as mcts_1_4 depends on this module
+        from mcts_1_4 import MCTSPlanner
+        move = MCTSPlanner(target_score, time_limit).best_move(initial_state, deadline)
+    elif parallel:
+        max_memory = None
+        if deadline is not None:
+            if deadline.end_time is not None:
+                time_limit = deadline.remaining()
+            max_memory = deadline.max_memory
+        move = root_split_search(initial_state, algorithm, target_score, time_limit,
+                                 max_workers, max_memory)
+    else:
+        # Executes the chosen algorithm
+        function, arguments = AI_ALGORITHMS[algorithm]
+        result = function(initial_state, *arguments, target_score, time_limit, deadline=deadline)
+        
+        # If a path was found, the move is its first one (None if no solution was found)
+        if result.path:
+            move = result.path[0]
+        else:
+            move = best_effort_move(initial_state, result) if best_effort else None
     
-    # If a path was found, returns the first move
-    if path and len(path) > 0:
-        return path[0]
+    if cache is not None:
+        cache.put(key, move)
+    return move
+
+class SolverSession:
+    """
+    Solver that keeps what it learned between the turns of a game.
+    
+    Every plan found (a path to the target score) is stored in a table of solved positions,
+    for every state along the plan: from any of those states the rest of the plan is known.
+    Positions are keyed on their board and score, not on the current piece: the searches
+    assume that every piece after the first one is 1x1, so the piece actually drawn on the
+    next turn is rarely the one the plan was made for. A stored plan is only used again if it
+    is still valid from the state at hand: its moves are replayed (the first one with the
+    current piece, the others with 1x1 pieces, as in the searches) and must reach the target
+    score. A turn that starts on such a position needs no search at all, and the searches of
+    the other turns treat those positions as goals and complete their path with the stored
+    plan. The principal variation (the current plan) is re-rooted when a move is played.
+    
+    Entries not used for max_age turns are dropped, and the table is kept under max_bytes
+    (an estimate of the memory of its keys and plans), evicting the least recently used ones.
+    
+    The visited-state tables of the searches themselves are not kept: a state visited from an
+    old root was not necessarily expanded, so skipping it from a new root would lose moves.
+    """
+    def __init__(self, algorithm='bfs', target_score=500, time_limit=10, max_bytes=32 * 1024 * 1024,
+                 max_age=20, best_effort=False):
+        """
+        Initializes a new session.
+        
+        Args:
+            algorithm (str, optional): Name of the algorithm (a key of AI_ALGORITHMS).
+            target_score (int, optional): The target score of the game.
+            time_limit (float, optional): Time limit in seconds of each search.
+            max_bytes (int, optional): Maximum memory in bytes of the table of plans.
+            max_age (int, optional): Number of turns an unused position is kept.
+            best_effort (bool, optional): If a search finds no plan, return a move anyway
+                (see best_effort_move) instead of None.
+        """
+        if algorithm.lower() not in AI_ALGORITHMS:
+            # Algorithm not recognized, uses BFS as default
+            logger.warning("Algorithm '%s' not recognized. Using BFS as default.", algorithm)
+            algorithm = 'bfs'
+        self.algorithm = algorithm.lower()
+        self.target_score = target_score
+        self.time_limit = time_limit
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.best_effort = best_effort
+        # (filled, diamonds, score) -> (rest of the plan, turn it was last used, size in bytes),
+        # in LRU order
+        self.plans = OrderedDict()
+        self.bytes = 0
+        self.principal_variation = []
+        self.turn = 0
+        self.searches = 0
+        self.hits = 0
+        self.last_result = None
+    
+    @staticmethod
+    def _entry_bytes(key, plan):
+        """Estimated memory of an entry: its key, its plan and its slot in the table."""
+        return (sys.getsizeof(key) + sum(sys.getsizeof(value) for value in key)
+                + sys.getsizeof(plan) + 2 * sys.getsizeof(()) + 100)
+    
+    def _replay(self, state):
+        """
+        Returns the plan stored for the position of a state if it still reaches the target score
+        from this state (marking it as used), or None.
+        """
+        key = (state.filled, state.diamonds, state.score)
+        entry = self.plans.get(key)
+        if entry is None:
+            return None
+        plan = entry[0]
+        reached = state
+        for index, move in enumerate(plan):
+            if reached.score >= self.target_score:
+                plan = plan[:index]
+                break
+            if reached.score <= 0 or move not in reached.get_valid_moves():
+                return None
+            reached = reached.apply_move(move)
+        if reached.score < self.target_score:
+            return None
+        self.plans[key] = (entry[0], self.turn, entry[2])
+        self.plans.move_to_end(key)
+        return list(plan)
+    
+    def _store(self, root, plan):
+        """Stores the rest of the plan for every state along it."""
+        plans = self.plans
+        state = root
+        for index, move in enumerate(plan):
+            key = (state.filled, state.diamonds, state.score)
+            suffix = tuple(plan[index:])
+            size = self._entry_bytes(key, suffix)
+            if key in plans:
+                self.bytes -= plans[key][2]
+            plans[key] = (suffix, self.turn, size)
+            plans.move_to_end(key)
+            self.bytes += size
+            state = state.apply_move(move)
+        while plans and self.bytes > self.max_bytes:
+            self.bytes -= plans.popitem(last=False)[1][2]
+    
+    def best_move(self, game, deadline=None):
+        """
+        Gets the next move for the current position.
+        
+        Args:
+            game (WoodBlockPuzzle, GameState or BitboardState): The current position.
+            deadline (Deadline, optional): Budget of the search; replaces time_limit if given.
+        
+        Returns:
+            move: The recommended move or None if no plan is found (unless best_effort).
+        """
+        if isinstance(game, BitboardState):
+            root = game
+        else:
+            root = BitboardState.from_board(game.board, game.current_piece, game.score)
+        if root.score >= self.target_score:
+            return None
+        
+        plan = self._replay(root)
+        if plan is not None:
+            self.hits += 1
+        else:
+            self.searches += 1
+            target_score = self.target_score
+            
+            def goal_test(state):
+                return state.score >= target_score or self._replay(state) is not None
+            
+            function, arguments = AI_ALGORITHMS[self.algorithm]
+            result = function(root, *arguments, target_score, self.time_limit, deadline=deadline,
+                              goal_test=goal_test)
+            self.last_result = result
+            if result.path is None:
+                self.principal_variation = []
+                return best_effort_move(root, result) if self.best_effort else None
+            
+            # Completes the path with the plan known from the position it reached
+            plan = list(result.path)
+            state = root
+            for move in plan:
+                state = state.apply_move(move)
+            if state.score < target_score:
+                plan += self._replay(state)
+            self._store(root, plan)
+        
+        self.principal_variation = plan
+        return plan[0]
     
-    # No solution found
-    return None
+    def play(self, move):
+        """
+        Re-roots the session on the move actually played, and drops the stale positions.
+        
+        Args:
+            move: The move played.
+        """
+        self.turn += 1
+        if self.principal_variation and self.principal_variation[0] == move:
+            self.principal_variation = self.principal_variation[1:]
+        else:
+            self.principal_variation = []
+        
+        # The least recently used positions are at the start of the table
+        while self.plans:
+            key, (_, turn, size) = next(iter(self.plans.items()))
+            if self.turn - turn <= self.max_age:
+                break
+            del self.plans[key]
+            self.bytes -= size
+    
+    def clear(self):
+        """Forgets every position and the principal variation."""
+        self.plans.clear()
+        self.bytes = 0
+        self.principal_variation = []
 
 def play_with_ai(game, algorithm='bfs', target_score=500, time_limit=10):
     """
@@ -1032,7 +2280,9 @@ def play_with_ai(game, algorithm='bfs', target_score=500, time_limit=10):
     
     Args:
         game (WoodBlockPuzzle): The current game instance.
-        algorithm (str, optional): The algorithm to use (bfs, dfs, ucs, dls, ids, greedy, astar, wastar).
+        algorithm (str, optional): The algorithm to use (bfs, dfs, ucs, dls, ids, greedy, astar, wastar,
+            beam, anytime, idastar, or mcts for the planner of mcts_1_4.py, which models the real
+            random pieces).
         target_score (int, optional): The target score for the search.
         time_limit (int, optional): Time limit in seconds for each move.
         
@@ -1048,6 +2298,14 @@ def play_with_ai(game, algorithm='bfs', target_score=500, time_limit=10):
     max_moves = 100  # Move limit to avoid infinite loops
     moves_count = 0
     
+    # Keeps the plans (or the search tree of mcts) found from one move to the next
+    if algorithm.lower() == 'mcts':
+        # Imported here, as mcts_1_4 depends on this module
+        from mcts_1_4 import MCTSPlanner
+        session = MCTSPlanner(target_score, time_limit)
+    else:
+        session = SolverSession(algorithm, target_score, time_limit)
+    
     while game.score > 0 and moves_count < max_moves:
         # Shows the current game state
         game.display_board()
@@ -1056,7 +2314,7 @@ def play_with_ai(game, algorithm='bfs', target_score=500, time_limit=10):
             print(" ".join("#" if cell == 1 else " " for cell in row))
         
         # Gets the next move from the AI
-        move = get_ai_move(game, algorithm, target_score, time_limit)
+        move = session.best_move(game)
         
         if move is None:
             print("The AI could not find a valid move.")
@@ -1075,6 +2333,7 @@ def play_with_ai(game, algorithm='bfs', target_score=500, time_limit=10):
                 print("Invalid move! Something went wrong.")
                 break
         
+        session.play(move)
         moves_count += 1
         
         # Pause for visualization with option to quit
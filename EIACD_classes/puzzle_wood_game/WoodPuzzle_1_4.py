@@ -1,8 +1,14 @@
+import logging
 import random
-from AI_algorithms_1_4 import get_ai_move, play_with_ai, GameState, compare_algorithms
+from AI_algorithms_1_4 import get_ai_move, play_with_ai, GameState, compare_algorithms, render_comparison
+from bitboard_1_4 import clear_board_lines, shapes_for_difficulty
+from move_cache_1_4 import MoveCache
+
+# Moves already suggested by the AI help, reused when the same position comes up again
+hint_cache = MoveCache()
 
 class WoodBlockPuzzle:
-    def __init__(self, difficulty=1):
+    def __init__(self, difficulty=1, generator=None):
         """
         Initialize the Wood Block Puzzle game with different difficulty levels.
         
@@ -12,11 +18,16 @@ class WoodBlockPuzzle:
                 2 - Medium (5x5 board)
                 3 - Hard (6x6 board)
                 4 - Expert (7x7 board)
+            generator (random.Random, optional): Random generator of the board and the pieces
+                (by default, the global one of the random module)
         """
         # Set board size based on difficulty
         self.difficulty = min(max(difficulty, 1), 4)  # Ensure difficulty is between 1 and 4
         self.board_size = 3 + self.difficulty  # Board sizes: 4x4, 5x5, 6x6, 7x7
         
+        # Source of the random board and pieces, so that a game can be replayed from a seed
+        self.generator = generator if generator is not None else random
+        
         # Initialize the board based on difficulty
         self.board = self._create_initial_board()
         
@@ -28,6 +39,7 @@ class WoodBlockPuzzle:
         """Create the initial board based on the difficulty level."""
         # Start with an empty board
         board = [[" " for _ in range(self.board_size)] for _ in range(self.board_size)]
+        randint = self.generator.randint
         
         # Place diamonds and obstacles in a pattern that scales with board size
         # The pattern is similar across all difficulty levels, just scaled
@@ -50,7 +62,7 @@ class WoodBlockPuzzle:
         
         # Add remaining diamonds randomly
         while len(diamond_positions) < num_diamonds:
-            x, y = random.randint(0, self.board_size - 1), random.randint(0, self.board_size - 1)
+            x, y = randint(0, self.board_size - 1), randint(0, self.board_size - 1)
             if board[x][y] == " " and (x, y) not in diamond_positions:
                 board[x][y] = "D"
                 diamond_positions.append((x, y))
@@ -69,7 +81,11 @@ class WoodBlockPuzzle:
         
         # Add remaining obstacles randomly, but don't place them adjacent to diamonds
         while len(obstacle_positions) < num_obstacles:
-            x, y = random.randint(0, self.board_size - 1), random.randint(0, self.board_size - 1)
+            # Stop if the diamonds left no free cell for another obstacle
+            if not any(board[x][y] == " " and not self._is_adjacent_to_diamond(x, y, diamond_positions)
+                       for x in range(self.board_size) for y in range(self.board_size)):
+                break
+            x, y = randint(0, self.board_size - 1), randint(0, self.board_size - 1)
             if board[x][y] == " " and not self._is_adjacent_to_diamond(x, y, diamond_positions):
                 board[x][y] = "#"
                 obstacle_positions.append((x, y))
@@ -85,46 +101,11 @@ class WoodBlockPuzzle:
     
     def generate_piece(self):
         """Generate a random piece based on difficulty level."""
-        # Basic shapes available at all difficulty levels
-        basic_shapes = [
-            [[1, 1]],      # 2-block horizontal
-            [[1], [1]],    # 2-block vertical
-            [[1, 1, 1]],   # 3-block horizontal
-            [[1], [1], [1]] # 3-block vertical
-        ]
-        
-        # Medium shapes (available at difficulty 2+)
-        medium_shapes = [
-            [[1, 1], [1, 1]],  # 2x2 square
-            [[1, 1], [1, 0]],  # L shape
-            [[1, 1], [0, 1]],  # Reversed L shape
-            [[1, 0], [1, 1]]   # L shape rotated
-        ]
-        
-        # Hard shapes (available at difficulty 3+)
-        hard_shapes = [
-            [[1, 1, 1], [1, 0, 0]],  # L shape long
-            [[1, 1, 1], [0, 0, 1]],  # Reversed L shape long
-            [[1, 0], [1, 0], [1, 1]] # L shape rotated long
-        ]
-        
-        # Expert shapes (only at difficulty 4)
-        expert_shapes = [
-            [[1, 1, 1], [0, 1, 0]],  # T shape
-            [[0, 1, 0], [1, 1, 1]],  # Inverted T shape
-            [[1, 1, 0], [0, 1, 1]]   # Z shape
-        ]
-        
-        # Combine shapes based on difficulty
-        available_shapes = basic_shapes.copy()
-        if self.difficulty >= 2:
-            available_shapes.extend(medium_shapes)
-        if self.difficulty >= 3:
-            available_shapes.extend(hard_shapes)
-        if self.difficulty >= 4:
-            available_shapes.extend(expert_shapes)
-        
-        return random.choice(available_shapes)
+        # Shapes get more complex as the difficulty increases
+        available_shapes = shapes_for_difficulty(self.difficulty)
+        
+        # Copy the chosen shape so the shared shape lists are never modified
+        return [row[:] for row in self.generator.choice(available_shapes)]
     
     def display_board(self):
         """Display the current state of the board."""
@@ -182,30 +163,13 @@ class WoodBlockPuzzle:
         return True
     
     def check_full_lines_and_columns(self):
-        """Check for complete lines and columns, and clear them."""
-        lines_cleared = 0
-        columns_cleared = 0
-        diamonds_captured = 0
-        
-        # Check complete rows
-        for i in range(self.board_size):
-            if all(cell == "#" or cell == "D" for cell in self.board[i]):
-                lines_cleared += 1
-                # Count diamonds and clear the row
-                for j in range(self.board_size):
-                    if self.board[i][j] == "D":
-                        diamonds_captured += 1
-                self.board[i] = [" " for _ in range(self.board_size)]
-        
-        # Check complete columns
-        for j in range(self.board_size):
-            if all(self.board[i][j] == "#" or self.board[i][j] == "D" for i in range(self.board_size)):
-                columns_cleared += 1
-                # Count diamonds and clear the column
-                for i in range(self.board_size):
-                    if self.board[i][j] == "D":
-                        diamonds_captured += 1
-                    self.board[i][j] = " "
+        """
+        Check for complete lines and columns, and clear them all at once.
+        
+        Returns:
+            tuple: (lines_cleared, columns_cleared, diamonds_captured)
+        """
+        lines_cleared, columns_cleared, diamonds_captured = clear_board_lines(self.board)
         
         # Calculate score based on clears and difficulty
         if lines_cleared > 0 or columns_cleared > 0:
@@ -216,6 +180,8 @@ class WoodBlockPuzzle:
             print(f"Cleared {lines_cleared} lines and {columns_cleared} columns!")
             if diamonds_captured > 0:
                 print(f"Captured {diamonds_captured} diamonds!")
+        
+        return lines_cleared, columns_cleared, diamonds_captured
     
     def get_new_piece(self):
         """Request a new piece with a score penalty."""
@@ -289,9 +255,13 @@ class WoodBlockPuzzle:
                 print("6 - Greedy (Greedy Search)")
                 print("7 - A* (A-Star)")
                 print("8 - Weighted A* (Weighted A-Star)")
+                print("9 - Beam Search")
+                print("10 - Anytime Weighted A* (best move within the time limit)")
+                print("11 - MCTS (Monte Carlo Tree Search with the real random pieces)")
+                print("12 - IDA* (Iterative Deepening A-Star)")
                 print("q - Cancel AI suggestion")
                 
-                algo_choice = input("Enter your choice (1-8, q): ").strip().lower()
+                algo_choice = input("Enter your choice (1-12, q): ").strip().lower()
                 
                 if algo_choice == 'q':
                     continue
@@ -304,7 +274,11 @@ class WoodBlockPuzzle:
                     '5': 'ids',
                     '6': 'greedy',
                     '7': 'astar',
-                    '8': 'wastar'
+                    '8': 'wastar',
+                    '9': 'beam',
+                    '10': 'anytime',
+                    '11': 'mcts',
+                    '12': 'idastar'
                 }
                 
                 if algo_choice in algorithms:
@@ -314,8 +288,9 @@ class WoodBlockPuzzle:
                     # Adjust time limit based on board size
                     time_limit = 5 + self.difficulty  # 6-9 seconds depending on difficulty
                     
-                    # Get AI suggestion
-                    move = get_ai_move(self, algorithm, 500 * self.difficulty, time_limit)
+                    # Get AI suggestion (the most promising move if the target is out of reach)
+                    move = get_ai_move(self, algorithm, 500 * self.difficulty, time_limit,
+                                       cache=hint_cache, best_effort=True)
                     
                     if move:
                         if move == 'R':
@@ -348,15 +323,17 @@ class WoodBlockPuzzle:
         print(f"Final Score: {self.score}")
 
 
-def compare_ai_algorithms(difficulty=1):
+def compare_ai_algorithms(difficulty=1, parallel=True, max_memory=None):
     """
     Compare all AI algorithms on the same problem with the selected difficulty.
     
     Args:
         difficulty (int): Difficulty level from 1 to 4
+        parallel (bool): Run the algorithms in parallel processes, sharing one time limit
+        max_memory (int): Memory limit of each worker process in bytes (None for no limit)
     
     Returns:
-        dict: Results of algorithm comparison
+        dict: SearchResult of each algorithm, by algorithm name
     """
     # Create a new game with the selected difficulty
     game = WoodBlockPuzzle(difficulty)
@@ -369,22 +346,30 @@ def compare_ai_algorithms(difficulty=1):
         print(" ".join("#" if cell == 1 else " " for cell in row))
     
     # Ask if the user wants to proceed or quit
-    print("\nComparing all AI algorithms can take several minutes, especially at higher difficulties.")
+    if parallel:
+        print("\nThe AI algorithms will run in parallel, for at most one minute.")
+    else:
+        print("\nComparing all AI algorithms can take several minutes, especially at higher difficulties.")
     choice = input("Press Enter to continue, or 'q' to return to the main menu: ").strip().lower()
     
     if choice == 'q':
         print("Returning to main menu...")
         return None
     
-    # Create initial state to pass to the algorithms
-    initial_state = GameState(game.board, game.current_piece, game.score)
+    # Create initial state to pass to the algorithms (compact representation for speed)
+    initial_state = GameState(game.board, game.current_piece, game.score).to_bitboard()
     
     # Adjust time limit and target score based on difficulty
     time_limit = 60  # 60 seconds per algorithm
     target_score = 500 * difficulty    # 500-2000 target score
     
     # Compare all algorithms
-    results = compare_algorithms(initial_state, target_score, time_limit)
+    print("\n" + "="*50)
+    print("ALGORITHM COMPARISON")
+    print("="*50 + "\n")
+    results = compare_algorithms(initial_state, target_score, time_limit, parallel=parallel,
+                                 max_memory=max_memory)
+    print("\n" + render_comparison(results))
     
     # Wait for user input before returning to the menu
     input("\nPress Enter to return to the main menu...")
@@ -393,6 +378,8 @@ def compare_ai_algorithms(difficulty=1):
 
 
 if __name__ == "__main__":
+    # Shows the progress of the AI searches in the terminal
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     running = True
     
     while running:
@@ -454,9 +441,13 @@ if __name__ == "__main__":
             print("6 - Greedy (Greedy Search)")
             print("7 - A* (A-Star)")
             print("8 - Weighted A* (Weighted A-Star)")
+            print("9 - Beam Search")
+            print("10 - Anytime Weighted A* (best move within the time limit)")
+            print("11 - MCTS (Monte Carlo Tree Search with the real random pieces)")
+            print("12 - IDA* (Iterative Deepening A-Star)")
             print("q - Back to main menu")
             
-            algo_choice = input("Enter your choice (1-8, q): ").strip().lower()
+            algo_choice = input("Enter your choice (1-12, q): ").strip().lower()
             
             if algo_choice == 'q':
                 continue  # Go back to main menu
@@ -469,7 +460,11 @@ if __name__ == "__main__":
                 '5': 'ids',
                 '6': 'greedy',
                 '7': 'astar',
-                '8': 'wastar'
+                '8': 'wastar',
+                '9': 'beam',
+                '10': 'anytime',
+                '11': 'mcts',
+                '12': 'idastar'
             }
             
             if algo_choice in algorithms:
@@ -0,0 +1,118 @@
+"""
+Batch evaluation of the board heuristic of Wood Block Puzzle over many states at once.
+
+The informed searches evaluate every child of the node they expand, and on a 7x7 board a
+node has dozens of children: evaluated one at a time, the Python overhead of each call
+dominates. With NumPy, the boards of the children are stacked into K x N x N arrays of cells,
+and the row and column fill counts, diamond count and board potential of all of them are
+computed with a few array reductions.
+
+NumPy is optional: without it, or for batches too small to pay for building the arrays, the
+same values are computed state by state with popcounts on the bitboards.
+"""
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+from bitboard_1_4 import line_masks, popcount
+
+# Smallest batch evaluated with NumPy (smaller ones are faster state by state)
+MIN_BATCH = 24
+
+def masks_to_array(board_size, masks):
+    """
+    Stacks board masks into an array of cells.
+    
+    Args:
+        board_size (int): The size of the boards.
+        masks (list): K bitmasks (bit row * N + col is cell (row, col)).
+    
+    Returns:
+        numpy.ndarray: A K x N x N array of 0/1 uint8 values.
+    """
+    cells = board_size * board_size
+    values = np.array(masks, dtype='<u8')
+    bits = np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    return bits[:, :cells].reshape(-1, board_size, board_size)
+
+def stack_states(states):
+    """
+    Stacks the boards of bitboard states of the same size.
+    
+    Args:
+        states (list): BitboardStates (or SearchNodes) with the same board size.
+    
+    Returns:
+        tuple: (filled, diamonds), two K x N x N arrays of 0/1 values.
+    """
+    # Both masks of every state are unpacked in a single call
+    boards = masks_to_array(states[0].board_size,
+                            [state.filled for state in states] + [state.diamonds for state in states])
+    return boards[:len(states)], boards[len(states):]
+
+def board_potential_array(filled, diamonds):
+    """
+    Computes heuristic_board_potential for stacked boards.
+    
+    Args:
+        filled (numpy.ndarray): K x N x N array of the occupied cells (0/1).
+        diamonds (numpy.ndarray): K x N x N array of the cells holding a diamond (0/1).
+    
+    Returns:
+        numpy.ndarray: The K potentials (lower values for more promising boards).
+    """
+    board_size = filled.shape[-1]
+    row_fill = filled.sum(axis=2, dtype=np.int64)
+    col_fill = filled.sum(axis=1, dtype=np.int64)
+    row_potential = ((board_size - row_fill) * (row_fill > 0)).sum(axis=1)
+    col_potential = ((board_size - col_fill) * (col_fill > 0)).sum(axis=1)
+    # Every diamond is counted once for its row and once for its column
+    diamond_potential = 2 * diamonds.sum(axis=(1, 2), dtype=np.int64)
+    return -(row_potential + col_potential + 3 * diamond_potential)
+
+def board_potential(state):
+    """
+    Computes heuristic_board_potential for one bitboard state, with popcounts.
+    """
+    board_size = state.board_size
+    filled = state.filled
+    row_masks, column_masks = line_masks(board_size)
+    
+    row_potential = 0
+    col_potential = 0
+    for i in range(board_size):
+        count = popcount(filled & row_masks[i])
+        row_potential += (board_size - count) * (count > 0)
+        count = popcount(filled & column_masks[i])
+        col_potential += (board_size - count) * (count > 0)
+    
+    # Every diamond is counted once for its row and once for its column
+    diamond_potential = 2 * popcount(state.diamonds)
+    
+    return -(row_potential + col_potential + 3 * diamond_potential)
+
+def board_potentials(states, use_numpy=None):
+    """
+    Computes heuristic_board_potential for a batch of bitboard states of the same size.
+    
+    Args:
+        states (list): BitboardStates (or SearchNodes) with the same board size.
+        use_numpy (bool, optional): Whether to use NumPy (by default, when it is installed
+            and the batch has at least MIN_BATCH states).
+    
+    Returns:
+        list: The potential of each state, in the same order.
+    
+    Raises:
+        ImportError: If use_numpy is True and NumPy is not installed.
+    """
+    if not states:
+        return []
+    if use_numpy is None:
+        use_numpy = np is not None and len(states) >= MIN_BATCH
+    if use_numpy:
+        if np is None:
+            raise ImportError("NumPy is not installed")
+        return board_potential_array(*stack_states(states)).tolist()
+    return [board_potential(state) for state in states]
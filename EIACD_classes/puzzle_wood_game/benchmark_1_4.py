@@ -0,0 +1,252 @@
+"""
+Batch benchmark of the AI algorithms of Wood Block Puzzle.
+
+Generates reproducible boards for each difficulty (board N of a run always uses the seed
+first_seed + N), runs every algorithm of AI_algorithms_1_4.COMPARED_ALGORITHMS on them in a
+process pool, and summarises the success rate, nodes per second, path length, peak memory
+and latency percentiles of each algorithm and difficulty.
+
+Usage example:
+    python benchmark_1_4.py --difficulties 1 2 3 --boards 20 --time-limit 10 --csv runs.csv --json summary.json
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from AI_algorithms_1_4 import COMPARED_ALGORITHMS, Deadline, SearchResult
+from bitboard_1_4 import BitboardState
+from WoodPuzzle_1_4 import WoodBlockPuzzle
+
+logger = logging.getLogger(__name__)
+
+# Columns of the per-run rows (CSV output)
+RUN_FIELDS = ['algorithm', 'difficulty', 'seed', 'target_score', 'solved', 'reason', 'path_length',
+              'explored_states', 'generated_states', 'max_frontier', 'peak_memory', 'time',
+              'nodes_per_second']
+
+# Columns of the summary of each algorithm and difficulty
+SUMMARY_FIELDS = ['algorithm', 'difficulty', 'runs', 'success_rate', 'nodes_per_second',
+                  'mean_path_length', 'peak_memory', 'latency_p50', 'latency_p90', 'latency_p99']
+
+def generate_boards(difficulty, count, first_seed=0):
+    """
+    Generates reproducible initial positions for a difficulty level.
+    Each board is drawn by its own random generator, so the global one is left untouched.
+    
+    Args:
+        difficulty (int): Difficulty level from 1 to 4.
+        count (int): Number of boards to generate.
+        first_seed (int, optional): Seed of the first board; the others use the next seeds.
+    
+    Returns:
+        list: (seed, board, current_piece, score) for each board.
+    """
+    boards = []
+    for seed in range(first_seed, first_seed + count):
+        game = WoodBlockPuzzle(difficulty, random.Random(seed))
+        boards.append((seed, game.board, game.current_piece, game.score))
+    return boards
+
+def _run_benchmark(name, difficulty, seed, board, piece, score, target_score, time_limit, max_memory):
+    """Runs one algorithm on one board in a worker process and returns its result row."""
+    _, algorithm, arguments = next(entry for entry in COMPARED_ALGORITHMS if entry[0] == name)
+    initial_state = BitboardState.from_board(board, piece, score)
+    deadline = Deadline(time_limit, max_memory=max_memory)
+    result = algorithm(initial_state, *arguments, target_score, deadline=deadline)
+    return _run_row(name, difficulty, seed, target_score, result)
+
+def _run_row(name, difficulty, seed, target_score, result):
+    """Builds the result row of a run from its SearchResult."""
+    return {
+        'algorithm': name,
+        'difficulty': difficulty,
+        'seed': seed,
+        'target_score': target_score,
+        'solved': result.solved,
+        'reason': result.reason,
+        'path_length': result.path_length,
+        'explored_states': result.explored_states,
+        'generated_states': result.generated_states,
+        'max_frontier': result.max_frontier,
+        'peak_memory': result.peak_memory,
+        'time': result.elapsed_time,
+        'nodes_per_second': result.nodes_per_second,
+    }
+
+def run_benchmark(difficulties=(1, 2, 3, 4), boards=10, first_seed=0, algorithms=None,
+                  target_gain=250, time_limit=10, max_workers=None, max_memory=None):
+    """
+    Runs the algorithms on the same seeded boards of each difficulty, in parallel.
+    
+    Args:
+        difficulties (iterable, optional): Difficulty levels to benchmark.
+        boards (int, optional): Number of boards per difficulty.
+        first_seed (int, optional): Seed of the first board of each difficulty.
+        algorithms (list, optional): Names of the algorithms to run (by default, all the
+            algorithms of COMPARED_ALGORITHMS).
+        target_gain (int, optional): Points to gain per difficulty level: the target score of
+            a board is its initial score plus target_gain * difficulty.
+        time_limit (float, optional): Time limit in seconds of each run.
+        max_workers (int, optional): Number of worker processes (by default, one per CPU).
+        max_memory (int, optional): Memory limit of each worker process in bytes.
+    
+    Returns:
+        list: One row (dict with the RUN_FIELDS) per algorithm, difficulty and board.
+    """
+    if algorithms is None:
+        algorithms = [name for name, _, _ in COMPARED_ALGORITHMS]
+    
+    tasks = []
+    for difficulty in difficulties:
+        for seed, board, piece, score in generate_boards(difficulty, boards, first_seed):
+            target_score = score + target_gain * difficulty
+            for name in algorithms:
+                tasks.append((name, difficulty, seed, board, piece, score, target_score,
+                              time_limit, max_memory))
+    
+    rows = []
+    with ProcessPoolExecutor(max_workers or os.cpu_count()) as executor:
+        futures = [executor.submit(_run_benchmark, *task) for task in tasks]
+        for task, future in zip(tasks, futures):
+            try:
+                rows.append(future.result())
+            except Exception:
+                # A crashed run counts as a failure instead of aborting the benchmark
+                name, difficulty, seed = task[:3]
+                logger.exception("Run of %s on board %s at difficulty %d failed", name, seed, difficulty)
+                rows.append(_run_row(name, difficulty, seed, task[6],
+                                     SearchResult(None, 0, 0.0, reason='error', algorithm=name)))
+    return rows
+
+def percentile(values, fraction):
+    """
+    Percentile of a list of numbers, interpolating between the closest ranks.
+    
+    Args:
+        values (list): The numbers (in any order).
+        fraction (float): The percentile as a fraction, e.g. 0.9 for the 90th percentile.
+    
+    Returns:
+        float: The percentile, or None if there are no values.
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+def summarize(rows):
+    """
+    Summarises the runs of each algorithm and difficulty.
+    
+    Args:
+        rows (list): Result rows returned by run_benchmark.
+    
+    Returns:
+        list: One summary (dict with the SUMMARY_FIELDS) per algorithm and difficulty.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['algorithm'], row['difficulty']), []).append(row)
+    
+    summary = []
+    for (algorithm, difficulty), runs in groups.items():
+        latencies = [run['time'] for run in runs]
+        path_lengths = [run['path_length'] for run in runs if run['solved']]
+        memories = [run['peak_memory'] for run in runs if run['peak_memory'] is not None]
+        total_time = sum(latencies)
+        summary.append({
+            'algorithm': algorithm,
+            'difficulty': difficulty,
+            'runs': len(runs),
+            'success_rate': sum(run['solved'] for run in runs) / len(runs),
+            'nodes_per_second': (sum(run['explored_states'] for run in runs) / total_time
+                                 if total_time > 0 else 0.0),
+            'mean_path_length': sum(path_lengths) / len(path_lengths) if path_lengths else None,
+            'peak_memory': max(memories) if memories else None,
+            'latency_p50': percentile(latencies, 0.50),
+            'latency_p90': percentile(latencies, 0.90),
+            'latency_p99': percentile(latencies, 0.99),
+        })
+    return summary
+
+def write_csv(rows, path, fields=RUN_FIELDS):
+    """Writes result (or summary) rows to a CSV file."""
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def write_json(rows, summary, path, settings=None):
+    """Writes the settings, the summary and the result rows of a benchmark to a JSON file."""
+    with open(path, 'w') as file:
+        json.dump({'settings': settings or {}, 'summary': summary, 'runs': rows}, file, indent=2)
+
+def render_summary(summary):
+    """
+    Renders the summary of a benchmark as a text table.
+    
+    Args:
+        summary (list): Summaries returned by summarize.
+    
+    Returns:
+        str: The table.
+    """
+    header = (f"{'Algorithm':<20} {'Diff':<5} {'Runs':<5} {'Success':<8} {'Nodes/s':<10} "
+              f"{'Path len':<9} {'Peak mem (MiB)':<15} {'p50 (s)':<8} {'p90 (s)':<8} {'p99 (s)':<8}")
+    lines = [header, "-" * len(header)]
+    for entry in summary:
+        path_length = f"{entry['mean_path_length']:.1f}" if entry['mean_path_length'] is not None else "-"
+        memory = (f"{entry['peak_memory'] / (1024 * 1024):.1f}"
+                  if entry['peak_memory'] is not None else "-")
+        lines.append(f"{entry['algorithm']:<20} {entry['difficulty']:<5} {entry['runs']:<5} "
+                     f"{entry['success_rate']:<8.0%} {entry['nodes_per_second']:<10.0f} "
+                     f"{path_length:<9} {memory:<15} {entry['latency_p50']:<8.2f} "
+                     f"{entry['latency_p90']:<8.2f} {entry['latency_p99']:<8.2f}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    """Runs the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark the Wood Block Puzzle AI algorithms.")
+    parser.add_argument('--difficulties', type=int, nargs='+', default=[1, 2, 3, 4],
+                        help="difficulty levels to benchmark (1-4)")
+    parser.add_argument('--boards', type=int, default=10, help="number of boards per difficulty")
+    parser.add_argument('--first-seed', type=int, default=0, help="seed of the first board")
+    parser.add_argument('--algorithms', nargs='+',
+                        choices=[name for name, _, _ in COMPARED_ALGORITHMS],
+                        help="algorithms to run (default: all)")
+    parser.add_argument('--target-gain', type=int, default=250,
+                        help="points to gain per difficulty level to reach the goal")
+    parser.add_argument('--time-limit', type=float, default=10, help="time limit of each run in seconds")
+    parser.add_argument('--workers', type=int, help="number of worker processes (default: one per CPU)")
+    parser.add_argument('--max-memory', type=int, help="memory limit of each worker in MiB")
+    parser.add_argument('--csv', help="file to write the result of each run to")
+    parser.add_argument('--summary-csv', help="file to write the summary to")
+    parser.add_argument('--json', help="file to write the settings, summary and runs to")
+    args = parser.parse_args(argv)
+    
+    start_time = time.time()
+    rows = run_benchmark(args.difficulties, args.boards, args.first_seed, args.algorithms,
+                         args.target_gain, args.time_limit, args.workers,
+                         args.max_memory * 1024 * 1024 if args.max_memory else None)
+    summary = summarize(rows)
+    
+    print(render_summary(summary))
+    print(f"\n{len(rows)} runs in {time.time() - start_time:.1f} seconds")
+    
+    if args.csv:
+        write_csv(rows, args.csv)
+    if args.summary_csv:
+        write_csv(summary, args.summary_csv, SUMMARY_FIELDS)
+    if args.json:
+        write_json(rows, summary, args.json, vars(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,624 @@
+"""
+bitboard_1_4.py - Compact bitboard state engine for the WoodBlockPuzzle game
+This module encodes the board as two integer bitmasks instead of a matrix of strings:
+- filled: one bit per occupied cell (obstacles, placed blocks and diamonds)
+- diamonds: one bit per cell holding a diamond
+
+Cell (row, col) of an NxN board is stored in bit row * N + col, so a 7x7 board
+fits in 49 bits. Pieces are identified by a small integer id and their masks are
+precomputed, so move generation, placement and line clearing become bit operations.
+
+States are hashed with Zobrist keys (one random 64-bit key per cell content and per
+piece shape, plus a score component), which apply_move updates incrementally.
+"""
+
+import random
+
+EMPTY = " "
+BLOCK = "#"
+DIAMOND = "D"
+
+# Basic shapes available at all difficulty levels
+BASIC_SHAPES = [
+    [[1, 1]],      # 2-block horizontal
+    [[1], [1]],    # 2-block vertical
+    [[1, 1, 1]],   # 3-block horizontal
+    [[1], [1], [1]] # 3-block vertical
+]
+
+# Medium shapes (available at difficulty 2+)
+MEDIUM_SHAPES = [
+    [[1, 1], [1, 1]],  # 2x2 square
+    [[1, 1], [1, 0]],  # L shape
+    [[1, 1], [0, 1]],  # Reversed L shape
+    [[1, 0], [1, 1]]   # L shape rotated
+]
+
+# Hard shapes (available at difficulty 3+)
+HARD_SHAPES = [
+    [[1, 1, 1], [1, 0, 0]],  # L shape long
+    [[1, 1, 1], [0, 0, 1]],  # Reversed L shape long
+    [[1, 0], [1, 0], [1, 1]] # L shape rotated long
+]
+
+# Expert shapes (only at difficulty 4)
+EXPERT_SHAPES = [
+    [[1, 1, 1], [0, 1, 0]],  # T shape
+    [[0, 1, 0], [1, 1, 1]],  # Inverted T shape
+    [[1, 1, 0], [0, 1, 1]]   # Z shape
+]
+
+# Board sizes used by the game (difficulty 1 to 4)
+BOARD_SIZES = (4, 5, 6, 7)
+
+# Registry of every piece shape seen so far, indexed by piece id
+_SHAPES = []
+_SHAPE_IDS = {}
+
+# Cache of piece masks anchored at the origin, keyed by (board_size, piece_id)
+_PIECE_LAYOUTS = {}
+
+# Cache of all legal placements, keyed by (board_size, piece_id)
+# Each entry is a list of ((x, y), mask, lines) triples; filled lazily by placement_table
+_PLACEMENTS = {}
+
+# Cache of row and column masks, keyed by board_size
+_LINE_MASKS = {}
+
+# Zobrist keys, drawn from a fixed seed so hashes are the same in every process
+_MASK64 = (1 << 64) - 1
+_SCORE_MULTIPLIER = 0x9E3779B97F4A7C15
+_zobrist_random = random.Random(0x5EED)
+_CELL_KEYS = {BLOCK: [], DIAMOND: []}
+_PIECE_KEYS = []
+
+# Cache of the Zobrist key of each placement mask
+_BLOCK_MASK_KEYS = {}
+
+if hasattr(int, "bit_count"):
+    def popcount(value):
+        """Returns the number of set bits in a non-negative integer."""
+        return value.bit_count()
+else:  # Python < 3.10
+    def popcount(value):
+        """Returns the number of set bits in a non-negative integer."""
+        return bin(value).count("1")
+
+def piece_id(piece):
+    """
+    Returns the id of a piece shape, registering the shape if it is new.
+
+    Args:
+        piece (list): A matrix representing the piece (1 for a block, 0 for a gap).
+
+    Returns:
+        int: The id of the shape.
+    """
+    key = tuple(tuple(1 if cell else 0 for cell in row) for row in piece)
+    pid = _SHAPE_IDS.get(key)
+    if pid is None:
+        pid = len(_SHAPES)
+        _SHAPES.append(key)
+        _SHAPE_IDS[key] = pid
+    return pid
+
+def shapes_for_difficulty(difficulty):
+    """
+    Returns the shapes that can be drawn at a difficulty level.
+
+    Args:
+        difficulty (int): Difficulty level from 1 to 4.
+
+    Returns:
+        list: The available piece matrices, in the order used by the game.
+    """
+    available_shapes = BASIC_SHAPES.copy()
+    if difficulty >= 2:
+        available_shapes.extend(MEDIUM_SHAPES)
+    if difficulty >= 3:
+        available_shapes.extend(HARD_SHAPES)
+    if difficulty >= 4:
+        available_shapes.extend(EXPERT_SHAPES)
+    return available_shapes
+
+def piece_shape(pid):
+    """
+    Returns the matrix of a registered piece shape.
+
+    Args:
+        pid (int): The id of the shape.
+
+    Returns:
+        list: A new matrix representing the piece.
+    """
+    return [list(row) for row in _SHAPES[pid]]
+
+# The piece the search algorithms assume is drawn after every move
+SINGLE_PIECE = piece_id([[1]])
+
+def piece_layout(board_size, pid):
+    """
+    Returns the height, width and mask of a piece anchored at the top-left corner.
+
+    Args:
+        board_size (int): The size of the board.
+        pid (int): The id of the shape.
+
+    Returns:
+        tuple: (height, width, mask)
+    """
+    layout = _PIECE_LAYOUTS.get((board_size, pid))
+    if layout is None:
+        shape = _SHAPES[pid]
+        mask = 0
+        for i, row in enumerate(shape):
+            for j, cell in enumerate(row):
+                if cell:
+                    mask |= 1 << (i * board_size + j)
+        layout = (len(shape), len(shape[0]), mask)
+        _PIECE_LAYOUTS[(board_size, pid)] = layout
+    return layout
+
+def _build_placements(board_size, pid):
+    """
+    Lists every ((x, y), mask, lines) placement of a piece that fits inside the board,
+    where lines holds the masks of the rows and columns the placement touches.
+    """
+    piece_height, piece_width, mask = piece_layout(board_size, pid)
+    row_masks, column_masks = line_masks(board_size)
+    placements = []
+    for x in range(board_size - piece_height + 1):
+        for y in range(board_size - piece_width + 1):
+            placed = mask << (x * board_size + y)
+            lines = tuple(line for line in row_masks + column_masks if placed & line)
+            placements.append(((x, y), placed, lines))
+    return placements
+
+def build_placement_tables():
+    """
+    Precomputes the placement tables of every game shape on every game board size.
+    Called automatically the first time a table is needed.
+    """
+    pids = [piece_id(shape) for shape in shapes_for_difficulty(4)] + [SINGLE_PIECE]
+    for board_size in BOARD_SIZES:
+        for pid in pids:
+            if (board_size, pid) not in _PLACEMENTS:
+                _PLACEMENTS[board_size, pid] = _build_placements(board_size, pid)
+
+def placement_table(board_size, pid):
+    """
+    Returns all placements of a piece on an empty board.
+    A placement is legal on a given board when its mask does not overlap the filled cells,
+    and it can only complete the lines listed with it.
+
+    Args:
+        board_size (int): The size of the board.
+        pid (int): The id of the shape.
+
+    Returns:
+        list: A list of ((x, y), mask, lines) triples.
+    """
+    table = _PLACEMENTS.get((board_size, pid))
+    if table is None:
+        if not _PLACEMENTS:
+            build_placement_tables()
+        table = _PLACEMENTS.get((board_size, pid))
+        if table is None:
+            # Board size or shape not used by the game
+            table = _PLACEMENTS[board_size, pid] = _build_placements(board_size, pid)
+    return table
+
+def line_masks(board_size):
+    """
+    Returns the precomputed row and column masks of a board size.
+
+    Args:
+        board_size (int): The size of the board.
+
+    Returns:
+        tuple: (row_masks, column_masks), each a tuple with one mask per line.
+    """
+    masks = _LINE_MASKS.get(board_size)
+    if masks is None:
+        first_row = (1 << board_size) - 1
+        first_column = 0
+        for i in range(board_size):
+            first_column |= 1 << (i * board_size)
+        masks = (tuple(first_row << (i * board_size) for i in range(board_size)),
+                 tuple(first_column << j for j in range(board_size)))
+        _LINE_MASKS[board_size] = masks
+    return masks
+
+def clear_full_lines(board_size, filled, diamonds):
+    """
+    Finds every complete row and column and clears them all at once.
+    Rows and columns are cleared simultaneously, so a diamond on the intersection of a
+    complete row and a complete column is captured (once) and both lines count.
+
+    Args:
+        board_size (int): The size of the board.
+        filled (int): Mask of the occupied cells.
+        diamonds (int): Mask of the cells holding a diamond.
+
+    Returns:
+        tuple: (filled, diamonds, lines_cleared, columns_cleared, diamonds_captured)
+    """
+    row_masks, column_masks = line_masks(board_size)
+
+    # After the folds, bit i*N of rows is set iff row i is full,
+    # and bit j of columns is set iff column j is full
+    rows = filled
+    columns = filled
+    for k in range(1, board_size):
+        rows &= filled >> k
+        columns &= filled >> (k * board_size)
+    rows &= column_masks[0]
+    columns &= row_masks[0]
+
+    if not rows and not columns:
+        return filled, diamonds, 0, 0, 0
+
+    # Spread each flag over its whole line (the products never carry)
+    cleared = rows * row_masks[0] | columns * column_masks[0]
+    return (filled & ~cleared, diamonds & ~cleared,
+            popcount(rows), popcount(columns), popcount(diamonds & cleared))
+
+def clear_board_lines(board):
+    """
+    Clears every complete row and column of a board matrix in place.
+
+    Args:
+        board (list): A board matrix of " ", "#" and "D" cells.
+
+    Returns:
+        tuple: (lines_cleared, columns_cleared, diamonds_captured)
+    """
+    filled, diamonds = encode_board(board)
+    new_filled, _, lines_cleared, columns_cleared, diamonds_captured = clear_full_lines(
+        len(board), filled, diamonds)
+    erase_cells(board, filled & ~new_filled)
+    return lines_cleared, columns_cleared, diamonds_captured
+
+def erase_cells(board, cells):
+    """
+    Empties the cells of a board matrix selected by a mask.
+
+    Args:
+        board (list): A board matrix of " ", "#" and "D" cells.
+        cells (int): Mask of the cells to empty.
+    """
+    board_size = len(board)
+    while cells:
+        bit = cells & -cells
+        i, j = divmod(bit.bit_length() - 1, board_size)
+        board[i][j] = EMPTY
+        cells ^= bit
+
+def _cell_keys(content, count):
+    """Returns the Zobrist keys of a cell content, making sure there are at least count of them."""
+    keys = _CELL_KEYS[content]
+    while len(keys) < count:
+        # Draw keys for both contents together so they never depend on the call order
+        for other in (BLOCK, DIAMOND):
+            _CELL_KEYS[other].append(_zobrist_random.getrandbits(64))
+    return keys
+
+def cells_key(cells, content):
+    """
+    Returns the XOR of the Zobrist keys of a set of cells holding the same content.
+
+    Args:
+        cells (int): Mask of the cells.
+        content (str): BLOCK or DIAMOND.
+
+    Returns:
+        int: The combined 64-bit key.
+    """
+    keys = _cell_keys(content, cells.bit_length())
+    key = 0
+    while cells:
+        bit = cells & -cells
+        key ^= keys[bit.bit_length() - 1]
+        cells ^= bit
+    return key
+
+def block_mask_key(mask):
+    """Returns the (cached) Zobrist key of a placement mask filled with blocks."""
+    key = _BLOCK_MASK_KEYS.get(mask)
+    if key is None:
+        key = _BLOCK_MASK_KEYS[mask] = cells_key(mask, BLOCK)
+    return key
+
+def piece_key(pid):
+    """Returns the Zobrist key of a piece shape."""
+    while len(_PIECE_KEYS) <= pid:
+        _PIECE_KEYS.append(_zobrist_random.getrandbits(64))
+    return _PIECE_KEYS[pid]
+
+def score_key(score):
+    """
+    Returns the score component of a Zobrist hash.
+    Scores are unbounded, so the key is a multiplicative hash instead of a table lookup.
+    """
+    return (score * _SCORE_MULTIPLIER) & _MASK64
+
+def zobrist_hash(filled, diamonds, pid):
+    """
+    Computes from scratch the Zobrist hash of a board and piece (without the score).
+
+    Args:
+        filled (int): Mask of the occupied cells.
+        diamonds (int): Mask of the cells holding a diamond.
+        pid (int): The id of the current piece.
+
+    Returns:
+        int: The 64-bit hash.
+    """
+    return cells_key(filled & ~diamonds, BLOCK) ^ cells_key(diamonds, DIAMOND) ^ piece_key(pid)
+
+def encode_board(board):
+    """
+    Encodes a board matrix as bitmasks.
+
+    Args:
+        board (list): A board matrix of " ", "#" and "D" cells.
+
+    Returns:
+        tuple: (filled, diamonds)
+    """
+    board_size = len(board)
+    filled = 0
+    diamonds = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell != EMPTY:
+                bit = 1 << (i * board_size + j)
+                filled |= bit
+                if cell == DIAMOND:
+                    diamonds |= bit
+    return filled, diamonds
+
+def decode_board(board_size, filled, diamonds):
+    """
+    Decodes bitmasks back into a board matrix.
+
+    Args:
+        board_size (int): The size of the board.
+        filled (int): Mask of the occupied cells.
+        diamonds (int): Mask of the cells holding a diamond.
+
+    Returns:
+        list: A board matrix of " ", "#" and "D" cells.
+    """
+    board = []
+    for i in range(board_size):
+        row = []
+        for j in range(board_size):
+            bit = 1 << (i * board_size + j)
+            if diamonds & bit:
+                row.append(DIAMOND)
+            elif filled & bit:
+                row.append(BLOCK)
+            else:
+                row.append(EMPTY)
+        board.append(row)
+    return board
+
+def rebuild_path(state):
+    """
+    Rebuilds the list of moves that led to a state by following its parent pointers.
+
+    Args:
+        state: A state with parent, move and root_path attributes.
+
+    Returns:
+        list: The moves from the root state's own path up to this state.
+    """
+    moves = []
+    while state.parent is not None:
+        moves.append(state.move)
+        state = state.parent
+    moves.reverse()
+    return list(state.root_path) + moves
+
+class BitboardState:
+    """
+    Compact representation of a state of the WoodBlockPuzzle game.
+    Offers the same interface as GameState, so every search algorithm can run on it.
+    The zobrist attribute holds the hash of the board and piece; the score is mixed in by __hash__.
+    Each state points to its parent and to the move that produced it, and the path is only
+    rebuilt when it is read.
+    """
+    __slots__ = ("board_size", "filled", "diamonds", "piece", "score", "zobrist",
+                 "parent", "move", "root_path", "depth")
+
+    def __init__(self, board_size, filled, diamonds, piece, score, path=None, zobrist=None):
+        """
+        Initializes a new compact game state.
+
+        Args:
+            board_size (int): The size of the board.
+            filled (int): Mask of the occupied cells.
+            diamonds (int): Mask of the cells holding a diamond.
+            piece (int): The id of the current piece.
+            score (int): The current player's score.
+            path (list, optional): A list of moves that led to this state.
+            zobrist (int, optional): The Zobrist hash of the board and piece, if already known.
+        """
+        self.board_size = board_size
+        self.filled = filled
+        self.diamonds = diamonds
+        self.piece = piece
+        self.score = score
+        self.zobrist = zobrist if zobrist is not None else zobrist_hash(filled, diamonds, piece)
+        self.parent = None
+        self.move = None
+        self.root_path = path if path is not None else ()
+        # Number of moves applied since the root of the parent chain
+        self.depth = 0
+
+    @property
+    def path(self):
+        """The list of moves that led to this state."""
+        return rebuild_path(self)
+
+    @classmethod
+    def from_board(cls, board, current_piece, score, path=None):
+        """Creates a compact state from a board matrix and a piece matrix."""
+        filled, diamonds = encode_board(board)
+        return cls(len(board), filled, diamonds, piece_id(current_piece), score,
+                   list(path) if path is not None else None)
+
+    @classmethod
+    def from_game_state(cls, state):
+        """Creates a compact state from a GameState."""
+        return cls.from_board(state.board, state.current_piece, state.score, state.path)
+
+    @property
+    def board(self):
+        """The board as a matrix of " ", "#" and "D" cells."""
+        return decode_board(self.board_size, self.filled, self.diamonds)
+
+    @property
+    def current_piece(self):
+        """The current piece as a matrix."""
+        return piece_shape(self.piece)
+
+    def __eq__(self, other):
+        """Two states are equal if they have the same board, current piece and score."""
+        return (self.filled == other.filled and
+                self.diamonds == other.diamonds and
+                self.piece == other.piece and
+                self.score == other.score)
+
+    def __hash__(self):
+        """Calculates a hash value for the state, allowing its use in sets and dictionaries."""
+        return self.zobrist ^ score_key(self.score)
+
+    def __lt__(self, other):
+        """States with a higher score come first in priority queues."""
+        return self.score > other.score
+
+    def position_key(self):
+        """Returns a key that identifies the board and the current piece, ignoring the score."""
+        return (self.filled, self.diamonds, self.piece)
+
+    def get_valid_moves(self):
+        """
+        Gets all valid moves from this state.
+
+        Returns:
+            list: A list of tuples (x, y) representing valid positions or 'R' to request a new piece.
+        """
+        filled = self.filled
+        valid_moves = [move for move, mask, _ in placement_table(self.board_size, self.piece)
+                       if not filled & mask]
+        valid_moves.append('R')
+        return valid_moves
+
+    def apply_move(self, move):
+        """
+        Applies a move and returns the resulting new state.
+
+        Args:
+            move: A tuple (x, y) to place the piece or 'R' to request a new piece.
+
+        Returns:
+            BitboardState: The new state after applying the move.
+        """
+        board_size = self.board_size
+        difficulty = board_size - 3  # 4x4 → 1, 5x5 → 2, etc.
+        zobrist = self.zobrist ^ piece_key(self.piece) ^ piece_key(SINGLE_PIECE)
+        # Children have the same class as their parent, so subclasses propagate
+        new_state = type(self)(board_size, self.filled, self.diamonds, SINGLE_PIECE,
+                               self.score - 10 * difficulty // 2, zobrist=zobrist)
+        new_state.parent = self
+        new_state.move = move
+        new_state.depth = self.depth + 1
+
+        if move == 'R':
+            if new_state.score < 0:
+                new_state.score = 0
+        else:
+            x, y = move
+            _, _, mask = piece_layout(board_size, self.piece)
+            mask <<= x * board_size + y
+            new_state.filled |= mask
+            new_state.zobrist ^= block_mask_key(mask)
+            new_state.check_full_lines_and_columns()
+
+        return new_state
+
+    def children(self):
+        """
+        Applies every valid move at once and returns the resulting states.
+        Equivalent to calling apply_move on each move of get_valid_moves, in the same order,
+        but the work shared by all the children is only done once.
+
+        Returns:
+            list: The child states, each with its move and parent set.
+        """
+        board_size = self.board_size
+        filled = self.filled
+        diamonds = self.diamonds
+        depth = self.depth + 1
+        new_state_class = type(self)
+        penalty = 10 * (board_size - 3) // 2
+        score = self.score - penalty
+        zobrist = self.zobrist ^ piece_key(self.piece) ^ piece_key(SINGLE_PIECE)
+
+        # If the board has no complete line yet, a placement can only complete the lines
+        # it touches, so the full clearing check is skipped for most children
+        _, _, lines_cleared, columns_cleared, _ = clear_full_lines(board_size, filled, diamonds)
+        check_all = lines_cleared > 0 or columns_cleared > 0
+
+        children = []
+        for move, mask, lines in placement_table(board_size, self.piece):
+            if not filled & mask:
+                new_filled = filled | mask
+                child = new_state_class(board_size, new_filled, diamonds, SINGLE_PIECE, score,
+                                        zobrist=zobrist ^ block_mask_key(mask))
+                child.parent = self
+                child.move = move
+                child.depth = depth
+                if check_all:
+                    child.check_full_lines_and_columns()
+                else:
+                    for line in lines:
+                        if new_filled & line == line:
+                            child.check_full_lines_and_columns()
+                            break
+                children.append(child)
+
+        # Requesting a new piece
+        child = new_state_class(board_size, filled, diamonds, SINGLE_PIECE, max(score, 0),
+                                zobrist=zobrist)
+        child.parent = self
+        child.move = 'R'
+        child.depth = depth
+        children.append(child)
+        return children
+
+    def check_full_lines_and_columns(self):
+        """
+        Checks if there are complete lines or columns on the board and clears them.
+        Also captures diamonds and adds points.
+
+        Returns:
+            tuple: (lines_cleared, columns_cleared, diamonds_captured)
+        """
+        difficulty = self.board_size - 3
+        filled, diamonds = self.filled, self.diamonds
+        self.filled, self.diamonds, lines_cleared, columns_cleared, diamonds_captured = \
+            clear_full_lines(self.board_size, filled, diamonds)
+
+        # Add points based on difficulty
+        if lines_cleared > 0 or columns_cleared > 0:
+            # Removes the cleared cells from the hash
+            self.zobrist ^= (cells_key(filled & ~diamonds & ~self.filled, BLOCK) ^
+                             cells_key(diamonds & ~self.diamonds, DIAMOND))
+            base_points = 50 * difficulty
+            self.score += base_points * (lines_cleared + columns_cleared)
+            self.score += 100 * difficulty * diamonds_captured
+
+        return lines_cleared, columns_cleared, diamonds_captured
@@ -0,0 +1,317 @@
+"""
+Headless environments of Wood Block Puzzle, for self-play and experiments.
+
+WoodBlockPuzzle is an interactive game: it reads the moves with input() and prints the board
+and the events. The environments of this module follow exactly the same rules (boards,
+pieces, penalties and points), but never read or print anything, and draw their boards and
+pieces from their own random generator:
+
+- WoodPuzzleEnv plays one game with reset(seed), legal_moves() and step(move).
+- BatchedWoodPuzzleEnv advances thousands of games at once, stored as NumPy arrays of
+  bitboards (it requires NumPy).
+
+Usage example:
+    env = WoodPuzzleEnv(difficulty=2)
+    state = env.reset(seed=7)
+    while not env.done:
+        state, reward, done, info = env.step(env.legal_moves()[0])
+"""
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+from bitboard_1_4 import (BitboardState, clear_full_lines, decode_board, line_masks, piece_id,
+                          piece_shape, placement_table, shapes_for_difficulty)
+from WoodPuzzle_1_4 import WoodBlockPuzzle
+
+def _initial_game(difficulty, generator):
+    """Creates the initial board and piece of a game, as WoodBlockPuzzle does."""
+    game = WoodBlockPuzzle(difficulty, generator)
+    return BitboardState.from_board(game.board, game.current_piece, game.score)
+
+class WoodPuzzleEnv:
+    """
+    Headless game of Wood Block Puzzle.
+    
+    reset(seed) starts the same game as WoodBlockPuzzle after random.seed(seed), and the same
+    moves then get the same pieces. The environment also has the board, current_piece and
+    score attributes of WoodBlockPuzzle, so the AI (get_ai_move, SolverSession, MCTSPlanner)
+    can play it directly.
+    """
+    def __init__(self, difficulty=1, target_score=None):
+        """
+        Initializes a new environment; call reset() to start a game.
+        
+        Args:
+            difficulty (int, optional): Difficulty level from 1 to 4.
+            target_score (int, optional): Score that ends the game as won (None to play until
+                the score runs out).
+        """
+        self.difficulty = min(max(difficulty, 1), 4)
+        self.board_size = 3 + self.difficulty
+        self.target_score = target_score
+        self.penalty = 10 * self.difficulty // 2
+        # Pieces drawn by the game, in the order of generate_piece
+        self.pieces = [piece_id(shape) for shape in shapes_for_difficulty(self.difficulty)]
+        self.generator = random.Random()
+        self.state = None
+        self.moves = 0
+        self.done = True
+    
+    def reset(self, seed=None):
+        """
+        Starts a new game.
+        
+        Args:
+            seed (int, optional): Seed of the game (None for a random game).
+        
+        Returns:
+            BitboardState: The initial state.
+        """
+        self.generator = random.Random(seed)
+        self.state = _initial_game(self.difficulty, self.generator)
+        self.moves = 0
+        self.done = False
+        return self.state
+    
+    @property
+    def board(self):
+        """The board as a matrix of " ", "#" and "D" cells."""
+        return decode_board(self.board_size, self.state.filled, self.state.diamonds)
+    
+    @property
+    def current_piece(self):
+        """The current piece as a matrix of 0 and 1."""
+        return piece_shape(self.state.piece)
+    
+    @property
+    def score(self):
+        """The current score."""
+        return self.state.score
+    
+    def legal_moves(self):
+        """
+        Returns the moves of the current position: (x, y) placements and 'R' (new piece).
+        There are none once the game is over.
+        """
+        if self.done:
+            return []
+        return self.state.get_valid_moves()
+    
+    def step(self, move):
+        """
+        Plays a move.
+        
+        Args:
+            move: A tuple (x, y) to place the piece or 'R' to request a new piece.
+        
+        Returns:
+            tuple: (state, reward, done, info): the new state, the change of score, whether
+                the game is over, and a dictionary with the lines, columns and diamonds cleared.
+        
+        Raises:
+            ValueError: If the game is over or the move is not legal.
+        """
+        if self.done:
+            raise ValueError("The game is over; call reset() to start a new one")
+        state = self.state
+        board_size = self.board_size
+        lines_cleared = columns_cleared = diamonds_captured = 0
+        
+        if move == 'R':
+            filled, diamonds = state.filled, state.diamonds
+            score = max(state.score - self.penalty, 0)
+        else:
+            mask = next((mask for placement, mask, _ in placement_table(board_size, state.piece)
+                         if placement == tuple(move)), None)
+            if mask is None or state.filled & mask:
+                raise ValueError(f"Invalid move: {move}")
+            filled, diamonds, lines_cleared, columns_cleared, diamonds_captured = clear_full_lines(
+                board_size, state.filled | mask, state.diamonds)
+            score = (state.score - self.penalty + 50 * self.difficulty * (lines_cleared + columns_cleared)
+                     + 100 * self.difficulty * diamonds_captured)
+        
+        # The next piece is drawn as the game does, after every move
+        self.state = BitboardState(board_size, filled, diamonds, self.generator.choice(self.pieces),
+                                   score)
+        self.moves += 1
+        self.done = score <= 0 or (self.target_score is not None and score >= self.target_score)
+        info = {'lines': lines_cleared, 'columns': columns_cleared, 'diamonds': diamonds_captured}
+        return self.state, score - state.score, self.done, info
+
+def popcount_array(values):
+    """Number of set bits of each value of a uint64 NumPy array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values).astype(np.int64)
+    # NumPy < 2.0
+    bits = np.unpackbits(values.astype('<u8').view(np.uint8).reshape(-1, 8), axis=1)
+    return bits.sum(axis=1, dtype=np.int64)
+
+class BatchedWoodPuzzleEnv:
+    """
+    Many headless games of Wood Block Puzzle advanced together, on NumPy arrays.
+    
+    The games are stored as arrays with one entry per game: filled and diamonds (uint64
+    bitboards, see bitboard_1_4.py), piece (index in pieces), score, moves and done. A move
+    of a game is an action: the index of a placement of its current piece (placement_moves
+    gives the (x, y) position of each index), or -1 to request a new piece. Every call to
+    step() plays one action in every game that is not over; the games that are over do not
+    change.
+    """
+    def __init__(self, difficulty=1, count=1024, target_score=None):
+        """
+        Initializes the games; call reset() to start them.
+        
+        Args:
+            difficulty (int, optional): Difficulty level from 1 to 4.
+            count (int, optional): Number of games.
+            target_score (int, optional): Score that ends a game as won (None to play until
+                the score runs out).
+        
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError("BatchedWoodPuzzleEnv requires NumPy")
+        self.difficulty = min(max(difficulty, 1), 4)
+        self.board_size = 3 + self.difficulty
+        self.count = count
+        self.target_score = target_score
+        self.penalty = 10 * self.difficulty // 2
+        self.pieces = [piece_id(shape) for shape in shapes_for_difficulty(self.difficulty)]
+        self._piece_index = {pid: index for index, pid in enumerate(self.pieces)}
+        
+        # Placements of each piece, padded to the same width (padding is never legal)
+        tables = [placement_table(self.board_size, pid) for pid in self.pieces]
+        width = max(len(table) for table in tables)
+        self.placement_moves = [[move for move, _, _ in table] for table in tables]
+        self.placement_masks = np.zeros((len(tables), width), dtype=np.uint64)
+        self.placement_valid = np.zeros((len(tables), width), dtype=bool)
+        for index, table in enumerate(tables):
+            self.placement_masks[index, :len(table)] = [mask for _, mask, _ in table]
+            self.placement_valid[index, :len(table)] = True
+        row_masks, column_masks = line_masks(self.board_size)
+        self.line_masks = np.array(row_masks + column_masks, dtype=np.uint64)[:, None]
+        
+        self.generator = np.random.default_rng()
+        self.filled = self.diamonds = self.piece = self.score = self.moves = self.done = None
+    
+    def reset(self, seed=None):
+        """
+        Starts new games.
+        Each board is the one WoodBlockPuzzle creates with a random generator seeded from the
+        environment's generator, so the same seed gives the same games.
+        
+        Args:
+            seed (int, optional): Seed of the games (None for random games).
+        """
+        self.generator = np.random.default_rng(seed)
+        states = [_initial_game(self.difficulty, random.Random(int(game_seed)))
+                  for game_seed in self.generator.integers(2 ** 63, size=self.count)]
+        self.filled = np.array([state.filled for state in states], dtype=np.uint64)
+        self.diamonds = np.array([state.diamonds for state in states], dtype=np.uint64)
+        self.piece = np.array([self._piece_index[state.piece] for state in states], dtype=np.int64)
+        self.score = np.array([state.score for state in states], dtype=np.int64)
+        self.moves = np.zeros(self.count, dtype=np.int64)
+        self.done = np.zeros(self.count, dtype=bool)
+    
+    def legal_moves(self):
+        """
+        Returns the legal placements of every game.
+        
+        Returns:
+            numpy.ndarray: A count x width boolean array; entry [i, a] tells whether action a
+                places the current piece of game i (requesting a piece, -1, is always legal
+                while the game is not over).
+        """
+        masks = self.placement_masks[self.piece]
+        return (self.placement_valid[self.piece] & (self.filled[:, None] & masks == 0)
+                & ~self.done[:, None])
+    
+    def random_actions(self):
+        """
+        Draws a random legal placement for every game, or -1 if its piece does not fit.
+        
+        Returns:
+            numpy.ndarray: One action per game.
+        """
+        legal = self.legal_moves()
+        draws = self.generator.random(legal.shape) * legal
+        return np.where(legal.any(axis=1), draws.argmax(axis=1), -1)
+    
+    def step(self, actions):
+        """
+        Plays one action in every game that is not over.
+        
+        Args:
+            actions (numpy.ndarray): One action per game: a placement index, or -1 to request
+                a new piece (ignored for the games that are over).
+        
+        Returns:
+            tuple: (rewards, done): the change of score of each game and whether it is over.
+        
+        Raises:
+            ValueError: If an action places a piece where it does not fit.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        active = ~self.done
+        placing = active & (actions >= 0)
+        requesting = active & (actions < 0)
+        
+        # Places the pieces
+        width = self.placement_masks.shape[1]
+        indices = np.where(placing, actions, 0)
+        if (indices >= width).any():
+            raise ValueError("Invalid action: placement index out of range")
+        masks = np.where(placing, self.placement_masks[self.piece, indices], np.uint64(0))
+        legal = self.placement_valid[self.piece, indices] & (self.filled & masks == 0)
+        if (placing & ~legal).any():
+            raise ValueError(f"Invalid action in game {int(np.argmax(placing & ~legal))}")
+        filled = self.filled | masks
+        
+        # Clears the complete lines of the games that placed a piece
+        full = (filled & self.line_masks == self.line_masks) & placing
+        cleared = np.bitwise_or.reduce(np.where(full, self.line_masks, np.uint64(0)), axis=0)
+        lines = full.sum(axis=0)
+        captured = popcount_array(self.diamonds & cleared)
+        self.filled = filled & ~cleared
+        self.diamonds = self.diamonds & ~cleared
+        
+        previous_score = self.score
+        score = (self.score - self.penalty * active + 50 * self.difficulty * lines
+                 + 100 * self.difficulty * captured)
+        self.score = np.where(requesting, np.maximum(score, 0), score)
+        
+        # Draws the next piece of every game that played
+        self.piece = np.where(active, self.generator.integers(len(self.pieces), size=self.count),
+                              self.piece)
+        self.moves += active
+        over = self.score <= 0
+        if self.target_score is not None:
+            over |= self.score >= self.target_score
+        self.done = self.done | (active & over)
+        return self.score - previous_score, self.done.copy()
+    
+    def state(self, index):
+        """
+        Returns one game as a BitboardState (e.g. to let the AI play it).
+        
+        Args:
+            index (int): The index of the game.
+        """
+        return BitboardState(self.board_size, int(self.filled[index]), int(self.diamonds[index]),
+                             self.pieces[self.piece[index]], int(self.score[index]))
+    
+    def action_of(self, index, move):
+        """
+        Converts a move of game index, (x, y) or 'R', into an action.
+        
+        Raises:
+            ValueError: If the current piece of the game has no such placement.
+        """
+        if move == 'R':
+            return -1
+        return self.placement_moves[self.piece[index]].index(tuple(move))
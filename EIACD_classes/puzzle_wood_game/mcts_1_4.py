@@ -0,0 +1,320 @@
+"""
+Monte Carlo Tree Search planner for Wood Block Puzzle, with the real random pieces.
+
+The searches of AI_algorithms_1_4 plan as if every piece after the current one were a 1x1
+piece, but the game draws each new piece uniformly among the shapes of its difficulty level.
+This planner models that: after each move, a chance node draws the next piece from the same
+distribution as WoodBlockPuzzle.generate_piece, so the tree only grows along positions that
+can actually occur, weighted by how likely they are.
+
+Each iteration walks down the tree with UCB1 on the moves and a random draw on the pieces,
+adds one node, and evaluates it with a batch of cheap random rollouts (games played a few
+moves ahead with a simple policy). The tree is bounded by a node budget; once it is full, the
+remaining iterations only refine the statistics of the existing nodes.
+"""
+import logging
+import math
+import random
+import time
+
+from AI_algorithms_1_4 import Deadline
+from bitboard_1_4 import (BitboardState, clear_full_lines, piece_id, placement_table, popcount,
+                          shapes_for_difficulty)
+
+logger = logging.getLogger(__name__)
+
+def rollouts(state, count, horizon, target_score, pieces, generator=random, discount=1.0):
+    """
+    Plays a batch of games with random pieces from a state and returns their mean value.
+    
+    The games advance together, one move each per step. Each move places the current piece
+    where it fills the lines it touches the most (so it completes a line whenever it can), and
+    requests a new piece only when it does not fit. A game is worth 1 when it reaches the
+    target score, 0 when it runs out of points, and its score over the target score after
+    horizon moves; each move multiplies that value by the discount.
+    
+    Args:
+        state (BitboardState): The state to evaluate.
+        count (int): Number of games.
+        horizon (int): Maximum number of moves of each game.
+        target_score (int): The target score of the game.
+        pieces (list): Ids of the pieces the game draws from (uniformly, as generate_piece).
+        generator (random.Random, optional): Source of the random pieces.
+        discount (float, optional): Factor applied to the value of a game for each move.
+    
+    Returns:
+        float: The mean value of the games, between 0 and 1.
+    """
+    board_size = state.board_size
+    difficulty = board_size - 3
+    penalty = 10 * difficulty // 2
+    games = [(state.filled, state.diamonds, state.piece, state.score)] * count
+    total = 0.0
+    
+    weight = 1.0
+    for _ in range(horizon):
+        weight *= discount
+        playing = []
+        for filled, diamonds, pid, score in games:
+            fits = [(mask, lines) for _, mask, lines in placement_table(board_size, pid)
+                    if not filled & mask]
+            if fits:
+                # The placement filling its lines the most (completing one if it can)
+                choice = None
+                best = -1
+                for mask, lines in fits:
+                    placed = filled | mask
+                    fill = 0
+                    for line in lines:
+                        cells = popcount(placed & line)
+                        fill += cells * cells
+                    if fill > best:
+                        best = fill
+                        choice = mask
+                filled, diamonds, lines_cleared, columns_cleared, captured = clear_full_lines(
+                    board_size, filled | choice, diamonds)
+                score += (50 * difficulty * (lines_cleared + columns_cleared)
+                          + 100 * difficulty * captured - penalty)
+            else:
+                score = max(score - penalty, 0)
+            
+            if score >= target_score:
+                total += weight
+            elif score > 0:
+                playing.append((filled, diamonds, generator.choice(pieces), score))
+        games = playing
+        if not games:
+            break
+    
+    # Games still running after the horizon are worth the share of the target they reached
+    total += weight * sum(score / target_score for _, _, _, score in games)
+    return total / count
+
+class _ChanceNode:
+    """Node of a move: the position after the move, before the next piece is drawn."""
+    __slots__ = ("move", "after", "visits", "value", "outcomes")
+    
+    def __init__(self, move, after):
+        self.move = move
+        self.after = after
+        self.visits = 0
+        self.value = 0.0
+        # Piece id -> _DecisionNode
+        self.outcomes = {}
+
+class _DecisionNode:
+    """Node of a position with a known current piece, where the player chooses a move."""
+    __slots__ = ("state", "visits", "value", "children", "untried")
+    
+    def __init__(self, state, generator):
+        self.state = state
+        self.visits = 0
+        self.value = 0.0
+        self.children = []
+        # Moves not expanded yet, tried in random order
+        self.untried = state.get_valid_moves()
+        generator.shuffle(self.untried)
+
+def _count_nodes(root):
+    """Counts the nodes of a subtree."""
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        for chance in node.children:
+            count += 1
+            stack.extend(chance.outcomes.values())
+    return count
+
+class MCTSPlanner:
+    """
+    Monte Carlo Tree Search over the real game, where the next pieces are random.
+    
+    It has the same interface as SolverSession: best_move() recommends a move for the current
+    position, and play() tells the planner which move was played, so that the part of the tree
+    below the move and the piece actually drawn is reused on the next turn.
+    """
+    def __init__(self, target_score=500, time_limit=10, max_nodes=200000, rollouts_per_leaf=8,
+                 horizon=12, exploration=0.7, discount=0.9, seed=None):
+        """
+        Initializes a new planner.
+        
+        Args:
+            target_score (int, optional): The target score of the game.
+            time_limit (float, optional): Time limit in seconds of each decision.
+            max_nodes (int, optional): Maximum number of nodes of the tree.
+            rollouts_per_leaf (int, optional): Number of random games evaluating each new node.
+            horizon (int, optional): Maximum number of moves of each random game.
+            exploration (float, optional): Exploration constant of UCB1.
+            discount (float, optional): Factor applied to the value for each move, so that
+                reaching the target sooner is worth more.
+            seed (int, optional): Seed of the planner's own random generator (the game's
+                random generator is never used).
+        """
+        self.target_score = target_score
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.rollouts_per_leaf = rollouts_per_leaf
+        self.horizon = horizon
+        self.exploration = exploration
+        self.discount = discount
+        self.node_count = 0
+        self.iterations = 0
+        self.rollouts = 0
+        self._root = None
+        self._played = None
+        self._pieces = {}
+        self._random = random.Random(seed)
+    
+    def _pieces_of(self, board_size):
+        """Ids of the pieces the game draws from on a board size."""
+        pieces = self._pieces.get(board_size)
+        if pieces is None:
+            pieces = self._pieces[board_size] = [piece_id(shape) for shape in
+                                                 shapes_for_difficulty(board_size - 3)]
+        return pieces
+    
+    def _terminal_value(self, state):
+        """Value of a finished game (1 at the target, 0 out of points), or None."""
+        if state.score >= self.target_score:
+            return 1.0
+        if state.score <= 0:
+            return 0.0
+        return None
+    
+    def _new_node(self, state):
+        """Creates a decision node, counting it in the node budget."""
+        self.node_count += 1
+        return _DecisionNode(state, self._random)
+    
+    def _select(self, node):
+        """Chooses the move of a decision node with the highest UCB1 value."""
+        log_visits = math.log(node.visits)
+        exploration = self.exploration
+        return max(node.children, key=lambda child: child.value / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+    
+    def _iterate(self, root, pieces):
+        """Runs one iteration: selection, expansion, evaluation and backpropagation."""
+        node = root
+        path = [root]
+        while True:
+            can_grow = self.node_count < self.max_nodes
+            if node.untried and can_grow:
+                # Expansion: a new move of this position
+                move = node.untried.pop()
+                chance = _ChanceNode(move, node.state.apply_move(move))
+                self.node_count += 1
+                node.children.append(chance)
+            elif node.children:
+                chance = self._select(node)
+            else:
+                # The tree is full (or the position has no move left): evaluates it
+                value = rollouts(node.state, self.rollouts_per_leaf, self.horizon,
+                                 self.target_score, pieces, self._random, self.discount)
+                self.rollouts += self.rollouts_per_leaf
+                break
+            path.append(chance)
+            
+            value = self._terminal_value(chance.after)
+            if value is not None:
+                break
+            
+            # Chance: the game draws the next piece
+            pid = self._random.choice(pieces)
+            child = chance.outcomes.get(pid)
+            if child is None:
+                after = chance.after
+                state = BitboardState(after.board_size, after.filled, after.diamonds, pid, after.score)
+                if can_grow:
+                    child = chance.outcomes[pid] = self._new_node(state)
+                    path.append(child)
+                value = rollouts(state, self.rollouts_per_leaf, self.horizon, self.target_score,
+                                 pieces, self._random, self.discount)
+                self.rollouts += self.rollouts_per_leaf
+                break
+            node = child
+            path.append(node)
+        
+        # Each move between a node and the evaluated one discounts the value
+        for visited in reversed(path):
+            visited.visits += 1
+            visited.value += value
+            if isinstance(visited, _ChanceNode):
+                value *= self.discount
+    
+    def _reuse_root(self, state):
+        """Returns the subtree of the move played and the piece drawn, if it matches the state."""
+        if self._played is None:
+            return None
+        root = self._played.outcomes.get(state.piece)
+        self._played = None
+        if root is None or root.state != state:
+            return None
+        return root
+    
+    def best_move(self, game, deadline=None):
+        """
+        Gets the next move for the current position.
+        
+        Args:
+            game (WoodBlockPuzzle, GameState or BitboardState): The current position.
+            deadline (Deadline, optional): Budget of the search; replaces time_limit if given.
+        
+        Returns:
+            move: The most visited move, or None if the game is already won or lost.
+        """
+        if isinstance(game, BitboardState):
+            state = BitboardState(game.board_size, game.filled, game.diamonds, game.piece, game.score)
+        else:
+            state = BitboardState.from_board(game.board, game.current_piece, game.score)
+        if self._terminal_value(state) is not None:
+            return None
+        if deadline is None:
+            deadline = Deadline(self.time_limit)
+        start_time = time.time()
+        
+        root = self._reuse_root(state)
+        if root is None:
+            self.node_count = 0
+            root = self._new_node(state)
+        else:
+            self.node_count = _count_nodes(root)
+            logger.info("Reusing %d visits of the previous tree.", root.visits)
+        self._root = root
+        pieces = self._pieces_of(state.board_size)
+        
+        iterations = 0
+        while not deadline.check(1):
+            self._iterate(root, pieces)
+            iterations += 1
+        self.iterations += iterations
+        
+        logger.info("MCTS: %d iterations, %d nodes, in %.2f seconds.", iterations,
+                    self.node_count, time.time() - start_time)
+        if not root.children:
+            return None
+        best = max(root.children, key=lambda child: (child.visits, child.value))
+        return best.move
+    
+    def play(self, move):
+        """
+        Re-roots the tree on the move actually played.
+        
+        Args:
+            move: The move played.
+        """
+        self._played = None
+        if self._root is not None:
+            for child in self._root.children:
+                if child.move == move:
+                    self._played = child
+                    break
+        self._root = None
+    
+    def clear(self):
+        """Forgets the tree."""
+        self._root = None
+        self._played = None
+        self.node_count = 0
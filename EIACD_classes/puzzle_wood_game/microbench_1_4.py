@@ -0,0 +1,243 @@
+"""
+Micro-benchmarks of the hot path of the AI searches.
+
+Measures, in isolation, the operations per second of get_valid_moves, apply_move,
+check_full_lines_and_columns, hashing a state from scratch and heuristic_board_potential, on both state
+representations (GameState and BitboardState), for every board size and piece family.
+The fixtures are fixed boards, so the numbers of two runs on the same machine are comparable.
+
+The results can be saved as a baseline JSON file, and later runs compared against it: the run
+fails (exit status 1) if a primitive got slower than the baseline by more than the threshold.
+
+Usage example:
+    python microbench_1_4.py --save-baseline microbench_baseline.json
+    python microbench_1_4.py --baseline microbench_baseline.json --threshold 10
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from AI_algorithms_1_4 import (GameState, apply_move, check_full_lines_and_columns, get_valid_moves,
+                               heuristic_board_potential)
+from bitboard_1_4 import (BASIC_SHAPES, BLOCK, BOARD_SIZES, DIAMOND, EMPTY, EXPERT_SHAPES, HARD_SHAPES,
+                          MEDIUM_SHAPES, BitboardState, score_key, zobrist_hash)
+
+# Piece families used as fixtures
+PIECE_FAMILIES = {
+    'basic': BASIC_SHAPES,
+    'medium': MEDIUM_SHAPES,
+    'hard': HARD_SHAPES,
+    'expert': EXPERT_SHAPES,
+}
+
+# State representations used as fixtures
+REPRESENTATIONS = ('game', 'bitboard')
+
+def fixture_board(board_size, full_line=False):
+    """
+    Builds the fixed board used by the benchmarks of a board size.
+    About a third of the cells are filled, without any complete line or column; with
+    full_line, the first row is also completely filled (so that it gets cleared).
+    
+    Args:
+        board_size (int): Size of the board.
+        full_line (bool, optional): Whether to fill the first row.
+    
+    Returns:
+        list: The board.
+    """
+    generator = random.Random(board_size)
+    board = [[EMPTY] * board_size for _ in range(board_size)]
+    for i in range(board_size):
+        for j in range(board_size):
+            draw = generator.random()
+            if draw < 0.1:
+                board[i][j] = DIAMOND
+            elif draw < 0.35:
+                board[i][j] = BLOCK
+    # Keeps one empty cell in each row and column (on the diagonal)
+    for i in range(board_size):
+        board[i][i] = EMPTY
+    if full_line:
+        board[0] = [BLOCK] * board_size
+    return board
+
+def fixture_states(representation, board_size, family, full_line=False):
+    """Builds one fixture state per shape of a piece family."""
+    states = []
+    for shape in PIECE_FAMILIES[family]:
+        state = GameState(fixture_board(board_size, full_line), [row[:] for row in shape], 100)
+        states.append(state.to_bitboard() if representation == 'bitboard' else state)
+    return states
+
+def _copy_state(state):
+    """Copies a fixture state (excluded from the measured time)."""
+    if isinstance(state, BitboardState):
+        return BitboardState(state.board_size, state.filled, state.diamonds, state.piece, state.score)
+    return GameState([row[:] for row in state.board], state.current_piece, state.score)
+
+def _fresh_hash(state):
+    """
+    Hashes a state from its board and piece, not from the cached Zobrist hash.
+    Copies of a GameState compute their hash on first use; a BitboardState computes it when
+    it is built, so its hash is recomputed here the same way.
+    """
+    if isinstance(state, BitboardState):
+        return zobrist_hash(state.filled, state.diamonds, state.piece) ^ score_key(state.score)
+    return hash(state)
+
+def _placement(state):
+    """Move of a fixture state that places the piece (the middle one of the valid moves)."""
+    moves = [move for move in get_valid_moves(state) if move != 'R']
+    return moves[len(moves) // 2] if moves else 'R'
+
+def _benchmark_cases(representation, board_size, family):
+    """
+    Cases of the primitives for one fixture: (primitive, operation, arguments, mutates).
+    Mutating operations get a fresh copy of their arguments at each call.
+    """
+    states = fixture_states(representation, board_size, family)
+    full_line_states = fixture_states(representation, board_size, family, full_line=True)
+    return [
+        ('get_valid_moves', get_valid_moves, [(state,) for state in states], False),
+        ('apply_move', apply_move, [(state, _placement(state)) for state in states], False),
+        ('check_full_lines_and_columns', check_full_lines_and_columns,
+         [(state,) for state in full_line_states], True),
+        # Measured on fresh copies: the cached hash would only time an attribute read
+        ('hash', _fresh_hash, [(state,) for state in states], True),
+        ('heuristic_board_potential', heuristic_board_potential, [(state,) for state in states], False),
+    ]
+
+def measure(operation, arguments, mutates=False, number=200, repeat=5):
+    """
+    Measures the operations per second of a primitive.
+    
+    Args:
+        operation (callable): The primitive.
+        arguments (list): Argument tuples; each measured call uses the next one.
+        mutates (bool, optional): Whether the primitive modifies its first argument; if so,
+            each call gets a copy of it, made outside the measured time.
+        number (int, optional): Number of passes over the arguments in each repetition.
+        repeat (int, optional): Number of repetitions; the fastest one is kept.
+    
+    Returns:
+        float: Operations per second of the fastest repetition.
+    """
+    calls = arguments * number
+    best = None
+    for _ in range(repeat):
+        if mutates:
+            calls = [(_copy_state(args[0]),) + args[1:] for args in arguments * number]
+        start = time.perf_counter()
+        for args in calls:
+            operation(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(calls) / best if best > 0 else float('inf')
+
+def run_microbenchmarks(board_sizes=BOARD_SIZES, families=tuple(PIECE_FAMILIES),
+                        representations=REPRESENTATIONS, primitives=None, number=200, repeat=5):
+    """
+    Runs the micro-benchmarks.
+    
+    Args:
+        board_sizes (iterable, optional): Board sizes of the fixtures.
+        families (iterable, optional): Piece families of the fixtures.
+        representations (iterable, optional): State representations ('game', 'bitboard').
+        primitives (iterable, optional): Names of the primitives to measure (default: all).
+        number (int, optional): Number of passes over the fixtures in each repetition.
+        repeat (int, optional): Number of repetitions of each measure.
+    
+    Returns:
+        dict: Operations per second, by benchmark name (primitive[representation,NxN,family]).
+    """
+    results = {}
+    for representation in representations:
+        for board_size in board_sizes:
+            for family in families:
+                for primitive, operation, arguments, mutates in _benchmark_cases(
+                        representation, board_size, family):
+                    if primitives is not None and primitive not in primitives:
+                        continue
+                    name = f"{primitive}[{representation},{board_size}x{board_size},{family}]"
+                    results[name] = measure(operation, arguments, mutates, number, repeat)
+    return results
+
+def compare_to_baseline(results, baseline, threshold=10.0):
+    """
+    Compares the results of a run with a baseline.
+    
+    Args:
+        results (dict): Operations per second, by benchmark name.
+        baseline (dict): Operations per second of the baseline, by benchmark name.
+        threshold (float, optional): Allowed slowdown in percent.
+    
+    Returns:
+        list: (name, baseline ops/s, ops/s, change in percent) of the benchmarks that regressed
+            by more than the threshold.
+    """
+    regressions = []
+    for name, ops in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        change = (ops - reference) / reference * 100
+        if change < -threshold:
+            regressions.append((name, reference, ops, change))
+    return regressions
+
+def render_results(results, baseline=None):
+    """Renders the results (and their change from the baseline, if given) as a text table."""
+    width = max((len(name) for name in results), default=0)
+    lines = []
+    for name, ops in results.items():
+        line = f"{name:<{width}}  {ops:>14,.0f} ops/s"
+        if baseline and baseline.get(name):
+            line += f"  {(ops - baseline[name]) / baseline[name] * 100:+7.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+def main(argv=None):
+    """Runs the micro-benchmarks from the command line; returns the exit status."""
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the AI hot path.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(BOARD_SIZES), help="board sizes")
+    parser.add_argument('--families', nargs='+', choices=list(PIECE_FAMILIES),
+                        default=list(PIECE_FAMILIES), help="piece families")
+    parser.add_argument('--representations', nargs='+', choices=REPRESENTATIONS,
+                        default=list(REPRESENTATIONS), help="state representations")
+    parser.add_argument('--primitives', nargs='+', help="primitives to measure (default: all)")
+    parser.add_argument('--number', type=int, default=200, help="passes over the fixtures per repetition")
+    parser.add_argument('--repeat', type=int, default=5, help="repetitions of each measure")
+    parser.add_argument('--baseline', help="baseline JSON file to compare against")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="allowed slowdown from the baseline, in percent")
+    parser.add_argument('--save-baseline', help="file to save the results to, as a new baseline")
+    args = parser.parse_args(argv)
+    
+    results = run_microbenchmarks(args.sizes, args.families, args.representations, args.primitives,
+                                  args.number, args.repeat)
+    
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    print(render_results(results, baseline))
+    
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+    
+    if baseline is not None:
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} primitive(s) regressed by more than {args.threshold}%:")
+            for name, reference, ops, change in regressions:
+                print(f"  {name}: {reference:,.0f} -> {ops:,.0f} ops/s ({change:+.1f}%)")
+            return 1
+        print(f"\nNo primitive regressed by more than {args.threshold}%.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Cache of the moves recommended by the AI of Wood Block Puzzle.
+
+The same position is often analysed more than once (a player asking for a hint with several
+algorithms, or many players on the same Easy boards), and a search takes seconds while a
+cache lookup takes microseconds. MoveCache keeps the recommended move of each
+(board, piece, score, algorithm, target score) in memory, with LRU eviction and an optional
+time to live, and can also store them in an SQLite file shared between runs and processes.
+"""
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+
+def cache_key(board, piece, score, algorithm, target_score):
+    """
+    Builds the key of a position in the cache.
+    
+    Args:
+        board (list): The game board.
+        piece (list): The current piece.
+        score (int): The current score.
+        algorithm (str): Name of the algorithm (and mode) that recommends the move.
+        target_score (int): The target score of the search.
+    
+    Returns:
+        str: The key.
+    """
+    return "|".join((
+        "/".join("".join(row) for row in board),
+        "/".join("".join("1" if cell else "0" for cell in row) for row in piece),
+        str(score),
+        algorithm,
+        str(target_score),
+    ))
+
+class MoveCache:
+    """
+    LRU cache of recommended moves, with an optional time to live and SQLite persistence.
+    Only found moves are stored: a search that found nothing may succeed with more time.
+    The hits, disk_hits and misses counters tell how useful the cache is.
+    """
+    def __init__(self, max_entries=1024, ttl=None, path=None):
+        """
+        Initializes a new cache.
+        
+        Args:
+            max_entries (int, optional): Maximum number of moves kept in memory.
+            ttl (float, optional): Seconds a move stays valid (None for no expiry).
+            path (str, optional): SQLite file to persist the moves to (None to keep them
+                only in memory).
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        # key -> (move, time it was stored), in LRU order
+        self._entries = OrderedDict()
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS moves (key TEXT PRIMARY KEY, move TEXT, stored REAL)")
+            self._connection.commit()
+    
+    def _expired(self, stored):
+        """Whether an entry stored at the given time has outlived the time to live."""
+        return self.ttl is not None and time.time() - stored > self.ttl
+    
+    def _remember(self, key, move, stored):
+        """Keeps a move in memory, evicting the least recently used ones if needed."""
+        self._entries[key] = (move, stored)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def get(self, key):
+        """
+        Returns the cached move of a key, or None if it is not cached (or expired).
+        
+        Args:
+            key (str): Key built with cache_key.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if not self._expired(entry[1]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            del self._entries[key]
+        
+        if self._connection is not None:
+            row = self._connection.execute(
+                "SELECT move, stored FROM moves WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                if not self._expired(row[1]):
+                    move = _decode_move(row[0])
+                    self._remember(key, move, row[1])
+                    self.disk_hits += 1
+                    return move
+                self._connection.execute("DELETE FROM moves WHERE key = ?", (key,))
+                self._connection.commit()
+        
+        self.misses += 1
+        return None
+    
+    def put(self, key, move):
+        """
+        Stores the move recommended for a key (None moves are not stored).
+        
+        Args:
+            key (str): Key built with cache_key.
+            move: The recommended move, (x, y) or 'R'.
+        """
+        if move is None:
+            return
+        stored = time.time()
+        self._remember(key, move, stored)
+        if self._connection is not None:
+            self._connection.execute("INSERT OR REPLACE INTO moves VALUES (?, ?, ?)",
+                                     (key, json.dumps(move), stored))
+            self._connection.commit()
+    
+    def __len__(self):
+        """Number of moves kept in memory."""
+        return len(self._entries)
+    
+    def stats(self):
+        """Returns the counters of the cache as a dictionary."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+        }
+    
+    def clear(self):
+        """Removes every move from the cache (and from its file)."""
+        self._entries.clear()
+        if self._connection is not None:
+            self._connection.execute("DELETE FROM moves")
+            self._connection.commit()
+    
+    def close(self):
+        """Closes the SQLite file, if any."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+def _decode_move(text):
+    """Decodes a move stored as JSON ('R' or a list [x, y])."""
+    move = json.loads(text)
+    return tuple(move) if isinstance(move, list) else move
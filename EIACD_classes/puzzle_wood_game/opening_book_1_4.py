@@ -0,0 +1,329 @@
+"""
+Offline book of solved positions for the small boards of Wood Block Puzzle.
+
+The Easy (4x4) board always starts from the same position, and only about 125 thousand
+positions can be reached from it, so they can all be solved in advance. The generator
+enumerates every position reachable with the pieces of a difficulty level and computes, for
+each one, the highest score gain that can be reached within k moves (k = 1..depth) when the
+following pieces are 1x1 pieces, which is the model used by the search algorithms.
+
+From those gain profiles, the best first move of any position of the book and its distance
+to a target score are found with a few lookups, without any search. The book is a compact
+binary file, memory-mapped when loaded:
+    header | sorted position keys (uint64) | gain profiles (depth x uint16 per position)
+
+The Medium (5x5) board already has tens of millions of reachable positions, which is out
+of reach of this pure Python generator; generate_book stops with an error once more than
+max_positions positions are found.
+
+Usage example:
+    python opening_book_1_4.py --difficulty 1
+"""
+import argparse
+import bisect
+import mmap
+import os
+import random
+import struct
+import time
+from array import array
+
+from bitboard_1_4 import (SINGLE_PIECE, clear_full_lines, encode_board, piece_id, placement_table,
+                          shapes_for_difficulty)
+
+# Header of a book file: magic, board size, difficulty, depth, number of positions
+_HEADER = struct.Struct("<8sHHHxxI")
+_MAGIC = b"WBPBOOK1"
+# Largest value of a gain profile entry
+_MAX_GAIN = 0xFFFF
+
+def book_path(board_size, directory=None):
+    """Path of the default book file of a board size (next to this module)."""
+    directory = directory if directory is not None else os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(directory, f"opening_book_{board_size}x{board_size}.bin")
+
+def position_key(board_size, filled, diamonds):
+    """Key of a position in a book: the filled and diamond masks packed in one integer."""
+    return filled | diamonds << (board_size * board_size)
+
+def move_gain(board_size, difficulty, filled, diamonds, mask):
+    """
+    Places a piece mask on a position and clears the complete lines.
+    
+    Returns:
+        tuple: (score gain, new filled mask, new diamonds mask)
+    """
+    filled, diamonds, lines, columns, captured = clear_full_lines(board_size, filled | mask, diamonds)
+    gain = 50 * difficulty * (lines + columns) + 100 * difficulty * captured - 10 * difficulty // 2
+    return gain, filled, diamonds
+
+def initial_positions(difficulty, seeds=range(1000)):
+    """
+    Collects the distinct initial positions of a difficulty level, from the boards the game
+    generates with the given seeds (Easy only has one).
+    
+    Returns:
+        set: (filled, diamonds) masks of the initial boards.
+    """
+    from WoodPuzzle_1_4 import WoodBlockPuzzle
+    return {encode_board(WoodBlockPuzzle(difficulty, random.Random(seed)).board) for seed in seeds}
+
+def enumerate_positions(board_size, pieces, initial, max_positions=2000000):
+    """
+    Enumerates every position reachable from the initial ones by placing the given pieces.
+    
+    Args:
+        board_size (int): The size of the board.
+        pieces (list): Ids of the pieces that can be placed.
+        initial (iterable): Initial (filled, diamonds) positions.
+        max_positions (int, optional): Limit on the number of positions.
+    
+    Returns:
+        set: The (filled, diamonds) reachable positions.
+    
+    Raises:
+        ValueError: If more than max_positions positions are reachable.
+    """
+    tables = [placement_table(board_size, pid) for pid in set(pieces)]
+    seen = set(initial)
+    frontier = list(seen)
+    while frontier:
+        next_frontier = []
+        for filled, diamonds in frontier:
+            for table in tables:
+                for _, mask, _ in table:
+                    if not filled & mask:
+                        position = clear_full_lines(board_size, filled | mask, diamonds)[:2]
+                        if position not in seen:
+                            seen.add(position)
+                            next_frontier.append(position)
+        if len(seen) > max_positions:
+            raise ValueError(f"More than {max_positions} reachable positions on a "
+                             f"{board_size}x{board_size} board")
+        frontier = next_frontier
+    return seen
+
+def solve_positions(board_size, difficulty, positions, depth):
+    """
+    Computes the gain profile of every position with 1x1 pieces.
+    gains[k-1] is the highest score gain that can be reached within k moves (0 if no
+    sequence of at most k moves gains anything).
+    
+    Args:
+        board_size (int): The size of the board.
+        difficulty (int): The difficulty level (scales penalties and rewards).
+        positions (iterable): The (filled, diamonds) positions; must be closed under moves.
+        depth (int): Number of moves of the profiles.
+    
+    Returns:
+        tuple: (keys, profiles), the sorted position keys and an array of depth gains
+            per position, in the same order.
+    """
+    keyed = sorted((position_key(board_size, filled, diamonds), filled, diamonds)
+                   for filled, diamonds in positions)
+    keys = [key for key, _, _ in keyed]
+    index = {key: i for i, key in enumerate(keys)}
+    table = placement_table(board_size, SINGLE_PIECE)
+    
+    # Moves of each position as parallel lists of gains and successor indices
+    successors = []
+    for _, filled, diamonds in keyed:
+        gains = []
+        children = []
+        for _, mask, _ in table:
+            if not filled & mask:
+                gain, child_filled, child_diamonds = move_gain(board_size, difficulty, filled,
+                                                               diamonds, mask)
+                gains.append(gain)
+                children.append(index[position_key(board_size, child_filled, child_diamonds)])
+        successors.append((gains, children))
+    
+    count = len(keys)
+    profiles = array('H', bytes(2 * count * depth))
+    previous = [0] * count
+    for k in range(depth):
+        current = [0] * count
+        for i, (gains, children) in enumerate(successors):
+            best = 0
+            for gain, child in zip(gains, children):
+                value = gain + previous[child]
+                if value > best:
+                    best = value
+            current[i] = best
+            profiles[i * depth + k] = min(best, _MAX_GAIN)
+        previous = current
+    return keys, profiles
+
+def write_book(path, board_size, difficulty, depth, keys, profiles):
+    """Writes a book file."""
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, board_size, difficulty, depth, len(keys)))
+        array('Q', keys).tofile(file)
+        profiles.tofile(file)
+
+def generate_book(difficulty=1, depth=32, path=None, max_positions=2000000):
+    """
+    Generates the book of a difficulty level.
+    
+    Args:
+        difficulty (int, optional): The difficulty level.
+        depth (int, optional): Maximum number of moves to the target the book can answer for.
+        path (str, optional): Output file (by default, the default book of the board size).
+        max_positions (int, optional): Limit on the number of positions.
+    
+    Returns:
+        str: The path of the book file.
+    """
+    board_size = difficulty + 3
+    path = path or book_path(board_size)
+    pieces = [piece_id(shape) for shape in shapes_for_difficulty(difficulty)] + [SINGLE_PIECE]
+    positions = enumerate_positions(board_size, pieces, initial_positions(difficulty), max_positions)
+    keys, profiles = solve_positions(board_size, difficulty, positions, depth)
+    write_book(path, board_size, difficulty, depth, keys, profiles)
+    return path
+
+class OpeningBook:
+    """
+    Memory-mapped book of solved positions of one board size.
+    """
+    def __init__(self, path):
+        """
+        Opens a book file.
+        
+        Args:
+            path (str): The book file.
+        """
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.board_size, self.difficulty, self.depth, count = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a Wood Block Puzzle book")
+        data = memoryview(self._map)
+        keys_end = _HEADER.size + 8 * count
+        self._keys = data[_HEADER.size:keys_end].cast('Q')
+        self._profiles = data[keys_end:keys_end + 2 * count * self.depth].cast('H')
+        self.penalty = 10 * self.difficulty // 2
+    
+    def __len__(self):
+        """Number of positions in the book."""
+        return len(self._keys)
+    
+    def profile(self, filled, diamonds):
+        """
+        Returns the gain profile of a position, or None if it is not in the book.
+        
+        Returns:
+            memoryview: profile[k-1] is the highest gain reachable within k moves.
+        """
+        key = position_key(self.board_size, filled, diamonds)
+        i = bisect.bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            return None
+        return self._profiles[i * self.depth:(i + 1) * self.depth]
+    
+    def _distance(self, filled, diamonds, needed, max_moves):
+        """Moves needed to gain `needed` points from a position (None if unknown or too far)."""
+        if needed <= 0:
+            return 0
+        profile = self.profile(filled, diamonds)
+        if profile is None:
+            return -1
+        for k in range(min(max_moves, self.depth)):
+            if profile[k] >= needed:
+                return k + 1
+        return None
+    
+    def best_move(self, state, target_score):
+        """
+        Finds the first move of a shortest plan to the target score, as a breadth-first
+        search would (ties are broken in the order of the valid moves).
+        The gain profiles ignore that the game ends when the score reaches zero, so the book
+        only answers for plans of at most (score - 1) // penalty moves: every move loses at
+        most the penalty, so the score stays above zero all along them.
+        
+        Args:
+            state (BitboardState): The current state; its piece can be any shape.
+            target_score (int): The target score.
+        
+        Returns:
+            tuple: (move, distance), or (None, None) if the state is not covered by the book,
+                is already a goal, or the target is further than the depth of the book or than
+                the moves the score is sure to last.
+        """
+        needed = target_score - state.score
+        if state.board_size != self.board_size or needed <= 0:
+            return None, None
+        # Longest plan along which the score cannot run out
+        max_distance = self.depth + 1
+        if self.penalty:
+            max_distance = min(max_distance, (state.score - 1) // self.penalty)
+            if max_distance < 1:
+                return None, None
+        
+        best_move = best_distance = None
+        moves = [(move, mask) for move, mask, _ in placement_table(self.board_size, state.piece)
+                 if not state.filled & mask]
+        moves.append(('R', None))
+        for move, mask in moves:
+            if best_distance == 1:
+                break
+            if mask is None:
+                # The position stays the same, with a 1x1 piece, and the score drops
+                gain, filled, diamonds = -self.penalty, state.filled, state.diamonds
+            else:
+                gain, filled, diamonds = move_gain(self.board_size, self.difficulty, state.filled,
+                                                   state.diamonds, mask)
+            if state.score + gain <= 0:
+                # The game would be over
+                continue
+            max_moves = (best_distance if best_distance is not None else max_distance + 1) - 2
+            distance = self._distance(filled, diamonds, needed - gain, max_moves)
+            if distance == -1:
+                # A move leaves the book: the answer could be wrong
+                return None, None
+            if distance is not None and (best_distance is None or distance + 1 < best_distance):
+                best_move, best_distance = move, distance + 1
+        return best_move, best_distance
+    
+    def close(self):
+        """Closes the book file."""
+        self._keys.release()
+        self._profiles.release()
+        self._map.close()
+
+# Books already opened, by board size
+_BOOKS = {}
+
+def load_book(board_size):
+    """
+    Returns the default book of a board size, opening it the first time it exists (a book
+    generated while the program runs is picked up by the next call).
+    
+    Returns:
+        OpeningBook: The book, or None if there is no book file for this board size.
+    """
+    book = _BOOKS.get(board_size)
+    if book is None:
+        path = book_path(board_size)
+        if os.path.exists(path):
+            book = _BOOKS[board_size] = OpeningBook(path)
+    return book
+
+def main(argv=None):
+    """Generates a book from the command line."""
+    parser = argparse.ArgumentParser(description="Generate the book of solved positions of a board.")
+    parser.add_argument('--difficulty', type=int, default=1, help="difficulty level (1 is feasible)")
+    parser.add_argument('--depth', type=int, default=32, help="maximum distance to the target")
+    parser.add_argument('--output', help="output file (default: opening_book_NxN.bin next to this file)")
+    parser.add_argument('--max-positions', type=int, default=2000000,
+                        help="give up if more positions are reachable")
+    args = parser.parse_args(argv)
+    
+    start_time = time.time()
+    path = generate_book(args.difficulty, args.depth, args.output, args.max_positions)
+    book = OpeningBook(path)
+    print(f"Wrote {len(book)} positions to {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MiB) "
+          f"in {time.time() - start_time:.1f} seconds")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Symmetry-aware keys of the positions of Wood Block Puzzle, to shrink the visited sets.
+
+The rules of the game do not change when the board is rotated or mirrored: a line is
+complete in a position exactly when its image is complete in the transformed position, and
+obstacles and diamonds are ordinary cells of the position (they are part of the filled and
+diamonds masks and move with it). A position and its image therefore have the same future,
+as long as the pieces drawn next are drawn from a family that the symmetry maps onto itself.
+The searches of AI_algorithms_1_4 assume every piece after the current one is a 1x1 piece,
+which every symmetry of the square leaves unchanged, so all 8 of them apply there; the
+current piece is transformed with the board.
+
+A BoardSymmetry maps each state to a canonical key, the smallest of the keys of its images,
+so that the visited tables store each class of equivalent positions once. The states stored
+in the frontiers are never transformed, so the paths found need no mapping back.
+
+Transforming a position costs one table lookup per byte of the position. Most children
+differ from their parent by the cells of the piece placed (no line cleared), so their images
+are derived from the images of the parent, which are computed once per expanded node.
+"""
+from operator import or_
+
+from bitboard_1_4 import SINGLE_PIECE, piece_id, piece_shape
+
+# The 8 symmetries of the square, as functions (row, col, size) -> (row, col)
+TRANSFORMS = (
+    lambda row, col, size: (row, col),                        # Identity
+    lambda row, col, size: (col, size - 1 - row),             # Rotation by 90 degrees
+    lambda row, col, size: (size - 1 - row, size - 1 - col),  # Rotation by 180 degrees
+    lambda row, col, size: (size - 1 - col, row),             # Rotation by 270 degrees
+    lambda row, col, size: (row, size - 1 - col),             # Horizontal mirror
+    lambda row, col, size: (size - 1 - row, col),             # Vertical mirror
+    lambda row, col, size: (col, row),                        # Transposition
+    lambda row, col, size: (size - 1 - col, size - 1 - row),  # Anti-transposition
+)
+
+# Cache of the image of each piece under each symmetry, keyed by (piece_id, transform)
+_PIECE_IMAGES = {}
+
+# Cache of the cell images and row tables of each board size and group
+_TABLES = {}
+
+def transform_piece(pid, transform):
+    """
+    Returns the id of the image of a piece under a symmetry.
+    
+    Args:
+        pid (int): The id of the shape.
+        transform (int): The index of the symmetry in TRANSFORMS.
+    
+    Returns:
+        int: The id of the transformed shape.
+    """
+    image = _PIECE_IMAGES.get((pid, transform))
+    if image is None:
+        shape = piece_shape(pid)
+        size = max(len(shape), len(shape[0]))
+        cells = [TRANSFORMS[transform](i, j, size) for i, row in enumerate(shape)
+                 for j, cell in enumerate(row) if cell]
+        top = min(i for i, _ in cells)
+        left = min(j for _, j in cells)
+        height = max(i for i, _ in cells) - top + 1
+        width = max(j for _, j in cells) - left + 1
+        matrix = [[0] * width for _ in range(height)]
+        for i, j in cells:
+            matrix[i - top][j - left] = 1
+        image = _PIECE_IMAGES[pid, transform] = piece_id(matrix)
+    return image
+
+def symmetry_group(pieces=(SINGLE_PIECE,)):
+    """
+    Finds the symmetries that map a family of pieces onto itself.
+    They are the symmetries under which two positions have the same future when the next
+    pieces are drawn from the family.
+    
+    Args:
+        pieces (iterable, optional): Ids of the pieces that can be drawn (by default, the 1x1
+            piece of the search algorithms).
+    
+    Returns:
+        tuple: Indices in TRANSFORMS of the symmetries, starting with the identity.
+    """
+    family = set(pieces)
+    return tuple(transform for transform in range(len(TRANSFORMS))
+                 if {transform_piece(pid, transform) for pid in family} == family)
+
+def _build_tables(board_size, group):
+    """
+    Computes the images of the cells and bytes of a position under a group of symmetries.
+    A position is handled as one integer, filled | diamonds << N*N, cut into bytes.
+    
+    Returns:
+        tuple: (cell_bits, byte_tables): cell_bits[i] holds the image of the bit of cell i
+            under each symmetry of the group, and byte_tables[b][value] the images of a
+            position whose byte b is value (and whose other bytes are 0).
+    """
+    cells = board_size * board_size
+    images = [[] for _ in range(cells)]
+    for transform in group:
+        for cell in range(cells):
+            row, col = TRANSFORMS[transform](cell // board_size, cell % board_size, board_size)
+            images[cell].append(row * board_size + col)
+    cell_bits = [tuple(1 << image for image in cell_images) for cell_images in images]
+    
+    # Bit i of a position is cell i of the filled mask, or cell i - N*N of the diamonds mask
+    bit_images = cell_bits + [tuple(bit << cells for bit in bits) for bits in cell_bits]
+    byte_tables = []
+    for first in range(0, 2 * cells, 8):
+        table = []
+        for value in range(256):
+            keys = [0] * len(group)
+            for offset in range(8):
+                if value >> offset & 1 and first + offset < 2 * cells:
+                    keys = [key | bit for key, bit in zip(keys, bit_images[first + offset])]
+            table.append(tuple(keys))
+        byte_tables.append(table)
+    return cell_bits, byte_tables
+
+class BoardSymmetry:
+    """
+    Canonical keys of the positions of one board size under a group of symmetries.
+    """
+    def __init__(self, board_size, group):
+        """
+        Precomputes the images of the cells and bytes of the positions.
+        
+        Args:
+            board_size (int): The size of the board.
+            group (tuple): Indices in TRANSFORMS of the symmetries (see symmetry_group).
+        """
+        self.board_size = board_size
+        self.group = group
+        tables = _TABLES.get((board_size, group))
+        if tables is None:
+            tables = _TABLES[board_size, group] = _build_tables(board_size, group)
+        self._cell_bits, self._byte_tables = tables
+        self._identity = (0,) * len(group)
+        # The last expanded node and the keys of its images
+        self._parent = None
+        self._parent_keys = None
+    
+    @classmethod
+    def for_search(cls, board_size, pieces=(SINGLE_PIECE,)):
+        """
+        Creates the BoardSymmetry of a search, for the pieces drawn after the current one.
+        Each search needs its own, as it remembers the last node expanded.
+        
+        Args:
+            board_size (int): The size of the board.
+            pieces (iterable, optional): Ids of the pieces drawn after the current one.
+        
+        Returns:
+            BoardSymmetry: None if only the identity applies.
+        """
+        group = symmetry_group(pieces)
+        if len(group) == 1:
+            return None
+        return cls(board_size, group)
+    
+    def image_keys(self, filled, diamonds):
+        """
+        Transforms a position by every symmetry of the group.
+        
+        Args:
+            filled (int): Mask of the occupied cells.
+            diamonds (int): Mask of the cells holding a diamond.
+        
+        Returns:
+            tuple: filled | diamonds << N*N of each image, in the order of the group.
+        """
+        position = filled | diamonds << (self.board_size * self.board_size)
+        keys = self._identity
+        for table in self._byte_tables:
+            if not position:
+                break
+            value = position & 0xFF
+            if value:
+                keys = tuple(map(or_, keys, table[value]))
+            position >>= 8
+        return keys
+    
+    def key(self, state):
+        """
+        Returns the canonical key of a state's position: the same for all its images.
+        
+        Args:
+            state (BitboardState): The state (its parent, if any, speeds the computation up).
+        
+        Returns:
+            tuple: (board key, piece id) of the smallest image.
+        """
+        parent = state.parent
+        if parent is None:
+            keys = self.image_keys(state.filled, state.diamonds)
+        else:
+            if parent is not self._parent:
+                self._parent = parent
+                self._parent_keys = self.image_keys(parent.filled, parent.diamonds)
+            keys = self._parent_keys
+            filled = state.filled
+            if state.diamonds == parent.diamonds and filled & parent.filled == parent.filled:
+                # No line was cleared: the images are those of the parent plus the piece
+                added = filled ^ parent.filled
+                cell_bits = self._cell_bits
+                while added:
+                    bit = added & -added
+                    keys = map(or_, keys, cell_bits[bit.bit_length() - 1])
+                    added ^= bit
+            else:
+                keys = self.image_keys(filled, state.diamonds)
+        
+        piece = state.piece
+        if piece == SINGLE_PIECE:
+            return min(keys), piece
+        return min((key, transform_piece(piece, transform))
+                   for key, transform in zip(keys, self.group))
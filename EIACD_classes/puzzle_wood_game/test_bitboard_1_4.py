@@ -0,0 +1,151 @@
+"""
+Tests of the bitboard engine against the list-based game.
+
+The searches, the transposition tables, the book of solved positions and the environments
+all run on BitboardState, so its moves, line clearing and scoring must stay exactly those of
+GameState and WoodBlockPuzzle.
+
+Run with: python -m pytest test_bitboard_1_4.py
+"""
+import random
+
+import pytest
+
+from AI_algorithms_1_4 import GameState, apply_move, get_valid_moves
+from bitboard_1_4 import (BitboardState, clear_full_lines, decode_board, encode_board, piece_id,
+                          shapes_for_difficulty)
+from env_1_4 import WoodPuzzleEnv
+from WoodPuzzle_1_4 import WoodBlockPuzzle
+
+SEEDS = range(8)
+DIFFICULTIES = (1, 2, 3, 4)
+
+def _initial_game(difficulty, seed):
+    """The game WoodBlockPuzzle starts with the given seed."""
+    return WoodBlockPuzzle(difficulty, random.Random(seed))
+
+def _reference_clear(board_size, filled, diamonds):
+    """clear_full_lines computed cell by cell."""
+    def cell(mask, i, j):
+        return mask >> (i * board_size + j) & 1
+    
+    rows = [i for i in range(board_size) if all(cell(filled, i, j) for j in range(board_size))]
+    columns = [j for j in range(board_size) if all(cell(filled, i, j) for i in range(board_size))]
+    cleared = 0
+    for i in range(board_size):
+        for j in range(board_size):
+            if i in rows or j in columns:
+                cleared |= 1 << (i * board_size + j)
+    captured = bin(diamonds & cleared).count("1")
+    return filled & ~cleared, diamonds & ~cleared, len(rows), len(columns), captured
+
+def _assert_same_state(game_state, bitboard_state):
+    assert bitboard_state.board == game_state.board
+    assert bitboard_state.current_piece == game_state.current_piece
+    assert bitboard_state.score == game_state.score
+    assert hash(bitboard_state) == hash(game_state)
+
+@pytest.mark.parametrize("board_size", (4, 5, 6, 7))
+def test_clear_full_lines_matches_cell_by_cell_clearing(board_size):
+    generator = random.Random(board_size)
+    cells = board_size * board_size
+    row = (1 << board_size) - 1
+    column = sum(1 << (i * board_size) for i in range(board_size))
+    for _ in range(2000):
+        # Dense boards, with some full rows and columns forced in
+        filled = generator.getrandbits(cells) | generator.getrandbits(cells)
+        if generator.random() < 0.5:
+            filled |= row << (generator.randrange(board_size) * board_size)
+        if generator.random() < 0.5:
+            filled |= column << generator.randrange(board_size)
+        diamonds = filled & generator.getrandbits(cells) & generator.getrandbits(cells)
+        assert clear_full_lines(board_size, filled, diamonds) == _reference_clear(
+            board_size, filled, diamonds)
+
+@pytest.mark.parametrize("difficulty", DIFFICULTIES)
+def test_encode_decode_round_trip(difficulty):
+    for seed in SEEDS:
+        board = _initial_game(difficulty, seed).board
+        assert decode_board(len(board), *encode_board(board)) == board
+
+@pytest.mark.parametrize("difficulty", DIFFICULTIES)
+def test_bitboard_moves_match_game_state(difficulty):
+    shapes = shapes_for_difficulty(difficulty)
+    for seed in SEEDS:
+        generator = random.Random(seed)
+        game = _initial_game(difficulty, seed)
+        game_state = GameState(game.board, game.current_piece, game.score)
+        bitboard_state = BitboardState.from_board(game.board, game.current_piece, game.score)
+        for _ in range(40):
+            _assert_same_state(game_state, bitboard_state)
+            moves = get_valid_moves(game_state)
+            assert bitboard_state.get_valid_moves() == moves
+            move = generator.choice(moves)
+            game_state = apply_move(game_state, move)
+            bitboard_state = bitboard_state.apply_move(move)
+            _assert_same_state(game_state, bitboard_state)
+            
+            # The searches replace the piece with a 1x1 one: draw a real piece instead
+            piece = [row[:] for row in generator.choice(shapes)]
+            game_state = GameState(game_state.board, piece, game_state.score)
+            bitboard_state = BitboardState(bitboard_state.board_size, bitboard_state.filled,
+                                           bitboard_state.diamonds, piece_id(piece),
+                                           bitboard_state.score)
+
+@pytest.mark.parametrize("difficulty", DIFFICULTIES)
+def test_bitboard_children_match_apply_move(difficulty):
+    for seed in SEEDS:
+        game = _initial_game(difficulty, seed)
+        state = BitboardState.from_board(game.board, game.current_piece, game.score)
+        children = state.children()
+        assert [child.move for child in children] == state.get_valid_moves()
+        for child in children:
+            assert child == state.apply_move(child.move)
+            assert hash(child) == hash(state.apply_move(child.move))
+
+@pytest.mark.parametrize("difficulty", DIFFICULTIES)
+def test_env_step_matches_game_scoring(difficulty):
+    for seed in SEEDS:
+        game = _initial_game(difficulty, seed)
+        env = WoodPuzzleEnv(difficulty)
+        env.reset(seed)
+        # Prefers placements, so that lines get cleared
+        choices = random.Random(seed)
+        while not env.done and env.moves < 60:
+            assert env.board == game.board
+            assert env.current_piece == game.current_piece
+            assert env.score == game.score
+            moves = env.legal_moves()
+            placements = [move for move in moves if move != 'R']
+            move = choices.choice(placements) if placements else 'R'
+            before = game.score
+            if move == 'R':
+                game.get_new_piece()
+                cleared = (0, 0, 0)
+            else:
+                assert game.place_piece(*move)
+                cleared = game.check_full_lines_and_columns()
+            _, reward, done, info = env.step(move)
+            assert reward == game.score - before
+            assert (info['lines'], info['columns'], info['diamonds']) == cleared
+            assert done == (game.score <= 0)
+        assert env.score == game.score
+
+def test_game_state_hash_survives_edits_of_its_matrices():
+    game = _initial_game(2, 0)
+    state = GameState(game.board, [[1, 1]], game.score)
+    hash(state)
+    # The matrices read from the state are copies: editing them leaves it unchanged
+    state.board[0][0] = "#" if state.board[0][0] == " " else " "
+    state.current_piece[0][0] = 0
+    same = GameState(game.board, [[1, 1]], game.score)
+    assert state == same and hash(state) == hash(same)
+    
+    # Assigning them replaces the matrices and the cached hash
+    board = game.board
+    board[0][0] = "#" if board[0][0] == " " else " "
+    state.board = board
+    state.current_piece = [[1]]
+    changed = GameState(board, [[1]], game.score)
+    assert state == changed and hash(state) == hash(changed)
+    assert state.position_key() == BitboardState.from_board(board, [[1]], game.score).position_key()
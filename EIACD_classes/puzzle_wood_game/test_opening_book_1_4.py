@@ -0,0 +1,74 @@
+"""
+Tests of the book of solved positions against the breadth-first search.
+
+get_ai_move answers from the book before searching, so the book must give the move BFS would,
+or no answer at all; in particular at low scores, where the game can end along a plan.
+
+Run with: python -m pytest test_opening_book_1_4.py
+"""
+import random
+
+import pytest
+
+from AI_algorithms_1_4 import bfs
+from bitboard_1_4 import SINGLE_PIECE, BitboardState, piece_id, shapes_for_difficulty
+from opening_book_1_4 import OpeningBook, generate_book, initial_positions
+
+DIFFICULTY = 1
+BOARD_SIZE = 4
+
+@pytest.fixture(scope="module")
+def book(tmp_path_factory):
+    path = tmp_path_factory.mktemp("book") / "opening_book_4x4.bin"
+    book = OpeningBook(generate_book(DIFFICULTY, depth=6, path=str(path)))
+    yield book
+    book.close()
+
+def _reachable_states(count, seed):
+    """States of the book's board reached by random placements, with a 1x1 piece and low scores."""
+    generator = random.Random(seed)
+    pieces = [piece_id(shape) for shape in shapes_for_difficulty(DIFFICULTY)]
+    filled, diamonds = next(iter(initial_positions(DIFFICULTY, range(1))))
+    states = []
+    while len(states) < count:
+        state = BitboardState(BOARD_SIZE, filled, diamonds, generator.choice(pieces), 100)
+        moves = [move for move in state.get_valid_moves() if move != 'R']
+        if moves:
+            state = state.apply_move(generator.choice(moves))
+            filled, diamonds = state.filled, state.diamonds
+        states.append(BitboardState(BOARD_SIZE, filled, diamonds, SINGLE_PIECE,
+                                    generator.randrange(1, 40)))
+    return states
+
+def test_book_agrees_with_bfs_at_low_scores(book):
+    generator = random.Random(0)
+    answered = 0
+    for state in _reachable_states(150, seed=1):
+        target_score = state.score + generator.choice((25, 50, 100, 150, 200))
+        move, distance = book.best_move(state, target_score)
+        if move is None:
+            continue
+        answered += 1
+        path = bfs(state, target_score=target_score, time_limit=30).path
+        assert path is not None
+        assert (move, distance) == (path[0], len(path))
+    # Most positions are answered, so the comparison is meaningful
+    assert answered > 50
+
+def test_book_does_not_plan_through_the_end_of_the_game(book):
+    for state in _reachable_states(100, seed=2):
+        # A score of at most one penalty can run out at the first move
+        low = BitboardState(BOARD_SIZE, state.filled, state.diamonds, SINGLE_PIECE, book.penalty)
+        assert book.best_move(low, low.score + 200) == (None, None)
+        # The score left after the move answered is always above zero
+        move, distance = book.best_move(state, state.score + 200)
+        if move is not None:
+            assert state.apply_move(move).score > 0
+            assert state.score > book.penalty * distance
+
+def test_initial_positions_leave_the_global_generator_alone():
+    random.seed(7)
+    expected = random.random()
+    random.seed(7)
+    assert initial_positions(2, range(20)) == initial_positions(2, range(20))
+    assert random.random() == expected
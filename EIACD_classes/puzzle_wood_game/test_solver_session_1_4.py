@@ -0,0 +1,76 @@
+"""
+Tests of the solver session, which keeps the plans found between the turns of a game.
+
+Run with: python -m pytest test_solver_session_1_4.py
+"""
+import pytest
+
+from AI_algorithms_1_4 import SolverSession, bfs
+from bitboard_1_4 import SINGLE_PIECE, BitboardState, piece_id, shapes_for_difficulty
+from env_1_4 import WoodPuzzleEnv
+
+def _start(difficulty, seed, gain=250):
+    env = WoodPuzzleEnv(difficulty)
+    env.reset(seed)
+    session = SolverSession('bfs', env.score + gain, time_limit=30)
+    return env, session
+
+def _with_piece(state, piece):
+    return BitboardState(state.board_size, state.filled, state.diamonds, piece, state.score)
+
+def test_next_turn_is_served_from_the_session():
+    env, session = _start(1, 0)
+    move = session.best_move(env.state)
+    plan = list(session.principal_variation)
+    assert session.searches == 1 and len(plan) > 2
+    env.step(move)
+    session.play(move)
+    
+    # The piece the searches assumed: the rest of the plan is used as it is
+    state = _with_piece(env.state, SINGLE_PIECE)
+    assert session.best_move(state) == plan[1]
+    assert (session.searches, session.hits) == (1, 1)
+    assert session.principal_variation == plan[1:]
+
+@pytest.mark.parametrize("difficulty", (1, 2, 3))
+def test_stored_plan_is_checked_against_the_piece_drawn(difficulty):
+    env, session = _start(difficulty, 0)
+    move = session.best_move(env.state)
+    plan = list(session.principal_variation)
+    env.step(move)
+    session.play(move)
+    
+    # A piece that does not fit where the plan places the next one needs a new search
+    state = next(state for state in (_with_piece(env.state, piece_id(shape))
+                                     for shape in shapes_for_difficulty(difficulty))
+                 if plan[1] not in state.get_valid_moves())
+    move = session.best_move(state)
+    assert (session.searches, session.hits) == (2, 0)
+    assert move == bfs(state, target_score=session.target_score, time_limit=30).path[0]
+
+@pytest.mark.parametrize("difficulty", (1, 2))
+def test_session_plays_whole_games(difficulty):
+    hits = 0
+    for seed in range(4):
+        env, session = _start(difficulty, seed)
+        while not env.done and env.score < session.target_score:
+            move = session.best_move(env.state)
+            # env.step rejects the moves that are not legal with the piece drawn
+            env.step(move)
+            session.play(move)
+        assert env.score >= session.target_score
+        hits += session.hits
+    # Some turns were answered without a search
+    assert hits > 0
+
+def test_table_is_kept_under_max_bytes():
+    env, session = _start(2, 0, gain=1000)
+    session.max_bytes = 2000
+    for _ in range(5):
+        move = session.best_move(env.state)
+        env.step(move)
+        session.play(move)
+        assert 0 < session.bytes <= session.max_bytes
+        assert session.bytes == sum(size for _, _, size in session.plans.values())
+    session.clear()
+    assert session.bytes == 0 and not session.plans
@@ -0,0 +1,345 @@
+"""
+Tournament of the AI algorithms of Wood Block Puzzle over complete games.
+
+benchmark_1_4.py measures single searches from initial positions; this runner plays whole
+games, as play_with_ai does but without any input or output, to compare what actually matters
+when choosing the algorithm of a difficulty level: the final score and the number of moves.
+
+Game N of a run uses the seed first_seed + N for every policy: the board and the sequence of
+pieces drawn are the same for all of them (see env_1_4.WoodPuzzleEnv). The games are played
+in a process pool, and each finished game is appended to a checkpoint file, so an interrupted
+run can be resumed without playing its games again.
+
+Usage example:
+    python tournament_1_4.py --difficulties 1 2 --games 20 --algorithms bfs astar mcts --checkpoint runs.jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from AI_algorithms_1_4 import AI_ALGORITHMS, SolverSession
+from benchmark_1_4 import percentile, write_csv
+from env_1_4 import WoodPuzzleEnv
+
+logger = logging.getLogger(__name__)
+
+# Columns of the per-game rows (CSV output)
+GAME_FIELDS = ['algorithm', 'difficulty', 'seed', 'target_score', 'final_score', 'won', 'moves',
+               'reason', 'think_time', 'think_max']
+
+# Columns of the summary of each algorithm and difficulty
+SUMMARY_FIELDS = ['algorithm', 'difficulty', 'games', 'win_rate', 'score_mean', 'score_p10',
+                  'score_p50', 'score_p90', 'moves_mean', 'moves_p50', 'moves_p90', 'think_p50',
+                  'think_p90', 'think_p99']
+
+class RandomPolicy:
+    """Baseline policy: a random valid move."""
+    def __init__(self, seed=None):
+        self._random = random.Random(seed)
+    
+    def best_move(self, game):
+        """Returns a random move of the current position."""
+        return self._random.choice(game.legal_moves())
+    
+    def play(self, move):
+        """Nothing to update."""
+
+def _mcts_policy(target_score, time_limit, seed):
+    """Creates the planner of mcts_1_4.py."""
+    # Imported here, as loading mcts_1_4 is only needed for this policy
+    from mcts_1_4 import MCTSPlanner
+    return MCTSPlanner(target_score, time_limit, seed=seed)
+
+# Policies that can play a tournament: name -> factory(target_score, time_limit, seed) of an
+# object with best_move(game) and play(move). The algorithms of AI_ALGORITHMS play through a
+# SolverSession, which runs the same searches as get_ai_move (without the book of solved
+# positions) and keeps its plans between moves. When a search runs out of time without a plan,
+# the session plays the most promising move it saw, so that the games measure play and not
+# only search depth.
+# Factories registered at run time are only seen by the worker processes if they are forked.
+POLICIES = {name: (lambda target_score, time_limit, seed, name=name:
+                   SolverSession(name, target_score, time_limit, best_effort=True))
+            for name in AI_ALGORITHMS}
+POLICIES['mcts'] = _mcts_policy
+POLICIES['random'] = lambda target_score, time_limit, seed: RandomPolicy(seed)
+
+def register_policy(name, factory):
+    """
+    Registers a policy for the tournaments.
+    
+    Args:
+        name (str): The name of the policy.
+        factory (callable): factory(target_score, time_limit, seed) returns an object with
+            best_move(game) and play(move) methods.
+    """
+    POLICIES[name] = factory
+
+def play_game(algorithm, difficulty, seed, target_score=None, time_limit=2, max_moves=100):
+    """
+    Plays one complete game with a policy.
+    
+    Args:
+        algorithm (str): The name of the policy (a key of POLICIES).
+        difficulty (int): Difficulty level from 1 to 4.
+        seed (int): Seed of the board and of the pieces.
+        target_score (int, optional): Score that wins the game (by default, 500 per
+            difficulty level, as in the game).
+        time_limit (float, optional): Time limit in seconds of each move.
+        max_moves (int, optional): Maximum number of moves of the game.
+    
+    Returns:
+        dict: The result row of the game (GAME_FIELDS, and think_times: the time of each move).
+    """
+    if target_score is None:
+        target_score = 500 * difficulty
+    env = WoodPuzzleEnv(difficulty, target_score)
+    env.reset(seed)
+    policy = POLICIES[algorithm](target_score, time_limit, seed)
+    
+    think_times = []
+    reason = 'move limit'
+    while env.moves < max_moves:
+        start_time = time.perf_counter()
+        move = policy.best_move(env)
+        think_times.append(time.perf_counter() - start_time)
+        if move is None:
+            reason = 'no move'
+            break
+        policy.play(move)
+        env.step(move)
+        if env.done:
+            reason = 'target' if env.score >= target_score else 'out of points'
+            break
+    
+    return {
+        'algorithm': algorithm,
+        'difficulty': difficulty,
+        'seed': seed,
+        'target_score': target_score,
+        'final_score': env.score,
+        'won': env.score >= target_score,
+        'moves': env.moves,
+        'reason': reason,
+        'think_time': sum(think_times),
+        'think_max': max(think_times, default=0.0),
+        'think_times': think_times,
+    }
+
+def _error_row(algorithm, difficulty, seed, target_score):
+    """Result row of a game that crashed."""
+    return {'algorithm': algorithm, 'difficulty': difficulty, 'seed': seed,
+            'target_score': target_score, 'final_score': None, 'won': False, 'moves': 0,
+            'reason': 'error', 'think_time': 0.0, 'think_max': 0.0, 'think_times': []}
+
+def load_checkpoint(path, settings):
+    """
+    Reads the games already played from a checkpoint file.
+    
+    Args:
+        path (str): The checkpoint file (JSON lines: the settings, then one game per line).
+        settings (dict): The settings of the run, which must match those of the file.
+    
+    Returns:
+        list: The result rows of the games in the file (empty if it does not exist), including
+            the games that crashed.
+    
+    Raises:
+        ValueError: If the file was written by a run with different settings.
+    """
+    if not os.path.exists(path):
+        return []
+    rows = []
+    with open(path) as file:
+        lines = [line for line in file if line.strip()]
+    if lines and json.loads(lines[0]) != {'settings': settings}:
+        raise ValueError(f"{path} was written by a run with different settings")
+    for line in lines[1:]:
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError:
+            # A line cut short when a run was interrupted
+            continue
+    return rows
+
+def run_tournament(difficulties=(1, 2, 3, 4), games=10, first_seed=0, algorithms=None,
+                   target_score=None, time_limit=2, max_moves=100, max_workers=None,
+                   checkpoint=None):
+    """
+    Plays the same seeded games with every policy, in parallel.
+    
+    Args:
+        difficulties (iterable, optional): Difficulty levels to play.
+        games (int, optional): Number of games per policy and difficulty.
+        first_seed (int, optional): Seed of the first game of each difficulty.
+        algorithms (list, optional): Names of the policies (by default, every algorithm of
+            AI_ALGORITHMS and mcts).
+        target_score (int, optional): Score that wins a game (by default, 500 per difficulty
+            level, as in the game).
+        time_limit (float, optional): Time limit in seconds of each move.
+        max_moves (int, optional): Maximum number of moves of each game.
+        max_workers (int, optional): Number of worker processes (by default, one per CPU).
+        checkpoint (str, optional): File where each finished game is appended; the games it
+            already holds are not played again, except those that crashed.
+    
+    Returns:
+        list: One row per policy, difficulty and game, in that order.
+    
+    Raises:
+        ValueError: If a policy is not in POLICIES.
+    """
+    if algorithms is None:
+        algorithms = list(AI_ALGORITHMS) + ['mcts']
+    unknown = [name for name in algorithms if name not in POLICIES]
+    if unknown:
+        raise ValueError(f"Unknown policies: {', '.join(unknown)} (known: {', '.join(sorted(POLICIES))})")
+    settings = {'target_score': target_score, 'time_limit': time_limit, 'max_moves': max_moves}
+    
+    done = {}
+    if checkpoint is not None:
+        for row in load_checkpoint(checkpoint, settings):
+            # Games that crashed are played again
+            if row['reason'] != 'error':
+                done[(row['algorithm'], row['difficulty'], row['seed'])] = row
+    
+    tasks = [(name, difficulty, seed) for name in algorithms for difficulty in difficulties
+             for seed in range(first_seed, first_seed + games)
+             if (name, difficulty, seed) not in done]
+    
+    output = None
+    if checkpoint is not None:
+        output = open(checkpoint, 'a+')
+        if output.tell() == 0:
+            output.write(json.dumps({'settings': settings}) + "\n")
+        else:
+            # Ends a line cut short by an interrupted run
+            output.seek(output.tell() - 1)
+            if output.read(1) != "\n":
+                output.write("\n")
+    try:
+        with ProcessPoolExecutor(max_workers or os.cpu_count()) as executor:
+            futures = {executor.submit(play_game, *task, target_score, time_limit, max_moves): task
+                       for task in tasks}
+            for future in as_completed(futures):
+                name, difficulty, seed = futures[future]
+                try:
+                    row = future.result()
+                except Exception:
+                    # A crashed game is recorded instead of aborting the tournament
+                    logger.exception("Game %s of %s at difficulty %d failed", seed, name, difficulty)
+                    row = _error_row(name, difficulty, seed,
+                                     target_score if target_score is not None else 500 * difficulty)
+                done[(name, difficulty, seed)] = row
+                if output is not None:
+                    output.write(json.dumps(row) + "\n")
+                    output.flush()
+    finally:
+        if output is not None:
+            output.close()
+    
+    return [done[(name, difficulty, seed)] for name in algorithms for difficulty in difficulties
+            for seed in range(first_seed, first_seed + games)]
+
+def summarize(rows):
+    """
+    Summarises the games of each policy and difficulty.
+    
+    Args:
+        rows (list): Result rows returned by run_tournament.
+    
+    Returns:
+        list: One summary (dict with the SUMMARY_FIELDS) per policy and difficulty.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['algorithm'], row['difficulty']), []).append(row)
+    
+    summary = []
+    for (algorithm, difficulty), games in groups.items():
+        played = [game for game in games if game['reason'] != 'error']
+        scores = [game['final_score'] for game in played]
+        moves = [game['moves'] for game in played]
+        think_times = [think for game in played for think in game['think_times']]
+        summary.append({
+            'algorithm': algorithm,
+            'difficulty': difficulty,
+            'games': len(games),
+            'win_rate': sum(game['won'] for game in games) / len(games),
+            'score_mean': sum(scores) / len(scores) if scores else None,
+            'score_p10': percentile(scores, 0.10),
+            'score_p50': percentile(scores, 0.50),
+            'score_p90': percentile(scores, 0.90),
+            'moves_mean': sum(moves) / len(moves) if moves else None,
+            'moves_p50': percentile(moves, 0.50),
+            'moves_p90': percentile(moves, 0.90),
+            'think_p50': percentile(think_times, 0.50),
+            'think_p90': percentile(think_times, 0.90),
+            'think_p99': percentile(think_times, 0.99),
+        })
+    return summary
+
+def render_summary(summary):
+    """
+    Renders the summary of a tournament as a text table.
+    
+    Args:
+        summary (list): Summaries returned by summarize.
+    
+    Returns:
+        str: The table.
+    """
+    def number(value, spec):
+        return format(value, spec) if value is not None else "-"
+    
+    header = (f"{'Algorithm':<10} {'Diff':<5} {'Games':<6} {'Wins':<6} {'Score mean':<11} "
+              f"{'p10':<7} {'p50':<7} {'p90':<7} {'Moves':<7} {'Moves p90':<10} "
+              f"{'Think p50':<10} {'p90':<8} {'p99':<8}")
+    lines = [header, "-" * len(header)]
+    for entry in summary:
+        lines.append(f"{entry['algorithm']:<10} {entry['difficulty']:<5} {entry['games']:<6} "
+                     f"{entry['win_rate']:<6.0%} {number(entry['score_mean'], '<11.1f')} "
+                     f"{number(entry['score_p10'], '<7.0f')} {number(entry['score_p50'], '<7.0f')} "
+                     f"{number(entry['score_p90'], '<7.0f')} {number(entry['moves_mean'], '<7.1f')} "
+                     f"{number(entry['moves_p90'], '<10.0f')} {number(entry['think_p50'], '<10.3f')} "
+                     f"{number(entry['think_p90'], '<8.3f')} {number(entry['think_p99'], '<8.3f')}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    """Runs a tournament from the command line."""
+    parser = argparse.ArgumentParser(description="Play complete Wood Block Puzzle games with the AI algorithms.")
+    parser.add_argument('--difficulties', type=int, nargs='+', default=[1, 2, 3, 4],
+                        help="difficulty levels to play (1-4)")
+    parser.add_argument('--games', type=int, default=10, help="number of games per algorithm and difficulty")
+    parser.add_argument('--first-seed', type=int, default=0, help="seed of the first game")
+    parser.add_argument('--algorithms', nargs='+', choices=sorted(POLICIES),
+                        help="policies to play (default: all the algorithms and mcts)")
+    parser.add_argument('--target-score', type=int,
+                        help="score that wins a game (default: 500 per difficulty level)")
+    parser.add_argument('--time-limit', type=float, default=2, help="time limit of each move in seconds")
+    parser.add_argument('--max-moves', type=int, default=100, help="maximum number of moves of a game")
+    parser.add_argument('--workers', type=int, help="number of worker processes (default: one per CPU)")
+    parser.add_argument('--checkpoint', help="file the games are saved to as they finish (resumes the run)")
+    parser.add_argument('--csv', help="file to write the result of each game to")
+    parser.add_argument('--summary-csv', help="file to write the summary to")
+    args = parser.parse_args(argv)
+    
+    start_time = time.time()
+    rows = run_tournament(args.difficulties, args.games, args.first_seed, args.algorithms,
+                          args.target_score, args.time_limit, args.max_moves, args.workers,
+                          args.checkpoint)
+    summary = summarize(rows)
+    
+    print(render_summary(summary))
+    print(f"\n{len(rows)} games in {time.time() - start_time:.1f} seconds")
+    
+    if args.csv:
+        write_csv([{field: row[field] for field in GAME_FIELDS} for row in rows], args.csv,
+                  GAME_FIELDS)
+    if args.summary_csv:
+        write_csv(summary, args.summary_csv, SUMMARY_FIELDS)
+
+if __name__ == "__main__":
+    main()